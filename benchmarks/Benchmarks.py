@@ -0,0 +1,263 @@
+"""
+Benchmarks of the import, projection and valuation hot paths
+
+Run from the repository root, e.g.
+    python -m benchmarks.Benchmarks --scale small --save
+    python -m benchmarks.Benchmarks --scale small --compare
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from src.Enterprise import Enterprise
+from src.ImportWizard import import_statements, load_all_statements
+from src.ProjectionEngine import ProjectionEngine, RATIO_PARAMS
+
+ibm_file: Path = Path(__file__).resolve().parent.parent / 'IBM.xlsx'
+baseline_dir: Path = Path(__file__).resolve().parent / 'baselines'
+
+# Problem sizes: projected years, simulated paths, enterprises built and years of history
+SCALES: dict[str, dict[str, int]] = {
+    'small': {'horizon': 5, 'n_paths': 1000, 'n_companies': 10, 'n_years': 7},
+    'medium': {'horizon': 10, 'n_paths': 20000, 'n_companies': 100, 'n_years': 10},
+    'large': {'horizon': 20, 'n_paths': 200000, 'n_companies': 1000, 'n_years': 15}
+}
+
+# A benchmark is flagged when its median is this many times the baseline median
+REGRESSION_THRESHOLD: float = 1.25
+
+# Most seconds `import src` may take on top of numpy, which every process needs anyway
+IMPORT_BUDGET: float = 0.1
+
+# Modules the package must not import until they are used
+DEFERRED_MODULES: tuple = ('pandas', 'scipy', 'PyQt6', 'openpyxl')
+
+MARKET_INPUTS: dict[str, float] = {'rf': 0.04, 'rm': 0.09, 'beta_u': 1.0, 'roic': 0.1}
+
+def make_enterprise(n_years: int, seed: int = 0) -> Enterprise:
+    """
+    Build an enterprise with noisy but well-behaved synthetic statements.
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    years: list = [str(2000 + i) for i in range(n_years)]
+    revenue: np.ndarray = 100 * np.cumprod(1 + rng.normal(0.08, 0.03, n_years))
+
+    def share(mean: float) -> np.ndarray:
+        return revenue * rng.normal(mean, mean / 20, n_years)
+
+    enterprise: Enterprise = Enterprise(name=f'Synthetic {seed}', ticker=f'SYN{seed}', fdso=100,
+                                        debt_value=50.0, stat_tax=0.21, cod=0.05)
+    enterprise.income_statement = pd.DataFrame({'Revenues': revenue,
+                                                'Cost of Goods Sold': share(0.6),
+                                                'R&D Exp.': share(0.1),
+                                                'Selling General & Admin Exp.': share(0.15)}, index=years).T
+    enterprise.balance_sheet = pd.DataFrame({'Net Property Plant & Equipment': share(0.7),
+                                             'Total Cash & ST Investments': share(0.2),
+                                             'Total Current Assets': share(0.4),
+                                             'Current Portion of Long Term Debt': share(0.05),
+                                             'Total Current Liabilities': share(0.3)}, index=years).T
+    enterprise.cash_flow_statement = pd.DataFrame({'Depreciation & Amort.': share(0.07),
+                                                   'Cash from Investing': -share(0.12)}, index=years).T
+    return enterprise
+
+def make_engine(enterprise: Enterprise, horizon: int, dtype: np.dtype = np.float64) -> ProjectionEngine:
+    ratios: dict[str, float] = {'revenue_growth_e': 0.08, 'cogs_revenue_e': 0.6, 'sga_revenue_e': 0.15,
+                                'r_and_d_revenue_e': 0.1, 'da_nppe_e': 0.1, 'nwc_revenue_e': 0.2,
+                                'net_capex_revenue_e': 0.05}
+    return ProjectionEngine(enterprise, **{name: np.full(horizon, value) for name, value in ratios.items()},
+                            dtype=dtype)
+
+def time_call(fn: Callable[..., object], repeat: int, number: int = 1,
+              setup: Callable[[], object] = None) -> dict[str, float]:
+    """
+    Time a call, keeping the spread across repeats.
+
+    Parameters:
+        fn (Callable): The call to time.
+        repeat (int): The number of timed repeats, after one untimed warm-up call.
+        number (int): The number of calls per repeat.
+        setup (Callable[[], object]): Builds, untimed, the state that the warm-up and each
+            repeat start from, such as a fresh engine; fn is then called with it.
+    Returns:
+        timing (dict[str, float]): The min, median, mean and max seconds per call.
+    """
+    def prepare() -> Callable[[], object]:
+        if setup is None:
+            return fn
+        state: object = setup()
+        return lambda: fn(state)
+
+    prepare()()
+    times: np.ndarray = np.empty(repeat)
+    for i in range(repeat):
+        call: Callable[[], object] = prepare()
+        start: float = time.perf_counter()
+        for _ in range(number):
+            call()
+        times[i] = (time.perf_counter() - start) / number
+    return {'min': float(times.min()),
+            'median': float(np.median(times)),
+            'mean': float(times.mean()),
+            'max': float(times.max()),
+            'repeat': repeat,
+            'number': number}
+
+def measure_import(module: str = 'src') -> dict:
+    """
+    Import a module in a fresh interpreter, timing it with -X importtime.
+
+    Returns:
+        import_time (dict): The cumulative import time of the module, the share of it
+            spent importing numpy, the time on top of numpy and the deferred modules loaded.
+    """
+    check: str = f"import sys, {module}; print([m for m in {DEFERRED_MODULES!r} if m in sys.modules])"
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', check],
+                               capture_output=True, text=True, check=True,
+                               cwd=Path(__file__).resolve().parent.parent)
+
+    cumulative: dict[str, float] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, total, name = line.split('|')
+        cumulative.setdefault(name.strip(), int(total) / 1e6)
+
+    total: float = cumulative[module]
+    numpy_time: float = cumulative.get('numpy', 0.0)
+    return {'total': total,
+            'numpy': numpy_time,
+            'own': total - numpy_time,
+            'deferred_loaded': json.loads(completed.stdout.strip().replace("'", '"'))}
+
+def benchmarks(scale: dict[str, int]) -> dict[str, tuple[Callable[..., object], int, Callable[[], object]]]:
+    """
+    The benchmarked calls at a scale, each with its number of calls per repeat and its setup.
+
+    Calls that append to an engine's results get a fresh engine each repeat, so
+    the store they grow is the same size in every repeat.
+    """
+    enterprises: list = [make_enterprise(scale['n_years'], seed) for seed in range(scale['n_companies'])]
+    engine: ProjectionEngine = make_engine(enterprises[0], scale['horizon'])
+    engine.calc_correlation()
+    results = engine.simulate(scale['n_paths'], seed=0)
+    engine32: ProjectionEngine = make_engine(enterprises[0], scale['horizon'], np.float32)
+    engine32.correlation_matrix = engine.correlation_matrix
+
+    def build_engines() -> None:
+        for enterprise in enterprises:
+            make_engine(enterprise, scale['horizon'])
+
+    def fresh_engine() -> ProjectionEngine:
+        # Parameters are estimated on first use, which is not part of the timed call
+        fresh: ProjectionEngine = make_engine(enterprises[0], scale['horizon'])
+        for param_name in RATIO_PARAMS:
+            fresh.params[param_name]
+        return fresh
+
+    return {'import_statements': (lambda: [import_statements(stmt, ibm_file) for stmt in ('is', 'cf', 'bs')], 1, None),
+            'load_all_statements': (lambda: load_all_statements(ibm_file), 1, None),
+            'engine_init': (build_engines, 1, None),
+            'project_stmt': (ProjectionEngine.project_stmt, 100, fresh_engine),
+            'calc_correlation': (engine.calc_correlation, 100, None),
+            'dcf_model': (lambda fresh: fresh.dcf_model(**MARKET_INPUTS), 20, fresh_engine),
+            'simulate': (lambda: engine.simulate(scale['n_paths'], seed=1), 1, None),
+            'simulate_float32': (lambda: engine32.simulate(scale['n_paths'], seed=1), 1, None),
+            'dcf_paths': (lambda: engine.dcf_paths(**MARKET_INPUTS, results=results), 1, None)}
+
+def run(scale_name: str, repeat: int = 5, only: list[str] = None) -> dict:
+    """
+    Run the suite at a named scale.
+
+    Returns:
+        report (dict): The environment, scale and timing of each benchmark.
+    """
+    scale: dict[str, int] = SCALES[scale_name]
+    timings: dict[str, dict] = {}
+    for name, (fn, number, setup) in benchmarks(scale).items():
+        if only and name not in only:
+            continue
+        timings[name] = time_call(fn, repeat, number, setup)
+
+    return {'meta': {'timestamp': datetime.now(timezone.utc).isoformat(),
+                     'python': platform.python_version(),
+                     'numpy': np.__version__,
+                     'pandas': pd.__version__,
+                     'platform': platform.platform(),
+                     'cpu_count': os.cpu_count()},
+            'scale': {'name': scale_name, **scale},
+            'results': timings}
+
+def compare(report: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> dict[str, dict]:
+    """
+    Compare the median of each benchmark against a baseline.
+
+    Returns:
+        comparison (dict[str, dict]): The baseline and current medians, their ratio and
+            whether the benchmark regressed, for benchmarks in both reports.
+    """
+    comparison: dict[str, dict] = {}
+    for name, timing in report['results'].items():
+        if name not in baseline['results']:
+            continue
+        before: float = baseline['results'][name]['median']
+        ratio: float = timing['median'] / before if before > 0 else float('inf')
+        comparison[name] = {'baseline': before,
+                            'current': timing['median'],
+                            'ratio': ratio,
+                            'regressed': ratio > threshold}
+    return comparison
+
+def baseline_path(scale_name: str) -> Path:
+    return baseline_dir / f'{scale_name}.json'
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='*', help='Benchmarks to run, all by default')
+    parser.add_argument('--save', action='store_true', help='Store the run as the baseline of its scale')
+    parser.add_argument('--compare', action='store_true', help='Flag regressions against the baseline')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    report: dict = run(args.scale, args.repeat, args.only)
+    for name, timing in report['results'].items():
+        print(f"{name:<20} median {timing['median'] * 1e3:10.3f} ms   min {timing['min'] * 1e3:10.3f} ms")
+
+    import_time: dict = measure_import()
+    report['import'] = import_time
+    over_budget: bool = import_time['own'] > IMPORT_BUDGET or bool(import_time['deferred_loaded'])
+    print(f"{'import src':<20} {import_time['own'] * 1e3:10.3f} ms over numpy, "
+          f"budget {IMPORT_BUDGET * 1e3:.0f} ms   {'OVER BUDGET' if over_budget else 'ok'}")
+    if import_time['deferred_loaded']:
+        print(f"{'':<20} imported {', '.join(import_time['deferred_loaded'])} eagerly")
+
+    regressed: bool = over_budget
+    if args.compare:
+        with open(baseline_path(args.scale)) as f:
+            comparison: dict = compare(report, json.load(f), args.threshold)
+        for name, result in comparison.items():
+            flag: str = 'REGRESSED' if result['regressed'] else 'ok'
+            print(f"{name:<20} {result['ratio']:6.2f}x baseline   {flag}")
+        regressed = regressed or any(result['regressed'] for result in comparison.values())
+
+    if args.save:
+        baseline_dir.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path(args.scale), 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if regressed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
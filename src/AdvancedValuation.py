@@ -1,13 +1,21 @@
 
 
 import os
-from PyQt6.QtCore import QSize
+from PyQt6.QtCore import QSize, QThreadPool
 from PyQt6.QtWidgets import (QApplication,
                              QMainWindow,
                              QFileDialog,
-                             QMessageBox)
+                             QMessageBox,
+                             QProgressBar,
+                             QPushButton)
 
+from Enterprise import Enterprise
+from EnterpriseBuilder import EnterpriseBuilder
+from ImportWizard import load_all_statements
+from Jobs import value_enterprise
 from widgets.MenuBar import MenuBar
+from widgets.ValuationDialog import ValuationDialog
+from widgets.Worker import Worker
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -20,6 +28,22 @@ class MainWindow(QMainWindow):
 
         self.menu_bar.open_action.triggered.connect(self.open_file)
         self.menu_bar.exit_action.triggered.connect(self.close)
+        self.menu_bar.simulate_action.triggered.connect(self.simulate)
+
+        self.thread_pool: QThreadPool = QThreadPool.globalInstance()
+        self.workers: set[Worker] = set()
+        self.file_path: str = None
+        self.statements: dict = None
+        self.valuation: dict = None
+
+        self.progress_bar: QProgressBar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.hide()
+        self.cancel_button: QPushButton = QPushButton("Cancel")
+        self.cancel_button.hide()
+        self.cancel_button.clicked.connect(self.cancel_workers)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        self.statusBar().addPermanentWidget(self.cancel_button)
 
     def open_file(self):
 
@@ -36,14 +60,88 @@ class MainWindow(QMainWindow):
         )
 
         if file_path:
-            try:
-                print(f"Opening file: {file_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Could not open file: {str(e)}")
+            self.statusBar().showMessage(f"Opening file: {file_path}")
+            # The import polls the worker's cancelled flag while it reads the sheet
+            worker: Worker = Worker(load_all_statements, file_path)
+            worker.signals.result.connect(lambda statements: self.statements_loaded(file_path, statements))
+            worker.signals.error.connect(
+                lambda error: QMessageBox.critical(self, "Error", f"Could not open file: {error.splitlines()[-1]}"))
+            self.start_worker(worker)
+
+    def statements_loaded(self, file_path: str, statements: dict):
+        self.file_path = file_path
+        self.statements = statements
+        self.menu_bar.simulate_action.setEnabled(True)
+        self.statusBar().showMessage("Statements imported", 5000)
+
+    def simulate(self):
+        """
+        Ask for the enterprise's terms and market inputs, then value the imported statements.
+        """
+        dialog: ValuationDialog = ValuationDialog(os.path.splitext(os.path.basename(self.file_path))[0], self)
+        if not dialog.exec():
+            return
+        terms: dict = dialog.terms()
+        enterprise: Enterprise = EnterpriseBuilder(terms['name'], terms['ticker'], terms['fdso'],
+                                                   terms['debt_value'], terms['stat_tax'], terms['cod'],
+                                                   self.file_path).build(self.statements)
+        self.run_simulation(enterprise, dialog.market(), dialog.n_paths())
+
+    def run_simulation(self, enterprise: Enterprise, market: dict, n_paths: int, seed: int = None):
+        """
+        Value an enterprise and simulate its paths in the background, showing progress and allowing cancellation.
+        """
+        self.statusBar().showMessage(f"Valuing {enterprise.name} over {n_paths:,} paths")
+        worker: Worker = Worker(value_enterprise, enterprise, **market, n_paths=n_paths, seed=seed)
+        worker.signals.result.connect(self.simulation_finished)
+        worker.signals.error.connect(
+            lambda error: QMessageBox.critical(self, "Error", f"Valuation failed: {error.splitlines()[-1]}"))
+        self.start_worker(worker)
+
+    def simulation_finished(self, valuation: dict):
+        self.valuation = valuation
+        lines: list[str] = [f"Value per share: {valuation['value_per_share']:,.2f}"]
+        simulation: dict = valuation['simulation']
+        if simulation is not None:
+            per_share: dict = simulation['value_per_share']
+            lines += [f"Simulated mean: {per_share['mean']:,.2f} \u00b1 {per_share['std_error']:,.2f}",
+                      f"5th to 95th percentile: {per_share['p5']:,.2f} to {per_share['p95']:,.2f}",
+                      f"Paths not valued: {simulation['n_failed']:,} of {simulation['n_paths']:,}"]
+        self.statusBar().showMessage(lines[0], 5000)
+        QMessageBox.information(self, "Valuation", "\n".join(lines))
+
+    def start_worker(self, worker: Worker):
+        worker.signals.progress.connect(self.show_progress)
+        worker.signals.cancelled.connect(lambda: self.statusBar().showMessage("Cancelled", 5000))
+        worker.signals.finished.connect(lambda: self.worker_finished(worker))
+        self.workers.add(worker)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.show()
+        self.cancel_button.show()
+        self.thread_pool.start(worker)
+
+    def show_progress(self, done: int, total: int):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
+    def worker_finished(self, worker: Worker):
+        self.workers.discard(worker)
+        if not self.workers:
+            self.progress_bar.hide()
+            self.cancel_button.hide()
+
+    def cancel_workers(self):
+        for worker in self.workers:
+            worker.cancel()
+
+    def closeEvent(self, event):
+        self.cancel_workers()
+        self.thread_pool.waitForDone()
+        super().closeEvent(event)
 
 
 if __name__ == "__main__":
     app = QApplication([])
     window = MainWindow()
     window.show()
-    app.exec()
\ No newline at end of file
+    app.exec()
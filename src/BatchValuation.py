@@ -0,0 +1,367 @@
+"""
+Headless batch valuation of the companies in a manifest, streaming each result to disk
+
+Run from the repository root, e.g.
+    python -m src.BatchValuation manifest.json --output results.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from .BulkImport import TERMS, ImportResult, import_workbook
+from .ProjectionEngine import ProjectionEngine, RATIO_PARAMS
+
+# Market inputs of dcf_model, required for every company
+MARKET_TERMS: tuple = ('rf', 'rm', 'beta_u', 'roic')
+
+# Columns of the output, in order
+FIELDS: tuple = ('ticker', 'name', 'file', 'status', 'enterprise_value', 'equity_value',
+                 'value_per_share', 'n_paths', 'equity_value_mean', 'equity_value_p05',
+                 'equity_value_p50', 'equity_value_p95', 'elapsed', 'error')
+
+# Projected years when a company's ratio assumptions are scalars or left to the historical means
+DEFAULT_HORIZON: int = 5
+
+def read_manifest(manifest: str | Path) -> list[dict]:
+    """
+    Read the companies to value from a JSON or CSV manifest.
+
+    A JSON manifest is either a list of companies or an object holding them
+    under 'companies', with inputs shared by every company under 'defaults'.
+    A CSV manifest has one company per row. Each company has a template
+    'file', relative to the manifest, a 'ticker', the Enterprise terms
+    fdso, debt_value, stat_tax and cod and the market inputs rf, rm, beta_u
+    and roic. The ratio assumptions, such as revenue_growth_e, are a number
+    or a list of one number per year; in a CSV a list is separated by
+    semicolons. Assumptions left out are set to the historical mean.
+
+    Parameters:
+        manifest (str | Path): The manifest file.
+    Returns:
+        companies (list[dict]): The inputs of each company, with numbers parsed and files resolved.
+    """
+    manifest: Path = Path(manifest)
+    if manifest.suffix.lower() == '.csv':
+        with open(manifest, newline='') as f:
+            defaults: dict = {}
+            companies: list = [{key: value for key, value in row.items() if value not in (None, '')}
+                               for row in csv.DictReader(f)]
+    else:
+        with open(manifest) as f:
+            content = json.load(f)
+        if isinstance(content, list):
+            content = {'companies': content}
+        defaults = content.get('defaults', {})
+        companies = content['companies']
+
+    records: list = []
+    for company in companies:
+        record: dict = {**defaults, **company}
+        if 'file' not in record:
+            raise KeyError(f"No template file for {record.get('ticker', 'a company')} in {manifest.name}")
+        record['file'] = str((manifest.parent / record['file']).resolve())
+        record.setdefault('ticker', Path(record['file']).stem)
+        for key in (*TERMS, *MARKET_TERMS, *RATIO_PARAMS, 'horizon', 'n_paths', 'seed'):
+            if key in record:
+                record[key] = parse_number(record[key])
+        for key in ('horizon', 'n_paths', 'seed'):
+            if key in record:
+                record[key] = int(record[key])
+        records.append(record)
+
+    tickers: list = [record['ticker'] for record in records]
+    duplicates: set = {ticker for ticker in tickers if tickers.count(ticker) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate tickers in {manifest.name}: {', '.join(sorted(duplicates))}")
+    return records
+
+def parse_number(value) -> float | list[float]:
+    """
+    Parse a number, or a list of numbers, as read from a JSON or CSV manifest.
+    """
+    if isinstance(value, str):
+        parts: list = [float(part) for part in value.split(';') if part.strip()]
+        return parts[0] if len(parts) == 1 else parts
+    if isinstance(value, list):
+        return [float(part) for part in value]
+    return value
+
+def assumptions(record: dict, historical: ProjectionEngine) -> dict[str, np.ndarray]:
+    """
+    The ratio estimates of a company over its horizon.
+
+    Parameters:
+        record (dict): The company's manifest inputs.
+        historical (ProjectionEngine): An engine over the company's statements, for the historical means.
+    Returns:
+        estimates (dict[str, np.ndarray]): A horizon-long array per ratio parameter.
+    """
+    given: dict = {name: record[name] for name in RATIO_PARAMS if name in record}
+    lengths: set = {len(value) for value in given.values() if isinstance(value, list)}
+    if len(lengths) > 1:
+        raise ValueError(f"Ratio assumptions of {record['ticker']} cover different numbers of years")
+    horizon: int = lengths.pop() if lengths else int(record.get('horizon', DEFAULT_HORIZON))
+
+    estimates: dict[str, np.ndarray] = {}
+    for name in RATIO_PARAMS:
+        value = given.get(name)
+        if value is None:
+            value = historical.params[name[:-2] + '_a'].mean
+        estimates[name] = np.broadcast_to(np.asarray(value, dtype=np.float64), horizon).copy()
+    return estimates
+
+def value_company(record: dict, cache_dir: str = None) -> dict:
+    """
+    Import, project and value one company, capturing any error instead of raising it.
+
+    With n_paths in the record, the company is also simulated and the spread of
+    its path equity values reported.
+
+    Parameters:
+        record (dict): The company's manifest inputs, see read_manifest.
+        cache_dir (str): An optional StatementCache directory.
+    Returns:
+        row (dict): The output row of the company, with the FIELDS keys.
+    """
+    start: float = time.perf_counter()
+    row: dict = dict.fromkeys(FIELDS)
+    row.update({'ticker': record['ticker'], 'name': record.get('name', record['ticker']), 'file': record['file']})
+    try:
+        missing: list = [term for term in MARKET_TERMS if term not in record]
+        if missing:
+            raise KeyError(f"Missing {', '.join(missing)} for {record['ticker']}")
+
+        imported: ImportResult = import_workbook(record['file'], record, cache_dir)
+        if not imported.ok:
+            raise RuntimeError(imported.error)
+        enterprise = imported.enterprise
+
+        estimates: dict[str, np.ndarray] = assumptions(record, ProjectionEngine(enterprise))
+        engine: ProjectionEngine = ProjectionEngine(enterprise, **estimates)
+        market: dict = {term: record[term] for term in MARKET_TERMS}
+        engine.dcf_model(**market)
+        row.update({'enterprise_value': enterprise.enterprise_value,
+                    'equity_value': enterprise.equity_value,
+                    'value_per_share': enterprise.equity_value / enterprise.fdso})
+
+        n_paths: int = int(record.get('n_paths', 0))
+        if n_paths > 0:
+            engine.calc_correlation()
+            results = engine.simulate(n_paths, seed=record.get('seed'))
+            equity_values: np.ndarray = engine.dcf_paths(**market, results=results)['equity_value']
+            equity_values = equity_values[np.isfinite(equity_values)]
+            p05, p50, p95 = np.quantile(equity_values, [0.05, 0.5, 0.95])
+            row.update({'n_paths': n_paths,
+                        'equity_value_mean': float(equity_values.mean()),
+                        'equity_value_p05': float(p05),
+                        'equity_value_p50': float(p50),
+                        'equity_value_p95': float(p95)})
+        row['status'] = 'ok'
+    except Exception:
+        row.update({'status': 'error', 'error': traceback.format_exc()})
+    row['elapsed'] = time.perf_counter() - start
+    return row
+
+class ResultWriter:
+    """
+    Appends output rows to a JSONL or CSV file, flushing each so an interrupted
+    run loses at most the row being written.
+
+    A row cut off by an interruption is dropped when the file is reopened.
+    Without sync, rows are only flushed, and the file is synced once on close.
+    """
+
+    def __init__(self, file_name: str | Path, sync: bool = True):
+        self.file_name: Path = Path(file_name)
+        self.sync: bool = sync
+        self.format: str = 'csv' if self.file_name.suffix.lower() == '.csv' else 'jsonl'
+        drop_partial_row(self.file_name)
+        new_file: bool = not self.file_name.exists() or self.file_name.stat().st_size == 0
+        self.file = open(self.file_name, 'a', newline='')
+        self.writer: csv.DictWriter = None
+        if self.format == 'csv':
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+            if new_file:
+                self.writer.writeheader()
+
+    def write(self, row: dict) -> None:
+        if self.writer is not None:
+            self.writer.writerow(row)
+        else:
+            self.file.write(json.dumps(row) + '\n')
+        self.file.flush()
+        if self.sync:
+            os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        if not self.sync:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.file.close()
+
+    def __enter__(self) -> 'ResultWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def drop_partial_row(file_name: Path) -> None:
+    """
+    Truncate a file after its last complete line.
+    """
+    if not file_name.exists():
+        return
+    with open(file_name, 'rb+') as f:
+        content: bytes = f.read()
+        if content and not content.endswith(b'\n'):
+            f.truncate(content.rfind(b'\n') + 1)
+
+def read_results(file_name: str | Path) -> list[dict]:
+    """
+    Read the rows already written to a JSONL or CSV output file.
+    """
+    file_name: Path = Path(file_name)
+    if not file_name.exists():
+        return []
+    with open(file_name, newline='') as f:
+        if file_name.suffix.lower() == '.csv':
+            return list(csv.DictReader(f))
+        rows: list = []
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A row cut off by an interruption
+                continue
+        return rows
+
+def drop_failed_rows(file_name: str | Path) -> None:
+    """
+    Rewrite an output file without its failed rows, so the rows of a retry replace them.
+
+    The rows kept are written to a temporary file that then replaces the output,
+    so an interruption leaves either the old file or the new one.
+    """
+    file_name: Path = Path(file_name)
+    rows: list[dict] = read_results(file_name)
+    if all(row.get('status') == 'ok' for row in rows):
+        return
+    rewritten: Path = file_name.with_suffix('.tmp' + file_name.suffix)
+    rewritten.unlink(missing_ok=True)
+    with ResultWriter(rewritten, sync=False) as writer:
+        for row in rows:
+            if row.get('status') == 'ok':
+                writer.write(row)
+    os.replace(rewritten, file_name)
+
+def completed_tickers(file_name: str | Path, retry_failed: bool = True) -> set[str]:
+    """
+    The tickers an earlier run of the output file has finished, so a rerun can skip them.
+
+    Parameters:
+        file_name (str | Path): The output file.
+        retry_failed (bool): Whether companies that failed count as unfinished.
+    Returns:
+        tickers (set[str]): The finished tickers.
+    """
+    return {row['ticker'] for row in read_results(file_name)
+            if row.get('status') == 'ok' or not retry_failed}
+
+def batch_value(manifest: str | Path | list[dict],
+                output: str | Path,
+                max_workers: int = None,
+                max_pending: int = None,
+                cache_dir: str | Path = None,
+                resume: bool = True,
+                retry_failed: bool = True) -> Iterator[dict]:
+    """
+    Value the companies of a manifest in a process pool, writing and yielding each row as it finishes.
+
+    At most max_pending companies are queued or in flight, so memory stays flat
+    however long the manifest. With resume, companies already in the output are
+    skipped and new rows appended, the rows of failed companies being replaced by
+    those of their retry; without it the output is started afresh.
+
+    Parameters:
+        manifest (str | Path | list[dict]): A manifest file, or its companies as from read_manifest.
+        output (str | Path): The .jsonl or .csv output file.
+        max_workers (int): The number of processes, all cores by default.
+        max_pending (int): The most companies queued or in flight, twice the workers by default.
+        cache_dir (str | Path): An optional StatementCache directory shared by the workers.
+        resume (bool): Whether to skip the companies an earlier run already wrote.
+        retry_failed (bool): Whether a resumed run values again the companies that failed.
+    Returns:
+        rows (Iterator[dict]): The output rows, in order of completion.
+    """
+    records: list = read_manifest(manifest) if isinstance(manifest, (str, Path)) else list(manifest)
+    output: Path = Path(output)
+    max_workers: int = max_workers or os.cpu_count() or 1
+    max_pending: int = max(max_pending or 2 * max_workers, 1)
+    cache_dir: str = str(cache_dir) if cache_dir is not None else None
+
+    if resume:
+        if retry_failed:
+            drop_failed_rows(output)
+        done: set = completed_tickers(output, retry_failed)
+        records = [record for record in records if record['ticker'] not in done]
+    elif output.exists():
+        output.unlink()
+
+    todo: Iterator[dict] = iter(records)
+    with ResultWriter(output) as writer, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending: set[Future] = set()
+
+        def submit(n: int) -> None:
+            for record in todo:
+                pending.add(executor.submit(value_company, record, cache_dir))
+                n -= 1
+                if n == 0:
+                    break
+
+        submit(max_pending)
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            pending.difference_update(finished)
+            submit(len(finished))
+            for future in finished:
+                row: dict = future.result()
+                writer.write(row)
+                yield row
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('manifest', help='A JSON or CSV manifest of the companies to value')
+    parser.add_argument('--output', '-o', required=True, help='The .jsonl or .csv file to append results to')
+    parser.add_argument('--workers', type=int, default=None, help='Processes to use, all cores by default')
+    parser.add_argument('--max-pending', type=int, default=None)
+    parser.add_argument('--cache-dir', default=None, help='A statement cache shared across runs')
+    parser.add_argument('--restart', action='store_true', help='Discard earlier results instead of resuming')
+    parser.add_argument('--keep-failed', action='store_true', help='Do not retry companies that failed before')
+    args = parser.parse_args(argv)
+
+    n_ok: int = 0
+    n_failed: int = 0
+    start: float = time.perf_counter()
+    for row in batch_value(args.manifest, args.output, args.workers, args.max_pending, args.cache_dir,
+                           resume=not args.restart, retry_failed=not args.keep_failed):
+        if row['status'] == 'ok':
+            n_ok += 1
+            print(f"{row['ticker']}: {row['value_per_share']:.2f} per share")
+        else:
+            n_failed += 1
+            print(f"{row['ticker']}: {row['error'].strip().splitlines()[-1]}", file=sys.stderr)
+    print(f"Valued {n_ok} companies, {n_failed} failed, in {time.perf_counter() - start:.1f} s")
+    return 1 if n_failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Functions for importing many S&P Capital IQ Template files in parallel
+"""
+
+import glob
+import os
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .Enterprise import Enterprise
+from .EnterpriseBuilder import EnterpriseBuilder
+from .ImportWizard import StatementCache
+
+# Inputs of an Enterprise that the template does not hold
+TERMS: tuple = ('fdso', 'debt_value', 'stat_tax', 'cod')
+
+class ImportResult:
+
+    def __init__(self, file_name: str, enterprise: Enterprise = None,
+                 error: str = None, elapsed: float = 0.0):
+        self.file_name: str = file_name
+        self.enterprise: Enterprise = enterprise
+        self.error: str = error
+        self.elapsed: float = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+class ImportStats:
+
+    def __init__(self):
+        self.n_files: int = 0
+        self.n_failed: int = 0
+        self.elapsed: float = 0.0
+        self.busy: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.n_files / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add(self, result: ImportResult) -> None:
+        self.n_files += 1
+        self.n_failed += not result.ok
+        self.busy += result.elapsed
+
+    def report(self) -> dict:
+        """
+        Summarize the throughput of an import.
+
+        Returns:
+            report (dict): The file and failure counts, wall time, throughput and
+                the mean time spent importing one file.
+        """
+        return {'n_files': self.n_files,
+                'n_failed': self.n_failed,
+                'elapsed': self.elapsed,
+                'files_per_second': self.files_per_second,
+                'mean_file_time': self.busy / self.n_files if self.n_files else 0.0}
+
+def find_workbooks(source: str | Path | Iterable) -> list[Path]:
+    """
+    Expand a directory, glob pattern or list of files into the workbooks to import.
+
+    Parameters:
+        source (str | Path | Iterable): A directory of .xlsx files, a glob pattern or the files themselves.
+    Returns:
+        workbooks (list[Path]): The workbooks, sorted.
+    """
+    if isinstance(source, (str, Path)):
+        if Path(source).is_dir():
+            paths: list = list(Path(source).glob('*.xlsx'))
+        elif glob.has_magic(str(source)):
+            paths = [Path(match) for match in glob.glob(str(source), recursive=True)]
+        else:
+            paths = [Path(source)]
+    else:
+        paths = [Path(path) for path in source]
+    # Skip the lock files Excel leaves next to open workbooks
+    return sorted(path for path in paths if not path.name.startswith('~$'))
+
+def import_workbook(file_name: str, terms: dict, cache_dir: str = None) -> ImportResult:
+    """
+    Build one Enterprise from a template, capturing any error instead of raising it.
+
+    Parameters:
+        file_name (str): The Capital IQ template file.
+        terms (dict): The fdso, debt_value, stat_tax and cod of the enterprise,
+            optionally with its name and ticker, which default to the file name.
+        cache_dir (str): An optional StatementCache directory.
+    Returns:
+        result (ImportResult): The enterprise, or the error, and the time taken.
+    """
+    start: float = time.perf_counter()
+    try:
+        missing: list = [term for term in TERMS if term not in terms]
+        if missing:
+            raise KeyError(f"Missing {', '.join(missing)} for {Path(file_name).name}")
+
+        cache: StatementCache = StatementCache(cache_dir) if cache_dir is not None else None
+        stem: str = Path(file_name).stem
+        enterprise: Enterprise = EnterpriseBuilder(terms.get('name', stem), terms.get('ticker', stem),
+                                                   terms['fdso'], terms['debt_value'],
+                                                   terms['stat_tax'], terms['cod'],
+                                                   file_name, cache).build()
+        return ImportResult(str(file_name), enterprise, elapsed=time.perf_counter() - start)
+    except Exception:
+        return ImportResult(str(file_name), error=traceback.format_exc(),
+                            elapsed=time.perf_counter() - start)
+
+def bulk_import(source: str | Path | Iterable,
+                terms: dict[str, dict] = None,
+                default_terms: dict = None,
+                max_workers: int = None,
+                max_pending: int = None,
+                cache_dir: str | Path = None,
+                stats: ImportStats = None) -> Iterator[ImportResult]:
+    """
+    Import templates in a process pool, yielding each result as it finishes.
+
+    At most max_pending files are submitted at once, so memory stays bounded
+    however many files there are. A file that fails to import yields a result
+    holding the error and the rest of the batch carries on.
+
+    Parameters:
+        source (str | Path | Iterable): A directory of .xlsx files, a glob pattern or the files themselves.
+        terms (dict[str, dict]): The Enterprise inputs keyed by file stem, see import_workbook.
+        default_terms (dict): The inputs of files without their own terms, merged under them.
+        max_workers (int): The number of processes, all cores by default.
+        max_pending (int): The most files queued or in flight, twice the workers by default.
+        cache_dir (str | Path): An optional StatementCache directory shared by the workers.
+        stats (ImportStats): An optional tracker updated as results arrive.
+    Returns:
+        results (Iterator[ImportResult]): The results, in order of completion.
+    """
+    terms: dict = terms or {}
+    default_terms: dict = default_terms or {}
+    max_workers: int = max_workers or os.cpu_count() or 1
+    max_pending: int = max(max_pending or 2 * max_workers, 1)
+    stats: ImportStats = stats if stats is not None else ImportStats()
+    cache_dir: str = str(cache_dir) if cache_dir is not None else None
+
+    workbooks: Iterator[Path] = iter(find_workbooks(source))
+    start: float = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending: set[Future] = set()
+
+        def submit(n: int) -> None:
+            for file_path in workbooks:
+                file_terms: dict = {**default_terms, **terms.get(file_path.stem, {})}
+                pending.add(executor.submit(import_workbook, str(file_path), file_terms, cache_dir))
+                n -= 1
+                if n == 0:
+                    break
+
+        submit(max_pending)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            pending.difference_update(done)
+            submit(len(done))
+            for future in done:
+                result: ImportResult = future.result()
+                stats.add(result)
+                stats.elapsed = time.perf_counter() - start
+                yield result
+
+if __name__ == '__main__':
+    # Run as a module from the repository root, since the package uses relative imports:
+    #   python -m src.BulkImport <directory, glob pattern or workbook>
+    import sys
+
+    stats = ImportStats()
+    for result in bulk_import(sys.argv[1], default_terms=dict.fromkeys(TERMS, 0.0), stats=stats):
+        print(f"{result.file_name}: {'ok' if result.ok else result.error.splitlines()[-1]}")
+    print(stats.report())
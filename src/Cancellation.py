@@ -0,0 +1,14 @@
+"""
+Cooperative cancellation of long-running tasks
+"""
+
+from typing import Callable
+
+class Cancelled(Exception):
+    """
+    Raised inside a task when its caller has asked it to stop.
+    """
+
+def check_cancelled(cancelled: Callable[[], bool] = None) -> None:
+    if cancelled is not None and cancelled():
+        raise Cancelled()
@@ -0,0 +1,62 @@
+"""
+A class holding projected cash flows fixed while the discount rate is iterated
+"""
+
+import numpy as np
+
+class CashFlowCache:
+
+    def __init__(self, fcf: np.ndarray, growth_rate: np.ndarray):
+        # Discounting stays in float64 whatever the precision of the projected paths
+        self.fcf: np.ndarray = np.ascontiguousarray(np.atleast_2d(fcf), dtype=np.float64)
+        self.growth_rate: np.ndarray = np.broadcast_to(np.asarray(growth_rate, dtype=float),
+                                                       (self.n_paths,)).copy()
+        # Numerator of the Gordon growth terminal value, independent of the discount rate
+        self.terminal_fcf: np.ndarray = self.fcf[:, -1] * (1.0 + self.growth_rate)
+
+    @property
+    def n_paths(self) -> int:
+        return self.fcf.shape[0]
+
+    @property
+    def horizon(self) -> int:
+        return self.fcf.shape[1]
+
+    def discount_factors(self, wacc: float | np.ndarray) -> np.ndarray:
+        """
+        Calculate end-of-year discount factors as running products, avoiding a power per cell.
+
+        Parameters:
+            wacc (float | np.ndarray): The weighted average cost of capital, a scalar or one per path.
+        Returns:
+            discount_factors (np.ndarray): The discount factors, (paths, horizon).
+        """
+        factor: np.ndarray = 1.0 / (1.0 + np.atleast_1d(np.asarray(wacc, dtype=float)))
+        return np.cumprod(np.repeat(factor[:, np.newaxis], self.horizon, axis=1), axis=1)
+
+    def enterprise_value(self, wacc: float | np.ndarray, paths: np.ndarray = None) -> np.ndarray:
+        """
+        Discount the cached cash flows of some or all paths.
+
+        Parameters:
+            wacc (float | np.ndarray): The weighted average cost of capital, a scalar or one per path.
+            paths (np.ndarray): The indices of the paths to value, all paths by default.
+        Returns:
+            enterprise_value (np.ndarray): The enterprise value of each path.
+        """
+        if paths is None or len(paths) == self.n_paths:
+            fcf, terminal_fcf, growth_rate = self.fcf, self.terminal_fcf, self.growth_rate
+        else:
+            fcf, terminal_fcf, growth_rate = self.fcf[paths], self.terminal_fcf[paths], self.growth_rate[paths]
+
+        wacc: np.ndarray = np.broadcast_to(np.asarray(wacc, dtype=float), (fcf.shape[0],))
+        discount_factors: np.ndarray = self.discount_factors(wacc)
+        return (np.einsum('ij,ij->i', fcf, discount_factors)
+                + terminal_fcf / (wacc - growth_rate) * discount_factors[:, -1])
+
+    def pv_fcf(self, wacc: float | np.ndarray) -> np.ndarray:
+        """
+        Calculate the present value of every cached cash flow.
+        """
+        wacc: np.ndarray = np.broadcast_to(np.asarray(wacc, dtype=float), (self.n_paths,))
+        return self.fcf * self.discount_factors(wacc)
@@ -0,0 +1,221 @@
+"""
+A store of projected statements too large for memory, kept as memory-mapped chunk files
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+try:
+    from .ProjectionResults import ProjectionResults, LINE_ITEMS
+except ImportError:
+    # Imported as a top-level module by the desktop app
+    from ProjectionResults import ProjectionResults, LINE_ITEMS
+
+class DiskResults:
+    """
+    Projected paths stored on disk as a directory of chunks.
+
+    Each chunk is a (line item, path, year) .npy file holding a block of
+    paths, and header.json records the line items, years, dtype and the
+    chunks written so far. A chunk is opened with np.memmap, so the engine
+    projects straight into the file and a reopened store reads the paths
+    without loading or copying them. Only chunks recorded in the header
+    belong to the store, so a run interrupted mid-chunk leaves it consistent.
+    """
+
+    format_version: int = 1
+    header_name: str = 'header.json'
+
+    def __init__(self, directory: str | Path, years: np.ndarray,
+                 labels: tuple = LINE_ITEMS,
+                 dtype: np.dtype = np.float64,
+                 chunks: list[dict] = None,
+                 mode: str = 'r+'):
+        self.directory: Path = Path(directory)
+        self.years: np.ndarray = np.asarray(years)
+        self.labels: tuple = tuple(labels)
+        self.label_index: dict[str, int] = {label: i for i, label in enumerate(self.labels)}
+        self.dtype: np.dtype = np.dtype(dtype)
+        self.chunk_records: list[dict] = list(chunks or [])
+        self.mode: str = mode
+        self._chunks: dict[int, ProjectionResults] = {}
+        self._pending: ProjectionResults = None
+        self._pending_file: str = None
+
+    @classmethod
+    def create(cls, directory: str | Path, years: np.ndarray,
+               labels: tuple = LINE_ITEMS, dtype: np.dtype = np.float64) -> 'DiskResults':
+        """
+        Start an empty store in a directory, replacing any store already there.
+        """
+        directory: Path = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for chunk_file in directory.glob('chunk_*.npy'):
+            chunk_file.unlink()
+        store: DiskResults = cls(directory, years, labels, dtype)
+        store.write_header()
+        return store
+
+    @classmethod
+    def open(cls, directory: str | Path, mode: str = 'r') -> 'DiskResults':
+        """
+        Reopen a store, read-only by default, or with mode 'r+' to append to it.
+        """
+        directory: Path = Path(directory)
+        with open(directory / cls.header_name) as f:
+            header: dict = json.load(f)
+        if header['format_version'] != cls.format_version:
+            raise ValueError(f"Unsupported results format version {header['format_version']}.")
+        return cls(directory, header['years'], header['labels'], header['dtype'], header['chunks'], mode)
+
+    @property
+    def n_paths(self) -> int:
+        return sum(record['n_paths'] for record in self.chunk_records)
+
+    @property
+    def horizon(self) -> int:
+        return len(self.years)
+
+    @property
+    def nbytes(self) -> int:
+        return self.n_paths * len(self.labels) * self.horizon * self.dtype.itemsize
+
+    def __len__(self) -> int:
+        return self.n_paths
+
+    def write_header(self) -> None:
+        header: dict = {'format_version': self.format_version,
+                        'labels': list(self.labels),
+                        'years': self.years.tolist(),
+                        'dtype': self.dtype.str,
+                        'n_paths': self.n_paths,
+                        'chunks': self.chunk_records}
+        tmp: Path = self.directory / f"{self.header_name}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(header, f, indent=2)
+        os.replace(tmp, self.directory / self.header_name)
+
+    def new_chunk(self, n_paths: int) -> ProjectionResults:
+        """
+        Open the next chunk file as an empty store with room for n_paths paths.
+
+        The engine can project into it with out=, e.g. engine.simulate(n_paths, out=chunk),
+        after which commit_chunk adds it to the store.
+
+        Parameters:
+            n_paths (int): The number of paths in the chunk.
+        Returns:
+            chunk (ProjectionResults): A store over the memory-mapped chunk file.
+        """
+        if self.mode == 'r':
+            raise PermissionError("The results were opened read-only.")
+        if self._pending is not None:
+            raise RuntimeError("The previous chunk has not been committed.")
+        file_name: str = f"chunk_{len(self.chunk_records):05d}.npy"
+        data: np.memmap = np.lib.format.open_memmap(self.directory / file_name, mode='w+', dtype=self.dtype,
+                                                    shape=(len(self.labels), n_paths, self.horizon))
+        data.fill(np.nan)
+        self._pending = ProjectionResults.from_buffer(data, self.years, self.labels)
+        self._pending_file = file_name
+        return self._pending
+
+    def commit_chunk(self) -> None:
+        """
+        Flush the chunk opened by new_chunk to disk, record it in the header and unmap it.
+
+        A chunk that is not full raises ValueError and stays open, to be filled or discarded.
+        """
+        chunk: ProjectionResults = self._pending
+        if chunk is None:
+            raise RuntimeError("No chunk to commit.")
+        if len(chunk) != chunk.capacity:
+            raise ValueError(f"The chunk holds {len(chunk)} of its {chunk.capacity} paths.")
+        chunk.data.flush()
+        # Unmap the written chunk, so memory stays flat however many chunks are written
+        chunk.data = None
+        self.chunk_records.append({'file': self._pending_file, 'n_paths': len(chunk)})
+        self._pending = None
+        self.write_header()
+
+    def discard_chunk(self) -> None:
+        """
+        Unmap the chunk opened by new_chunk and delete its file, e.g. after a failed projection into it.
+        """
+        if self._pending is None:
+            return
+        self._pending.data = None
+        self._pending = None
+        (self.directory / self._pending_file).unlink(missing_ok=True)
+        self._pending_file = None
+
+    def append(self, results: ProjectionResults) -> None:
+        """
+        Copy the paths of an in-memory store into a new chunk.
+        """
+        chunk: ProjectionResults = self.new_chunk(len(results))
+        block: slice = chunk.add_paths(len(results))
+        chunk.data[:, block] = results.data[:, :len(results)]
+        self.commit_chunk()
+
+    def chunk(self, index: int) -> ProjectionResults:
+        """
+        A chunk as a store over its memory-mapped file, mapped on first access.
+        """
+        if index not in self._chunks:
+            record: dict = self.chunk_records[index]
+            data: np.memmap = np.load(self.directory / record['file'], mmap_mode=self.mode)
+            self._chunks[index] = ProjectionResults.from_buffer(data, self.years, self.labels, n_paths=record['n_paths'])
+        return self._chunks[index]
+
+    def chunks(self) -> Iterator[ProjectionResults]:
+        for index in range(len(self.chunk_records)):
+            yield self.chunk(index)
+
+    def __getitem__(self, key: str | tuple) -> np.ndarray:
+        """
+        Gather the paths of a line item across chunks, e.g. results['fcf'] or results['fcf', :, -1].
+
+        A store of one chunk returns views into its file; otherwise the chunks are copied together.
+        """
+        if len(self.chunk_records) == 1:
+            return self.chunk(0)[key]
+        return np.concatenate([chunk[key] for chunk in self.chunks()])
+
+    def mean(self, label: str) -> np.ndarray:
+        """
+        The mean of a line item year by year, accumulated chunk by chunk.
+        """
+        total: np.ndarray = np.zeros(self.horizon)
+        for chunk in self.chunks():
+            total += np.sum(chunk[label], axis=0, dtype=np.float64)
+        return total / self.n_paths
+
+    def std(self, label: str) -> np.ndarray:
+        mean: np.ndarray = self.mean(label)
+        total: np.ndarray = np.zeros(self.horizon)
+        for chunk in self.chunks():
+            total += np.sum((chunk[label] - mean) ** 2, axis=0, dtype=np.float64)
+        return np.sqrt(total / self.n_paths)
+
+    def percentile(self, label: str, q: float | np.ndarray) -> np.ndarray:
+        return np.percentile(self[label], q, axis=0)
+
+    def close(self) -> None:
+        """
+        Flush and unmap the chunks, discarding a chunk that was never committed.
+        """
+        for chunk in self._chunks.values():
+            if self.mode != 'r':
+                chunk.data.flush()
+        self._chunks.clear()
+        self.discard_chunk()
+
+    def __enter__(self) -> 'DiskResults':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,256 @@
+"""
+Vectorized distributions of the projected ratios, drawn a whole (paths, horizon) block at a time
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable
+
+import numpy as np
+
+class Distribution(ABC):
+    """
+    The distribution of a ratio around its projected value, year by year.
+
+    loc holds the projected value of each year and scale the dispersion, both
+    broadcast against the trailing horizon axis of a block. Draws come either
+    straight from a generator with sample, or from standard normal shocks with
+    from_normal, which maps them through the distribution's quantile function
+    so correlated shocks and sampling designs carry over to any marginal.
+    """
+
+    def __init__(self, loc: np.ndarray, scale: float):
+        self.loc: np.ndarray = np.asarray(loc, dtype=np.float64)
+        self.scale: float = scale
+
+    @classmethod
+    def from_estimate(cls, loc: np.ndarray, scale: float, history: np.ndarray = None) -> 'Distribution':
+        return cls(loc, scale)
+
+    def sample(self, shape: tuple, rng: np.random.Generator) -> np.ndarray:
+        """
+        Draw a block of independent values.
+
+        Parameters:
+            shape (tuple): The shape of the block, usually (n_paths, horizon).
+            rng (np.random.Generator): The random number generator.
+        Returns:
+            draws (np.ndarray): The draws.
+        """
+        return self.from_normal(rng.standard_normal(shape))
+
+    @abstractmethod
+    def from_normal(self, shocks: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Map standard normal shocks to draws of the same shape.
+
+        Parameters:
+            shocks (np.ndarray): The shocks, with the horizon on the last axis.
+            out (np.ndarray): An optional array to write the draws into.
+        Returns:
+            draws (np.ndarray): The draws.
+        """
+
+    @property
+    @abstractmethod
+    def mean(self) -> np.ndarray:
+        """
+        The exact mean of each year's draws, e.g. the expectation of a control variate.
+        """
+
+def write(values: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    if out is None:
+        return values
+    out[...] = values
+    return out
+
+class Normal(Distribution):
+
+    def sample(self, shape: tuple, rng: np.random.Generator) -> np.ndarray:
+        return rng.normal(self.loc, self.scale, shape)
+
+    def from_normal(self, shocks: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        # Stay in the precision of the shocks, e.g. float32
+        dtype: np.dtype = np.result_type(shocks, np.float32)
+        return np.add(self.loc.astype(dtype, copy=False), dtype.type(self.scale) * shocks, out=out)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.loc
+
+class LogNormal(Distribution):
+    """
+    A positive ratio whose mean is loc and standard deviation scale.
+    """
+
+    def __init__(self, loc: np.ndarray, scale: float):
+        super().__init__(loc, scale)
+        if np.any(self.loc <= 0):
+            raise ValueError("A lognormal ratio needs a positive projected value.")
+        self.sigma: np.ndarray = np.sqrt(np.log1p((scale / self.loc) ** 2))
+        self.mu: np.ndarray = np.log(self.loc) - self.sigma ** 2 / 2
+
+    def sample(self, shape: tuple, rng: np.random.Generator) -> np.ndarray:
+        return rng.lognormal(self.mu, self.sigma, shape)
+
+    def from_normal(self, shocks: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        return np.exp(self.mu + self.sigma * shocks, out=out)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.loc
+
+class TruncatedNormal(Distribution):
+    """
+    A normal distribution cut to [lower, upper], by default the [0, 1] of a margin.
+    """
+
+    def __init__(self, loc: np.ndarray, scale: float, lower: float = 0.0, upper: float = 1.0):
+        super().__init__(loc, scale)
+        if lower >= upper:
+            raise ValueError("The lower bound should be below the upper bound.")
+        self.lower: float = lower
+        self.upper: float = upper
+
+    def from_normal(self, shocks: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        from scipy.special import ndtr, ndtri
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cdf_lower: np.ndarray = ndtr((self.lower - self.loc) / self.scale)
+            cdf_upper: np.ndarray = ndtr((self.upper - self.loc) / self.scale)
+            values: np.ndarray = self.loc + self.scale * ndtri(cdf_lower + ndtr(shocks) * (cdf_upper - cdf_lower))
+        # Guard the bounds against rounding in the far tails
+        return np.clip(values, self.lower, self.upper, out=out)
+
+    @property
+    def mean(self) -> np.ndarray:
+        from scipy.special import ndtr
+
+        def pdf(x: np.ndarray) -> np.ndarray:
+            return np.exp(-x ** 2 / 2) / np.sqrt(2 * np.pi)
+
+        if not self.scale > 0:
+            return np.clip(self.loc, self.lower, self.upper)
+        lower: np.ndarray = (self.lower - self.loc) / self.scale
+        upper: np.ndarray = (self.upper - self.loc) / self.scale
+        return self.loc + self.scale * (pdf(lower) - pdf(upper)) / (ndtr(upper) - ndtr(lower))
+
+class Triangular(Distribution):
+    """
+    A triangular distribution peaking at loc.
+
+    Without bounds it is symmetric with standard deviation scale, spanning
+    loc -/+ sqrt(6) * scale; given bounds are used as they are.
+    """
+
+    def __init__(self, loc: np.ndarray, scale: float, lower: float = None, upper: float = None):
+        super().__init__(loc, scale)
+        half_width: float = np.sqrt(6) * scale
+        self.lower: np.ndarray = self.loc - half_width if lower is None else np.full_like(self.loc, lower)
+        self.upper: np.ndarray = self.loc + half_width if upper is None else np.full_like(self.loc, upper)
+        self.mode: np.ndarray = np.clip(self.loc, self.lower, self.upper)
+
+    def sample(self, shape: tuple, rng: np.random.Generator) -> np.ndarray:
+        return rng.triangular(self.lower, self.mode, self.upper, shape)
+
+    def from_normal(self, shocks: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        from scipy.special import ndtr
+
+        u: np.ndarray = ndtr(shocks)
+        width: np.ndarray = self.upper - self.lower
+        with np.errstate(divide='ignore', invalid='ignore'):
+            peak: np.ndarray = (self.mode - self.lower) / width
+        rising: np.ndarray = self.lower + np.sqrt(u * width * (self.mode - self.lower))
+        falling: np.ndarray = self.upper - np.sqrt((1 - u) * width * (self.upper - self.mode))
+        return write(np.where(u < peak, rising, falling), out)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return (self.lower + self.mode + self.upper) / 3
+
+class StudentT(Distribution):
+    """
+    A Student-t distribution with df degrees of freedom, scaled to standard deviation scale.
+    """
+
+    def __init__(self, loc: np.ndarray, scale: float, df: float = 5.0):
+        super().__init__(loc, scale)
+        if df <= 2:
+            raise ValueError("A Student-t ratio needs more than two degrees of freedom for a finite variance.")
+        self.df: float = df
+        self.t_scale: float = scale * np.sqrt((df - 2) / df)
+
+    def sample(self, shape: tuple, rng: np.random.Generator) -> np.ndarray:
+        return self.loc + self.t_scale * rng.standard_t(self.df, shape)
+
+    def from_normal(self, shocks: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        from scipy.special import ndtr, stdtrit
+
+        return np.add(self.loc, self.t_scale * stdtrit(self.df, ndtr(shocks)), out=out)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.loc
+
+class Empirical(Distribution):
+    """
+    Bootstraps the historical deviations from the historical mean around the projected value.
+    """
+
+    def __init__(self, loc: np.ndarray, history: np.ndarray):
+        history = np.asarray(history, dtype=np.float64)
+        history = history[np.isfinite(history)]
+        if len(history) == 0:
+            raise ValueError("An empirical ratio needs historical values.")
+        self.residuals: np.ndarray = np.sort(history - history.mean())
+        super().__init__(loc, float(self.residuals.std()))
+
+    @classmethod
+    def from_estimate(cls, loc: np.ndarray, scale: float, history: np.ndarray = None) -> 'Empirical':
+        if history is None:
+            raise ValueError("An empirical ratio needs historical values.")
+        return cls(loc, history)
+
+    def sample(self, shape: tuple, rng: np.random.Generator) -> np.ndarray:
+        return self.loc + self.residuals[rng.integers(len(self.residuals), size=shape)]
+
+    def from_normal(self, shocks: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        from scipy.special import ndtr
+
+        # The empirical quantile of each shock's probability, so every residual is equally likely
+        index: np.ndarray = np.minimum((ndtr(shocks) * len(self.residuals)).astype(int), len(self.residuals) - 1)
+        return np.add(self.loc, self.residuals[index], out=out)
+
+    @property
+    def mean(self) -> np.ndarray:
+        # The residuals average to zero up to rounding
+        return self.loc + self.residuals.mean()
+
+# Distributions a Parameter can name
+DISTRIBUTIONS: dict[str, type] = {'Normal': Normal,
+                                  'LogNormal': LogNormal,
+                                  'TruncatedNormal': TruncatedNormal,
+                                  'Triangular': Triangular,
+                                  'StudentT': StudentT,
+                                  'Empirical': Empirical}
+
+def make_distribution(spec: str | Distribution | Callable, loc: np.ndarray, scale: float,
+                      history: np.ndarray = None) -> Distribution:
+    """
+    Build the distribution of a parameter from its specification.
+
+    Parameters:
+        spec (str | Distribution | Callable): A name in DISTRIBUTIONS, a built distribution,
+            or a callable taking loc and scale, such as functools.partial(TruncatedNormal, upper=0.5).
+        loc (np.ndarray): The projected value of each year.
+        scale (float): The dispersion, usually the historical standard deviation.
+        history (np.ndarray): The historical values, needed by 'Empirical'.
+    Returns:
+        distribution (Distribution): The distribution.
+    """
+    if isinstance(spec, Distribution):
+        return spec
+    if isinstance(spec, str):
+        if spec not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {spec!r}, expected one of {', '.join(DISTRIBUTIONS)}.")
+        return DISTRIBUTIONS[spec].from_estimate(loc, scale, history)
+    return spec(loc, scale)
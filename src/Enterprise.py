@@ -2,16 +2,99 @@
 A class modeling the financial statements of an enterprise
 """
 
-import pandas as pd
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    # pandas is only imported once statements are built, keeping the package quick to import
+    import pandas as pd
+
+# Line items the projection engine reads, by statement
+STATEMENT_ITEMS: dict[str, tuple] = {
+    'income_statement': ('Revenues',
+                         'Cost of Goods Sold',
+                         'R&D Exp.',
+                         'Selling General & Admin Exp.'),
+    'cash_flow_statement': ('Depreciation & Amort.',
+                            'Cash from Investing'),
+    'balance_sheet': ('Net Property Plant & Equipment',
+                      'Total Cash & ST Investments',
+                      'Total Current Assets',
+                      'Current Portion of Long Term Debt',
+                      'Total Current Liabilities')
+}
+
+class StatementArrays:
+    """
+    The line items the engine reads, extracted once into a contiguous float64 matrix.
+
+    Rows follow label_index. Statements of different lengths are aligned on
+    their latest period, so the last column is always the most recent year.
+    Line items missing from a statement are left out and raise KeyError.
+    """
+
+    __slots__ = ('values', 'label_index')
+
+    def __init__(self, statements: dict[str, pd.DataFrame], items: dict[str, tuple] = STATEMENT_ITEMS):
+        import pandas as pd
+
+        rows: dict[str, np.ndarray] = {}
+        for stmt, labels in items.items():
+            df: pd.DataFrame = statements[stmt]
+            df = df[~df.index.duplicated()]
+            for label in labels:
+                if label in df.index:
+                    rows[label] = pd.to_numeric(df.loc[label], errors='coerce').to_numpy(dtype=np.float64)
+
+        n_years: int = max((len(row) for row in rows.values()), default=0)
+        self.values: np.ndarray = np.full((len(rows), n_years), np.nan)
+        self.label_index: dict[str, int] = {}
+        for i, (label, row) in enumerate(rows.items()):
+            self.values[i, n_years - len(row):] = row
+            self.label_index[label] = i
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, label_index: dict[str, int]) -> StatementArrays:
+        """
+        Wrap an already extracted matrix, such as one in shared memory, without copying it.
+        """
+        arrays: StatementArrays = cls.__new__(cls)
+        arrays.values = values
+        arrays.label_index = dict(label_index)
+        return arrays
+
+    def __getitem__(self, label: str) -> np.ndarray:
+        return self.values[self.label_index[label]]
+
+    def __contains__(self, label: str) -> bool:
+        return label in self.label_index
+
+    def last(self, label: str) -> float:
+        return float(self.values[self.label_index[label], -1])
+
+def empty_statement() -> pd.DataFrame:
+    import pandas as pd
+    return pd.DataFrame()
 
 class Enterprise:
+    """
+    An enterprise's terms and financial statements.
+
+    The line items the engine reads are extracted from the statements once, and
+    engines estimate their parameters from them once per statements_version.
+    Replacing a statement drops both. Editing a statement in place does not, so
+    call invalidate() after such an edit.
+    """
 
     def __init__(self,
                  name: str, ticker: str, fdso: int,
                  debt_value: float, stat_tax: float, cod: float,
-                 income_statement: pd.DataFrame = pd.DataFrame(),
-                 cash_flow_statement: pd.DataFrame = pd.DataFrame(),
-                 balance_sheet: pd.DataFrame = pd.DataFrame()):
+                 income_statement: pd.DataFrame = None,
+                 cash_flow_statement: pd.DataFrame = None,
+                 balance_sheet: pd.DataFrame = None):
         self.name: str = name
         self.ticker: str = ticker
         self.fdso: int = fdso
@@ -20,11 +103,109 @@ class Enterprise:
         self.stat_tax: float = stat_tax
         self.cod: float = cod
         self.equity_value: float
-        self.income_statement: pd.DataFrame = income_statement
-        self.cash_flow_statement: pd.DataFrame = cash_flow_statement
-        self.balance_sheet: pd.DataFrame = balance_sheet
+        self.statements_version: int = 0
+        self.income_statement: pd.DataFrame = empty_statement() if income_statement is None else income_statement
+        self.cash_flow_statement: pd.DataFrame = (empty_statement() if cash_flow_statement is None
+                                                  else cash_flow_statement)
+        self.balance_sheet: pd.DataFrame = empty_statement() if balance_sheet is None else balance_sheet
+
+    # Replacing a statement drops the arrays extracted from it and bumps the version
+    @property
+    def income_statement(self) -> pd.DataFrame:
+        return self._income_statement
+
+    @income_statement.setter
+    def income_statement(self, df: pd.DataFrame) -> None:
+        self._income_statement = df
+        self.invalidate()
+
+    @property
+    def cash_flow_statement(self) -> pd.DataFrame:
+        return self._cash_flow_statement
+
+    @cash_flow_statement.setter
+    def cash_flow_statement(self, df: pd.DataFrame) -> None:
+        self._cash_flow_statement = df
+        self.invalidate()
+
+    @property
+    def balance_sheet(self) -> pd.DataFrame:
+        return self._balance_sheet
+
+    @balance_sheet.setter
+    def balance_sheet(self, df: pd.DataFrame) -> None:
+        self._balance_sheet = df
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        Drop the line items extracted from the statements and bump the version, after an in-place edit.
+        """
+        self._statement_arrays = None
+        self.statements_version += 1
+
+    @classmethod
+    def from_statement_arrays(cls, name: str, ticker: str, fdso: int,
+                              debt_value: float, stat_tax: float, cod: float,
+                              statements: StatementArrays) -> Enterprise:
+        """
+        Build an enterprise over extracted line items alone, without statement DataFrames.
+
+        Such an enterprise can be projected and valued, but replacing one of its
+        statements drops the line items for those of the new statements.
+        """
+        enterprise: Enterprise = cls(name, ticker, fdso, debt_value, stat_tax, cod)
+        enterprise._statement_arrays = statements
+        return enterprise
+
+    @property
+    def empty(self) -> bool:
+        """
+        Whether the enterprise lacks any statement to project from.
+        """
+        frames_empty: tuple = (self._income_statement.empty,
+                               self._balance_sheet.empty,
+                               self._cash_flow_statement.empty)
+        if all(frames_empty) and self._statement_arrays is not None:
+            # Built from extracted line items alone
+            return self._statement_arrays.values.size == 0
+        return any(frames_empty)
 
+    @property
+    def statements(self) -> StatementArrays:
+        """
+        The engine's line items as a StatementArrays, rebuilt after a statement is replaced or invalidate().
+        """
+        if self._statement_arrays is None:
+            self._statement_arrays = StatementArrays({'income_statement': self._income_statement,
+                                                      'cash_flow_statement': self._cash_flow_statement,
+                                                      'balance_sheet': self._balance_sheet})
+        return self._statement_arrays
 
+def stack_statements(enterprises: list[Enterprise],
+                     labels: tuple = None) -> tuple[np.ndarray, dict[str, int]]:
+    """
+    Stack the statement arrays of many enterprises into one array.
 
+    Enterprises are aligned on their latest period. Years an enterprise does
+    not report, and line items it lacks, are NaN.
 
+    Parameters:
+        enterprises (list[Enterprise]): The enterprises.
+        labels (tuple): The line items to stack, all of STATEMENT_ITEMS by default.
+    Returns:
+        statements (np.ndarray): The line items, (enterprise, line item, year).
+        label_index (dict[str, int]): The row of each line item along the second axis.
+    """
+    if labels is None:
+        labels = tuple(label for items in STATEMENT_ITEMS.values() for label in items)
+    arrays: list[StatementArrays] = [enterprise.statements for enterprise in enterprises]
+    n_years: int = max((array.values.shape[1] for array in arrays), default=0)
 
+    statements: np.ndarray = np.full((len(arrays), len(labels), n_years), np.nan)
+    for i, array in enumerate(arrays):
+        width: int = array.values.shape[1]
+        for j, label in enumerate(labels):
+            if label in array:
+                statements[i, j, n_years - width:] = array[label]
+    return statements, {label: j for j, label in enumerate(labels)}
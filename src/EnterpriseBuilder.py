@@ -4,19 +4,37 @@ A class for building an enterprise with financial statements
 
 import numpy as np
 
-from Enterprise import Enterprise
-from ImportWizard import import_statements
+try:
+    from .Enterprise import Enterprise
+    from .ImportWizard import load_all_statements, StatementCache, TEMPLATE_LABELS
+except ImportError:
+    # Imported as a top-level module by the desktop app
+    from Enterprise import Enterprise
+    from ImportWizard import load_all_statements, StatementCache, TEMPLATE_LABELS
 
 class EnterpriseBuilder:
     def __init__(self,
                  name: str, ticker: str, fdso: int,
-                 debt_value: np.float64,
-                 file_name: str):
-        self.enterprise: Enterprise = Enterprise(name, ticker, fdso, debt_value)
+                 debt_value: np.float64, stat_tax: float, cod: float,
+                 file_name: str,
+                 cache: StatementCache = None):
+        self.enterprise: Enterprise = Enterprise(name, ticker, fdso, debt_value, stat_tax, cod)
         self.file_name: str = file_name
+        self.cache: StatementCache = cache
 
-    def build(self):
-        self.enterprise.income_statement = import_statements(stmt='is', file_name=self.file_name)
-        self.enterprise.cash_flow_statement = import_statements(stmt='cs', file_name=self.file_name)
-        self.enterprise.balance_sheet = import_statements(stmt='bs', file_name=self.file_name)
+    def build(self, statements: dict = None):
+        """
+        Set the enterprise's statements, renaming template line items to the labels the engine reads.
+
+        Parameters:
+            statements (dict): Statements already loaded from the file, keyed by 'is', 'cf' and 'bs';
+                loaded from the file when omitted.
+        Returns:
+            enterprise (Enterprise): The enterprise.
+        """
+        if statements is None:
+            statements = load_all_statements(self.file_name, cache=self.cache)
+        self.enterprise.income_statement = statements['is'].rename(index=TEMPLATE_LABELS)
+        self.enterprise.cash_flow_statement = statements['cf']
+        self.enterprise.balance_sheet = statements['bs'].rename(index=TEMPLATE_LABELS)
         return self.enterprise
\ No newline at end of file
@@ -3,8 +3,21 @@ A class for importing financial data from a
 S&P Capital IQ Template file
 """
 
+import hashlib
+import os
+import numpy as np
+import openpyxl
 import pandas as pd
 from pathlib import Path
+from typing import Callable
+
+try:
+    from .Cancellation import check_cancelled
+    from .Instrumentation import instrumented
+except ImportError:
+    # Imported as a top-level module by the desktop app
+    from Cancellation import check_cancelled
+    from Instrumentation import instrumented
 
 na_values = ['', '#N/A', '#N/A N/A', '#NA',
              '-1.#IND', '-1.#QNAN', '-NaN',
@@ -19,11 +32,235 @@ cf_start: int = 185
 cf_len: int = 94
 bs_start: int = 280
 
-# noinspection PyTypeChecker
-def import_statements(stmt: str, file_name: str) -> pd.DataFrame:
+sheet_name: str = "Financial Statements"
+header_label: str = "Period Date"
+statement_order: tuple = ('is', 'cf', 'bs')
+n_periods: int = 10
+
+# Capital IQ template labels of the line items the engine reads under other names
+TEMPLATE_LABELS: dict[str, str] = {'Cost Of Goods Sold': 'Cost of Goods Sold',
+                                   'R & D Exp.': 'R&D Exp.',
+                                   'Net Property, Plant & Equipment': 'Net Property Plant & Equipment'}
+
+# Rows streamed between checks for a cancelled import
+cancel_check_rows: int = 100
+
+class StatementCache:
+    """
+    An on-disk cache of imported statements, keyed by the workbook's content hash
+    and the statement type, evicting the least recently used entries past max_bytes.
+    """
+
+    format_version: int = 1
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int = 256 * 2 ** 20):
+        self.cache_dir: Path = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self._hashes: dict[tuple, str] = {}
+
+    def file_hash(self, file_path: Path) -> str:
+        """
+        Hash the workbook's content, remembering the hash while its size and mtime are unchanged.
+        """
+        stat: os.stat_result = file_path.stat()
+        memo_key: tuple = (str(file_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._hashes:
+            digest = hashlib.sha256()
+            with open(file_path, 'rb') as file:
+                for chunk in iter(lambda: file.read(2 ** 20), b''):
+                    digest.update(chunk)
+            self._hashes[memo_key] = digest.hexdigest()
+        return self._hashes[memo_key]
+
+    def entry_path(self, stmt: str, file_path: Path) -> Path:
+        return self.cache_dir / f"{self.file_hash(file_path)}_{stmt}_v{self.format_version}.npz"
+
+    @instrumented('StatementCache.load')
+    def load(self, stmt: str, file_path: Path) -> pd.DataFrame | None:
+        entry: Path = self.entry_path(stmt, file_path)
+        try:
+            with np.load(entry, allow_pickle=False) as arrays:
+                df: pd.DataFrame = decode_statement(arrays)
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        # Touch the entry so eviction sees it as recently used
+        os.utime(entry)
+        self.hits += 1
+        return df
+
+    @instrumented('StatementCache.store')
+    def store(self, stmt: str, file_path: Path, df: pd.DataFrame) -> None:
+        entry: Path = self.entry_path(stmt, file_path)
+        tmp: Path = entry.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, 'wb') as file:
+            np.savez(file, **encode_statement(df))
+        os.replace(tmp, entry)
+        self.evict()
+
+    def evict(self) -> None:
+        entries: list = []
+        for entry in self.cache_dir.glob("*.npz"):
+            # Another process sharing the cache may remove an entry while we look at it
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        entries.sort()
+        total: int = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        for entry in self.cache_dir.glob("*.npz"):
+            entry.unlink(missing_ok=True)
+
+
+def encode_statement(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """
+    Encode a statement as plain arrays, splitting mixed columns into numbers and text.
+    """
+    arrays: dict[str, np.ndarray] = {
+        'index': np.asarray(df.index, dtype=str),
+        'index_name': np.asarray([df.index.name or ''], dtype=str),
+        'datetime_columns': np.asarray(isinstance(df.columns, pd.DatetimeIndex)),
+        'columns': (np.asarray(df.columns.values) if isinstance(df.columns, pd.DatetimeIndex)
+                    else np.asarray(df.columns, dtype=str))
+    }
+    for j in range(df.shape[1]):
+        column: pd.Series = df.iloc[:, j]
+        if pd.api.types.is_numeric_dtype(column.dtype):
+            arrays[f'values_{j}'] = column.to_numpy()
+        else:
+            is_text: np.ndarray = column.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+            arrays[f'values_{j}'] = pd.to_numeric(column.where(~is_text), errors='coerce').to_numpy(dtype=float)
+            arrays[f'text_{j}'] = np.where(is_text, column.astype(str).to_numpy(dtype=str), '')
+            arrays[f'is_text_{j}'] = is_text
+    return arrays
+
+def decode_statement(arrays) -> pd.DataFrame:
+    """
+    Rebuild a statement encoded by encode_statement.
+    """
+    columns: pd.Index = (pd.DatetimeIndex(arrays['columns']) if bool(arrays['datetime_columns'])
+                         else pd.Index(arrays['columns']))
+    data: dict = {}
+    for j in range(len(columns)):
+        values: np.ndarray = arrays[f'values_{j}']
+        if f'is_text_{j}' in arrays:
+            values = np.where(arrays[f'is_text_{j}'], arrays[f'text_{j}'], values.astype(object))
+            values = np.asarray(values, dtype=object)
+        data[j] = values
+    df: pd.DataFrame = pd.DataFrame(data, index=pd.Index(arrays['index'], name=str(arrays['index_name'][0]) or None))
+    df.columns = columns
+    return df
+
+
+@instrumented('ImportWizard.import_statements')
+def import_statements(stmt: str, file_name: str, cache: StatementCache = None) -> pd.DataFrame:
 
     file_path: Path = Path(file_name)
 
+    if cache is not None:
+        df: pd.DataFrame = cache.load(stmt, file_path)
+        if df is not None:
+            return df
+
+    df = read_statement(stmt, file_path)
+
+    if cache is not None:
+        cache.store(stmt, file_path, df)
+    return df
+
+@instrumented('ImportWizard.load_all_statements')
+def load_all_statements(file_name: str, cache: StatementCache = None,
+                        cancelled: Callable[[], bool] = None) -> dict[str, pd.DataFrame]:
+    """
+    Load the income statement, cash flow statement and balance sheet from one pass over the workbook.
+
+    The sheet is streamed once in read-only mode and split into statements at
+    their header rows, so templates with different row offsets load the same way.
+
+    Parameters:
+        file_name (str): The Capital IQ template file.
+        cache (StatementCache): An optional cache of imported statements.
+        cancelled (Callable[[], bool]): Polled while the sheet is read; the import raises Cancelled
+            once it returns True.
+    Returns:
+        statements (dict[str, pd.DataFrame]): The statements keyed by 'is', 'cf' and 'bs'.
+    """
+    file_path: Path = Path(file_name)
+
+    if cache is not None:
+        cached: dict[str, pd.DataFrame] = {stmt: cache.load(stmt, file_path) for stmt in statement_order}
+        if all(df is not None for df in cached.values()):
+            return cached
+
+    check_cancelled(cancelled)
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows: list[tuple] = []
+        for row in workbook[sheet_name].iter_rows(max_col=n_periods + 1, values_only=True):
+            rows.append(row)
+            if len(rows) % cancel_check_rows == 0:
+                check_cancelled(cancelled)
+    finally:
+        workbook.close()
+
+    check_cancelled(cancelled)
+    statements: dict[str, pd.DataFrame] = split_statements(rows)
+
+    if cache is not None:
+        for stmt, df in statements.items():
+            cache.store(stmt, file_path, df)
+    return statements
+
+def split_statements(rows: list[tuple]) -> dict[str, pd.DataFrame]:
+    """
+    Split the rows of a statements sheet at each header row.
+
+    Parameters:
+        rows (list[tuple]): The cell values of the sheet, row by row.
+    Returns:
+        statements (dict[str, pd.DataFrame]): The statements keyed by 'is', 'cf' and 'bs'.
+    """
+    headers: list[int] = [i for i, row in enumerate(rows) if row and row[0] == header_label]
+    if len(headers) != len(statement_order):
+        raise ValueError(f"Expected {len(statement_order)} statements, found {len(headers)} header rows.")
+
+    statements: dict[str, pd.DataFrame] = {}
+    for stmt, start, end in zip(statement_order, headers, headers[1:] + [len(rows)]):
+        body: list[tuple] = [row for row in rows[start + 1:end] if row and row[0] is not None]
+        statements[stmt] = build_statement(rows[start], body)
+    return statements
+
+def build_statement(header: tuple, body: list[tuple]) -> pd.DataFrame:
+    """
+    Build a statement frame from its header row and line item rows.
+    """
+    header = tuple(header)[:n_periods + 1]
+    while header[-1] is None:
+        header = header[:-1]
+    width: int = len(header)
+    values: list[list] = [[np.nan if value is None or (isinstance(value, str) and value in na_values) else value
+                           for value in (tuple(row) + (None,) * width)[1:width]]
+                          for row in body]
+    df: pd.DataFrame = pd.DataFrame(values,
+                                    index=pd.Index([row[0] for row in body], name=header[0]),
+                                    columns=pd.Index(header[1:]))
+    return df.infer_objects()
+
+# noinspection PyTypeChecker
+@instrumented('ImportWizard.read_statement')
+def read_statement(stmt: str, file_path: Path) -> pd.DataFrame:
+
     match stmt:
         case "is":
             df: pd.DataFrame = pd.read_excel(file_path,
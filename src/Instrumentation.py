@@ -0,0 +1,152 @@
+"""
+Opt-in timing of the import, projection and valuation stages
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import numpy as np
+
+class StageStats:
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.calls: int = 0
+        self.wall: float = 0.0
+        self.cpu: float = 0.0
+        self.max_wall: float = 0.0
+        self.size: int = 0
+        self.max_size: int = 0
+
+    def add(self, wall: float, cpu: float, size: int) -> None:
+        self.calls += 1
+        self.wall += wall
+        self.cpu += cpu
+        self.max_wall = max(self.max_wall, wall)
+        self.size += size
+        self.max_size = max(self.max_size, size)
+
+    def to_dict(self) -> dict:
+        return {'calls': self.calls,
+                'wall': self.wall,
+                'cpu': self.cpu,
+                'mean_wall': self.wall / self.calls if self.calls else 0.0,
+                'max_wall': self.max_wall,
+                'size': self.size,
+                'max_size': self.max_size}
+
+class Instrumentation:
+    """
+    Wall time, CPU time, call counts and output sizes of each instrumented stage.
+
+    Stages nest, and each records its inclusive time. Every call is also kept
+    as an event for export to the Chrome trace format (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self):
+        self.stats: dict[str, StageStats] = {}
+        self.events: list[dict] = []
+        self.origin: float = time.perf_counter()
+        self.lock: threading.Lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, size: int = 0) -> Iterator[dict]:
+        """
+        Time a block as a stage. The yielded dict's 'size' may be set to the number of elements produced.
+        """
+        record: dict = {'size': size}
+        start_wall: float = time.perf_counter()
+        start_cpu: float = time.thread_time()
+        try:
+            yield record
+        finally:
+            wall: float = time.perf_counter() - start_wall
+            cpu: float = time.thread_time() - start_cpu
+            with self.lock:
+                self.stats.setdefault(name, StageStats(name)).add(wall, cpu, record['size'])
+                self.events.append({'name': name,
+                                    'ph': 'X',
+                                    'ts': (start_wall - self.origin) * 1e6,
+                                    'dur': wall * 1e6,
+                                    'pid': os.getpid(),
+                                    'tid': threading.get_ident(),
+                                    'args': {'cpu_ms': cpu * 1e3, 'size': record['size']}})
+
+    def to_dict(self) -> dict[str, dict]:
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+    def to_json(self, file_name: str = None) -> str:
+        text: str = json.dumps(self.to_dict(), indent=2)
+        if file_name is not None:
+            with open(file_name, 'w') as f:
+                f.write(text)
+        return text
+
+    def to_chrome_trace(self, file_name: str = None) -> dict:
+        trace: dict = {'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}
+        if file_name is not None:
+            with open(file_name, 'w') as f:
+                json.dump(trace, f)
+        return trace
+
+# The active recorder; None while instrumentation is off
+active: Instrumentation = None
+
+def enable() -> Instrumentation:
+    global active
+    active = Instrumentation()
+    return active
+
+def disable() -> Instrumentation:
+    global active
+    recorder, active = active, None
+    return recorder
+
+@contextmanager
+def instrument() -> Iterator[Instrumentation]:
+    """
+    Record every instrumented stage run inside the block.
+    """
+    recorder: Instrumentation = enable()
+    try:
+        yield recorder
+    finally:
+        disable()
+
+def result_size(result) -> int:
+    """
+    The number of elements in a stage's output, for arrays, frames, result stores and containers of them.
+    """
+    if isinstance(result, np.ndarray) or hasattr(result, 'to_numpy'):
+        return int(result.size)
+    if isinstance(getattr(result, 'data', None), np.ndarray):
+        return int(result.data.size)
+    if isinstance(result, dict):
+        return sum(result_size(value) for value in result.values())
+    if isinstance(result, (tuple, list)):
+        return sum(result_size(value) for value in result)
+    return 0
+
+def instrumented(name: str) -> Callable:
+    """
+    Record calls of a function as a stage while instrumentation is on.
+
+    When it is off, the only cost is checking for an active recorder.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            recorder: Instrumentation = active
+            if recorder is None:
+                return fn(*args, **kwargs)
+            with recorder.stage(name) as record:
+                result = fn(*args, **kwargs)
+                record['size'] = result_size(result)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,176 @@
+"""
+Long-running tasks that report their progress and can be cancelled between steps
+"""
+
+from typing import Callable
+
+import numpy as np
+
+try:
+    from .Cancellation import Cancelled, check_cancelled
+    from .DiskResults import DiskResults
+    from .Precision import precision_drift
+    from .ProjectionEngine import ProjectionEngine, RATIO_PARAMS
+    from .ProjectionResults import ProjectionResults
+    from .StreamingStats import ValuationAggregator
+except ImportError:
+    # Imported as a top-level module by the desktop app
+    from Cancellation import Cancelled, check_cancelled
+    from DiskResults import DiskResults
+    from Precision import precision_drift
+    from ProjectionEngine import ProjectionEngine, RATIO_PARAMS
+    from ProjectionResults import ProjectionResults
+    from StreamingStats import ValuationAggregator
+
+def simulate_in_chunks(engine, n_paths: int, chunk_size: int = 10000, seed: int = None,
+                       progress: Callable[[int, int], None] = None,
+                       cancelled: Callable[[], bool] = None,
+                       store: DiskResults = None):
+    """
+    Simulate paths a chunk at a time, so a caller can follow and stop a large simulation.
+
+    Each chunk draws from its own child of the seed, so results are
+    reproducible for a given seed and chunk size.
+
+    Parameters:
+        engine (ProjectionEngine): The engine to simulate.
+        n_paths (int): The number of paths.
+        chunk_size (int): The number of paths simulated between progress reports.
+        seed (int): The seed for the random generator.
+        progress (Callable[[int, int], None]): Called with the paths done and the total after each chunk.
+        cancelled (Callable[[], bool]): Polled before each chunk; the task raises Cancelled once it returns True.
+        store (DiskResults): An optional on-disk store to write each chunk into instead of memory.
+            Chunks finished before a cancellation or error stay in the store; a failed chunk is discarded.
+    Returns:
+        results (ProjectionResults | DiskResults): The simulated paths.
+    """
+    if n_paths < 1:
+        raise ValueError("The number of paths should be positive.")
+
+    chunks: list = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+    seeds: list = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    results = None
+    done: int = 0
+    for chunk, chunk_seed in zip(chunks, seeds):
+        check_cancelled(cancelled)
+        if store is not None:
+            try:
+                engine.simulate(chunk, seed=chunk_seed, out=store.new_chunk(chunk))
+                store.commit_chunk()
+            except BaseException:
+                # Leave the store ready for the next chunk
+                store.discard_chunk()
+                raise
+            results = store
+        elif results is None:
+            results = engine.simulate(chunk, seed=chunk_seed)
+            results.reserve(n_paths)
+        else:
+            engine.simulate(chunk, seed=chunk_seed, out=results)
+        done += chunk
+        if progress is not None:
+            progress(done, n_paths)
+    return results
+
+def value_in_chunks(engine, n_paths: int, rf: float, rm: float, beta_u: float, roic: float,
+                    chunk_size: int = 10000, seed: int = None,
+                    aggregator: ValuationAggregator = None,
+                    check_paths: int = 1000,
+                    progress: Callable[[int, int], None] = None,
+                    cancelled: Callable[[], bool] = None) -> ValuationAggregator:
+    """
+    Simulate and value paths a chunk at a time, keeping only streaming summaries of them.
+
+    Every chunk is projected into the same buffer, valued, and folded into the
+    aggregator's moments, quantile digests and histograms of FCF, enterprise
+    value and value per share, so memory stays flat however many paths are run.
+    The chunks draw from the same seeds as simulate_in_chunks. An engine with
+    a reduced-precision dtype, such as float32, is first checked against
+    float64 on check_paths paths; the drift is reported in the summary and a
+    PrecisionWarning issued if it is beyond tolerance.
+
+    Parameters:
+        engine (ProjectionEngine): The engine to simulate.
+        n_paths (int): The number of paths.
+        rf (float): The expected risk-free return.
+        rm (float): The expected market return.
+        beta_u (float): The unlevered beta.
+        roic (float): The return on invested capital.
+        chunk_size (int): The number of paths simulated and valued at a time.
+        seed (int): The seed for the random generator.
+        aggregator (ValuationAggregator): An aggregator to add to, e.g. with fixed histogram edges.
+        check_paths (int): The paths checked against float64 in reduced precision; 0 to skip the check.
+        progress (Callable[[int, int], None]): Called with the paths done and the total after each chunk.
+        cancelled (Callable[[], bool]): Polled before each chunk; the task raises Cancelled once it returns True.
+    Returns:
+        aggregator (ValuationAggregator): The summaries; aggregator.summary() reports them.
+    """
+    if n_paths < 1:
+        raise ValueError("The number of paths should be positive.")
+
+    horizon: int = len(engine.params['revenue_growth_e'].data)
+    years: np.ndarray = np.arange(1, horizon + 1)
+    if aggregator is None:
+        aggregator = ValuationAggregator(horizon, engine.enterprise.fdso)
+
+    chunks: list = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+    seeds: list = np.random.SeedSequence(seed).spawn(len(chunks))
+    if engine.dtype != np.float64 and check_paths:
+        aggregator.precision = precision_drift(engine, min(check_paths, n_paths), seeds[0],
+                                               market={'rf': rf, 'rm': rm, 'beta_u': beta_u, 'roic': roic})
+    buffer: ProjectionResults = ProjectionResults(chunks[0], years, dtype=engine.dtype)
+
+    done: int = 0
+    for chunk, chunk_seed in zip(chunks, seeds):
+        check_cancelled(cancelled)
+        results: ProjectionResults = engine.simulate(
+            chunk, seed=chunk_seed, out=ProjectionResults.from_buffer(buffer.data[:, :chunk], years))
+        valuation: dict[str, np.ndarray] = engine.dcf_paths(rf, rm, beta_u, roic, results=results)
+        aggregator.add(results['fcf'], valuation['enterprise_value'], valuation['equity_value'])
+        done += chunk
+        if progress is not None:
+            progress(done, n_paths)
+    return aggregator
+
+def value_enterprise(enterprise, rf: float, rm: float, beta_u: float, roic: float,
+                     n_paths: int = 10000, horizon: int = 5, chunk_size: int = 10000, seed: int = None,
+                     progress: Callable[[int, int], None] = None,
+                     cancelled: Callable[[], bool] = None) -> dict:
+    """
+    Value an enterprise at its historical mean ratios, then simulate the spread of its value.
+
+    Parameters:
+        enterprise (Enterprise): The enterprise, with its statements.
+        rf (float): The expected risk-free return.
+        rm (float): The expected market return.
+        beta_u (float): The unlevered beta.
+        roic (float): The return on invested capital.
+        n_paths (int): The number of simulated paths; 0 to skip the simulation.
+        horizon (int): The number of projected years.
+        chunk_size (int): The number of paths simulated between progress reports.
+        seed (int): The seed for the random generator.
+        progress (Callable[[int, int], None]): Called with the paths done and the total after each chunk.
+        cancelled (Callable[[], bool]): Polled between steps; the task raises Cancelled once it returns True.
+    Returns:
+        valuation (dict): The enterprise value, equity value and value per share, and the
+            summary of the simulated paths, see ValuationAggregator.summary, or None without paths.
+    """
+    historical: ProjectionEngine = ProjectionEngine(enterprise)
+    estimates: dict[str, np.ndarray] = {param_name: np.full(horizon, historical.params[param_name[:-2] + '_a'].mean)
+                                        for param_name in RATIO_PARAMS}
+    engine: ProjectionEngine = ProjectionEngine(enterprise, **estimates)
+    engine.dcf_model(rf, rm, beta_u, roic)
+    valuation: dict = {'enterprise_value': enterprise.enterprise_value,
+                       'equity_value': enterprise.equity_value,
+                       'value_per_share': enterprise.equity_value / enterprise.fdso,
+                       'simulation': None}
+
+    if n_paths > 0:
+        check_cancelled(cancelled)
+        engine.calc_correlation()
+        aggregator: ValuationAggregator = value_in_chunks(engine, n_paths, rf, rm, beta_u, roic,
+                                                          chunk_size=chunk_size, seed=seed,
+                                                          progress=progress, cancelled=cancelled)
+        valuation['simulation'] = aggregator.summary()
+    return valuation
@@ -0,0 +1,138 @@
+"""
+A vectorized bracketed root finder for solving the consistent leverage of many paths at once
+"""
+
+from typing import Callable
+
+import numpy as np
+
+try:
+    from .Instrumentation import instrumented
+except ImportError:
+    # Imported as a top-level module by the desktop app
+    from Instrumentation import instrumented
+
+class LeverageSolution:
+
+    def __init__(self, leverage: np.ndarray, converged: np.ndarray,
+                 iterations: np.ndarray, residual: np.ndarray):
+        self.leverage: np.ndarray = leverage
+        self.converged: np.ndarray = converged
+        self.iterations: np.ndarray = iterations
+        self.residual: np.ndarray = residual
+
+    @property
+    def n_converged(self) -> int:
+        return int(np.count_nonzero(self.converged))
+
+    def diagnostics(self) -> dict:
+        """
+        Summarize convergence across paths.
+
+        Returns:
+            diagnostics (dict): The path count, converged count and iteration statistics.
+        """
+        return {'n_paths': int(self.leverage.size),
+                'n_converged': self.n_converged,
+                'max_iterations': int(self.iterations.max(initial=0)),
+                'mean_iterations': float(self.iterations.mean()) if self.iterations.size else 0.0}
+
+@instrumented('solve_leverage')
+def solve_leverage(lev_difference: Callable[[np.ndarray, np.ndarray], np.ndarray],
+                   n_paths: int,
+                   lower: float | np.ndarray = 0.0,
+                   upper: float | np.ndarray = 0.9999,
+                   xtol: float = 1e-12,
+                   rtol: float = 4 * np.finfo(float).eps,
+                   maxiter: int = 100,
+                   x0: np.ndarray = None,
+                   step: float = 0.01) -> LeverageSolution:
+    """
+    Find the root of the leverage difference for every path at once.
+
+    Uses the Illinois variant of regula falsi on each bracket. All unconverged
+    paths advance together, and the difference is only evaluated for them.
+    Paths whose bracket holds no sign change, or whose difference is not
+    finite, are reported as not converged.
+
+    Parameters:
+        lev_difference (Callable): The difference between ending and beginning leverage,
+            called as lev_difference(leverage, paths) with the indices of the paths evaluated.
+        n_paths (int): The number of paths.
+        lower (float | np.ndarray): The lower end of the bracket, a scalar or one per path.
+        upper (float | np.ndarray): The upper end of the bracket, a scalar or one per path.
+        xtol (float): The absolute tolerance on the leverage.
+        rtol (float): The relative tolerance on the leverage.
+        maxiter (int): The maximum number of iterations.
+        x0 (np.ndarray): An optional starting guess, such as a previous solution, one per path.
+        step (float): The half-width of the narrow bracket around x0.
+    Returns:
+        solution (LeverageSolution): The leverage, convergence mask and iteration counts per path.
+    """
+    paths: np.ndarray = np.arange(n_paths)
+    lower: np.ndarray = np.broadcast_to(np.asarray(lower, dtype=float), (n_paths,))
+    upper: np.ndarray = np.broadcast_to(np.asarray(upper, dtype=float), (n_paths,))
+
+    if x0 is None:
+        a: np.ndarray = lower.copy()
+        b: np.ndarray = upper.copy()
+        fa: np.ndarray = np.asarray(lev_difference(a, paths), dtype=float)
+        fb: np.ndarray = np.asarray(lev_difference(b, paths), dtype=float)
+    else:
+        x0: np.ndarray = np.broadcast_to(np.asarray(x0, dtype=float), (n_paths,))
+        x0 = np.where(np.isfinite(x0), x0, lower)
+        a = np.clip(x0 - step, lower, upper)
+        b = np.clip(x0 + step, lower, upper)
+        fa = np.asarray(lev_difference(a, paths), dtype=float)
+        fb = np.asarray(lev_difference(b, paths), dtype=float)
+
+        bracketed: np.ndarray = ((np.isfinite(fa) & np.isfinite(fb) & (np.sign(fa) != np.sign(fb)))
+                                 | (fa == 0) | (fb == 0))
+        missed: np.ndarray = np.flatnonzero(~bracketed)
+        if missed.size:
+            a[missed], b[missed] = lower[missed], upper[missed]
+            fa[missed] = lev_difference(a[missed], missed)
+            fb[missed] = lev_difference(b[missed], missed)
+
+    leverage: np.ndarray = np.full(n_paths, np.nan)
+    residual: np.ndarray = np.full(n_paths, np.nan)
+    iterations: np.ndarray = np.zeros(n_paths, dtype=int)
+    side: np.ndarray = np.zeros(n_paths, dtype=int)
+
+    at_lower: np.ndarray = fa == 0
+    at_upper: np.ndarray = (fb == 0) & ~at_lower
+    leverage[at_lower], residual[at_lower] = a[at_lower], 0.0
+    leverage[at_upper], residual[at_upper] = b[at_upper], 0.0
+    converged: np.ndarray = at_lower | at_upper
+    active: np.ndarray = (~converged & np.isfinite(fa) & np.isfinite(fb)
+                          & (np.sign(fa) != np.sign(fb)))
+
+    for _ in range(maxiter):
+        idx: np.ndarray = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+
+        ai, bi, fai, fbi = a[idx], b[idx], fa[idx], fb[idx]
+        c: np.ndarray = (ai * fbi - bi * fai) / (fbi - fai)
+        fc: np.ndarray = np.asarray(lev_difference(c, idx), dtype=float)
+        iterations[idx] += 1
+        leverage[idx], residual[idx] = c, fc
+
+        # Keep the sign change inside [a, b]; halve the stale end when the same end is kept twice
+        same_as_b: np.ndarray = np.sign(fc) == np.sign(fbi)
+        same_as_a: np.ndarray = ~same_as_b & (np.sign(fc) == np.sign(fai))
+        stale_a: np.ndarray = same_as_b & (side[idx] == -1)
+        stale_b: np.ndarray = same_as_a & (side[idx] == 1)
+        fa[idx] = np.where(same_as_a, fc, np.where(stale_a, fai / 2, fai))
+        fb[idx] = np.where(same_as_b, fc, np.where(stale_b, fbi / 2, fbi))
+        a[idx] = np.where(same_as_a, c, ai)
+        b[idx] = np.where(same_as_b, c, bi)
+        side[idx] = np.where(same_as_b, -1, np.where(same_as_a, 1, 0))
+
+        failed: np.ndarray = ~np.isfinite(fc)
+        done: np.ndarray = ~failed & ((fc == 0)
+                                      | (np.abs(b[idx] - a[idx]) <= xtol + rtol * np.abs(c)))
+        converged[idx[done]] = True
+        active[idx[done | failed]] = False
+
+    return LeverageSolution(leverage, converged, iterations, residual)
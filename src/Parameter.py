@@ -1,13 +1,144 @@
+import warnings
+from typing import Callable, Iterator
 
 import numpy as np
 
+try:
+    from .Distributions import Distribution, make_distribution
+except ImportError:
+    # Imported as a top-level module by the desktop app
+    from Distributions import Distribution, make_distribution
+
 class Parameter:
 
-    def __init__(self, data: np.ndarray, std: np.floating = None, distribution: str = 'Normal'):
+    def __init__(self, data: np.ndarray, std: np.floating = None,
+                 distribution: str | Distribution | Callable = 'Normal',
+                 history: np.ndarray = None):
         self.data: np.ndarray = data
         self.mean: np.floating = np.mean(data)
         if std is None:
             self.std: np.floating = np.std(data)
         else:
             self.std: np.floating = std
-        self.distribution: str = distribution
+        self.distribution: str | Distribution | Callable = distribution
+        self.history: np.ndarray = history
+        self._sampler: Distribution = None
+
+    @property
+    def sampler(self) -> Distribution:
+        """
+        The distribution of the parameter around its data, built from its specification on first use.
+        """
+        if self._sampler is None:
+            self._sampler = make_distribution(self.distribution, self.data, self.std, self.history)
+        return self._sampler
+
+    def sample(self, shape: tuple, rng: np.random.Generator) -> np.ndarray:
+        return self.sampler.sample(shape, rng)
+
+class ParameterWarning(UserWarning):
+    """
+    Warns that a parameter could not be estimated, naming the parameter and the error.
+    """
+
+    def __init__(self, param_name: str, error: Exception):
+        super().__init__(f"Could not calculate {param_name}: {error}")
+        self.param_name: str = param_name
+        self.error: Exception = error
+
+class ParameterSet(dict):
+    """
+    Parameters built on first access and then cached.
+
+    Each name has a factory building its Parameter. The cache is dropped
+    whenever version() changes, so parameters estimated from data are
+    rebuilt after the data changes. A factory that fails on its data, such as
+    on a zero denominator or a missing line item, issues a ParameterWarning
+    and the name then raises KeyError until the version changes.
+
+    The underlying dict holds the parameters built so far, while lookups,
+    iteration and len cover every name with a factory.
+    """
+
+    def __init__(self, factories: dict[str, Callable[[], Parameter]], version: Callable[[], int] = None):
+        super().__init__()
+        self.factories: dict[str, Callable[[], Parameter]] = dict(factories)
+        self.version: Callable[[], int] = version
+        self.failed: set[str] = set()
+        self.cache_version: int = version() if version is not None else None
+
+    def refresh(self) -> None:
+        if self.version is not None and self.version() != self.cache_version:
+            super().clear()
+            self.failed.clear()
+            self.cache_version = self.version()
+
+    def __getitem__(self, param_name: str) -> Parameter:
+        self.refresh()
+        if dict.__contains__(self, param_name):
+            return dict.__getitem__(self, param_name)
+        if param_name not in self.factories or param_name in self.failed:
+            raise KeyError(param_name)
+
+        try:
+            param: Parameter = self.factories[param_name]()
+        except (ValueError, ZeroDivisionError, IndexError, KeyError) as e:
+            self.failed.add(param_name)
+            warnings.warn(ParameterWarning(param_name, e), stacklevel=2)
+            raise KeyError(param_name) from e
+        dict.__setitem__(self, param_name, param)
+        return param
+
+    def __setitem__(self, param_name: str, param: Parameter) -> None:
+        self.refresh()
+        # A parameter set directly is kept as a factory, so it survives a refresh
+        self.factories[param_name] = lambda: param
+        self.failed.discard(param_name)
+        dict.__setitem__(self, param_name, param)
+
+    def __delitem__(self, param_name: str) -> None:
+        del self.factories[param_name]
+        self.failed.discard(param_name)
+        dict.pop(self, param_name, None)
+
+    def invalidate(self, param_name: str) -> None:
+        """
+        Drop a built parameter so its factory builds it again on next access.
+        """
+        self.failed.discard(param_name)
+        dict.pop(self, param_name, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.factories)
+
+    def __len__(self) -> int:
+        return len(self.factories)
+
+    def __contains__(self, param_name: object) -> bool:
+        return param_name in self.factories
+
+    def __repr__(self) -> str:
+        return f"ParameterSet({list(self.factories)})"
+
+    def get(self, param_name: str, default: Parameter = None) -> Parameter:
+        try:
+            return self[param_name]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.factories.keys()
+
+    def values(self) -> list[Parameter]:
+        return [param for _, param in self.items()]
+
+    def items(self) -> list[tuple[str, Parameter]]:
+        """
+        Build and list every parameter, leaving out those that could not be estimated.
+        """
+        items: list = []
+        for param_name in list(self.factories):
+            param: Parameter = self.get(param_name)
+            if param is not None:
+                items.append((param_name, param))
+        return items
@@ -0,0 +1,103 @@
+"""
+Checks of a reduced-precision simulation against a float64 reference on a subsample of its paths
+"""
+
+import warnings
+
+import numpy as np
+
+try:
+    from .ProjectionResults import ProjectionResults
+except ImportError:
+    # Imported as a top-level module by the desktop app
+    from ProjectionResults import ProjectionResults
+
+# Relative drift of a summary statistic beyond which a reduced-precision run is flagged
+DEFAULT_TOLERANCE: float = 1e-4
+
+class PrecisionWarning(UserWarning):
+    """
+    Issued when a reduced-precision simulation drifts from its float64 reference beyond the tolerance.
+    """
+
+def relative_drift(values: np.ndarray, reference: np.ndarray) -> float:
+    """
+    The largest relative difference between statistics and their reference, scaled by the
+    largest reference magnitude so values near zero, such as a crossing FCF, do not blow it up.
+    """
+    reference = np.asarray(reference, dtype=np.float64)
+    scale: float = float(np.nanmax(np.abs(reference))) if np.any(np.isfinite(reference)) else 0.0
+    difference: float = float(np.nanmax(np.abs(np.asarray(values, dtype=np.float64) - reference), initial=0.0))
+    return difference / scale if scale > 0 else difference
+
+def summary_statistics(values: np.ndarray, percentiles: tuple) -> dict[str, np.ndarray]:
+    values = np.asarray(values, dtype=np.float64)
+    return {'mean': np.nanmean(values, axis=0),
+            'std': np.nanstd(values, axis=0),
+            **{f'p{q:g}': np.nanpercentile(values, q, axis=0) for q in percentiles}}
+
+def precision_drift(engine, n_paths: int = 1000, seed=None, market: dict = None,
+                    labels: tuple = ('revenues', 'ebit', 'fcf'),
+                    percentiles: tuple = (5, 50, 95),
+                    tolerance: float = DEFAULT_TOLERANCE,
+                    warn: bool = True) -> dict:
+    """
+    Project a subsample of paths in the engine's dtype and in float64, and measure how far their summaries drift.
+
+    Both runs draw and project the same shocks from the seed, so the drift is
+    the rounding error of the reduced precision alone, free of Monte Carlo
+    noise. The drift of a statistic is its largest difference from the
+    reference, relative to the reference's largest magnitude across years.
+
+    Parameters:
+        engine (ProjectionEngine): The engine to check, usually with dtype float32.
+        n_paths (int): The number of paths in the subsample.
+        seed: The seed of the random number generator.
+        market (dict): Optional rf, rm, beta_u and roic to also compare the equity values at, as in dcf_paths.
+        labels (tuple): The line items to compare.
+        percentiles (tuple): The percentiles compared alongside the mean and standard deviation.
+        tolerance (float): The relative drift beyond which the check fails.
+        warn (bool): Whether to issue a PrecisionWarning when the check fails.
+    Returns:
+        report (dict): The dtype, the paths compared, the drift of each statistic of each
+            output, the largest drift, the tolerance and whether the drift is within it.
+    """
+    try:
+        from .ProjectionEngine import RATIO_PARAMS
+    except ImportError:
+        from ProjectionEngine import RATIO_PARAMS
+
+    horizon: int = len(engine.params['revenue_growth_e'].data)
+    years: np.ndarray = np.arange(1, horizon + 1)
+    runs: dict[np.dtype, ProjectionResults] = {}
+    for dtype in (np.dtype(np.float64), engine.dtype):
+        draws: dict[str, np.ndarray] = engine.draw_ratios(
+            n_paths, seed, out=np.empty((len(RATIO_PARAMS), n_paths, horizon), dtype=dtype))
+        runs[dtype] = engine.project_paths(draws, out=ProjectionResults(n_paths, years, dtype=dtype))
+    reference: ProjectionResults = runs[np.dtype(np.float64)]
+    reduced: ProjectionResults = runs[engine.dtype]
+
+    outputs: dict[str, tuple[np.ndarray, np.ndarray]] = {label: (reduced[label], reference[label]) for label in labels}
+    if market is not None:
+        outputs['equity_value'] = (engine.dcf_paths(**market, results=reduced)['equity_value'],
+                                   engine.dcf_paths(**market, results=reference)['equity_value'])
+
+    drift: dict[str, dict[str, float]] = {}
+    for name, (values, reference_values) in outputs.items():
+        statistics: dict[str, np.ndarray] = summary_statistics(values, percentiles)
+        reference_statistics: dict[str, np.ndarray] = summary_statistics(reference_values, percentiles)
+        drift[name] = {statistic: relative_drift(statistics[statistic], reference_statistics[statistic])
+                       for statistic in statistics}
+
+    max_drift: float = max(max(statistics.values()) for statistics in drift.values())
+    report: dict = {'dtype': engine.dtype.name,
+                    'n_paths': n_paths,
+                    'drift': drift,
+                    'max_drift': max_drift,
+                    'tolerance': tolerance,
+                    'within_tolerance': max_drift <= tolerance}
+    if warn and not report['within_tolerance']:
+        warnings.warn(PrecisionWarning(f"{engine.dtype.name} summaries drift up to {max_drift:.2e} "
+                                       f"from float64, beyond the tolerance of {tolerance:.0e}."),
+                      stacklevel=2)
+    return report
@@ -1,26 +1,86 @@
 
+from typing import Callable
+
 import numpy as np
-from scipy.optimize import root_scalar
-
-from .Enterprise import Enterprise
-from .Parameter import Parameter
-from .ProjectionUtils import (
-    calc_revenue_growth,
-    calc_cogs_revenue,
-    calc_r_and_d_revenue,
-    calc_sga_revenue,
-    calc_da_prior_nppe,
-    calc_nwc_revenue,
-    calc_net_capex_revenue,
-    calc_ucoe,
-    calc_coe,
-    calc_wacc,
-    calc_reinvestment_rate,
-    calc_growth
-)
+
+try:
+    from .Enterprise import Enterprise
+    from .Distributions import Distribution
+    from .Parameter import Parameter, ParameterSet
+    from .ProjectionResults import ProjectionResults
+    from .ProjectionUtils import (
+        calc_revenue_growth,
+        calc_cogs_revenue,
+        calc_r_and_d_revenue,
+        calc_sga_revenue,
+        calc_da_prior_nppe,
+        calc_nwc_revenue,
+        calc_net_capex_revenue,
+        calc_ucoe,
+        calc_coe,
+        calc_wacc,
+        calc_reinvestment_rate,
+        calc_growth,
+        project_revenue_paths,
+        project_fixed_asset_paths,
+        project_change_nwc_paths,
+        calc_enterprise_value
+    )
+    from .CashFlowCache import CashFlowCache
+    from .LeverageSolver import LeverageSolution, solve_leverage
+    from .RunningCovariance import RunningCovariance
+    from .Sampling import standard_normal_shocks
+    from .ValuationCache import ValuationCache
+    from .Instrumentation import instrumented
+except ImportError:
+    # Imported as a top-level module by the desktop app
+    from Enterprise import Enterprise
+    from Distributions import Distribution
+    from Parameter import Parameter, ParameterSet
+    from ProjectionResults import ProjectionResults
+    from ProjectionUtils import (
+        calc_revenue_growth,
+        calc_cogs_revenue,
+        calc_r_and_d_revenue,
+        calc_sga_revenue,
+        calc_da_prior_nppe,
+        calc_nwc_revenue,
+        calc_net_capex_revenue,
+        calc_ucoe,
+        calc_coe,
+        calc_wacc,
+        calc_reinvestment_rate,
+        calc_growth,
+        project_revenue_paths,
+        project_fixed_asset_paths,
+        project_change_nwc_paths,
+        calc_enterprise_value
+    )
+    from CashFlowCache import CashFlowCache
+    from LeverageSolver import LeverageSolution, solve_leverage
+    from RunningCovariance import RunningCovariance
+    from Sampling import standard_normal_shocks
+    from ValuationCache import ValuationCache
+    from Instrumentation import instrumented
+
+# Ratio parameters driving a projection, ordered as in the correlation matrix
+RATIO_PARAMS: tuple = ('revenue_growth_e',
+                       'cogs_revenue_e',
+                       'sga_revenue_e',
+                       'r_and_d_revenue_e',
+                       'da_nppe_e',
+                       'nwc_revenue_e',
+                       'net_capex_revenue_e')
+
+def line_item(label: str) -> property:
+    """
+    A read-only view of the filled paths of one line item in the engine's result store.
+    """
+    return property(lambda self: self.results[label], doc=f"The projected {label} paths.")
 
 class ProjectionEngine:
 
+    @instrumented('ProjectionEngine.__init__')
     def __init__(self, enterprise: Enterprise,
                  revenue_growth_e: np.ndarray = np.ndarray(0),
                  cogs_revenue_e: np.ndarray = np.ndarray(0),
@@ -28,92 +88,109 @@ class ProjectionEngine:
                  r_and_d_revenue_e: np.ndarray = np.ndarray(0),
                  da_nppe_e: np.ndarray = np.ndarray(0),
                  nwc_revenue_e: np.ndarray = np.ndarray(0),
-                 net_capex_revenue_e: np.ndarray = np.ndarray(0)):
+                 net_capex_revenue_e: np.ndarray = np.ndarray(0),
+                 distributions: dict[str, str | Distribution | Callable] = None,
+                 dtype: np.dtype = np.float64):
         self.correlation_matrix: np.ndarray = None
+        self.ratio_covariance: RunningCovariance = None
+        self.ratio_history: np.ndarray = None
+        self.last_leverage: np.ndarray = None
         self.enterprise: Enterprise = enterprise
-        self.params: dict = {}
+        # Distribution of each ratio parameter's draws, Normal unless named here
+        self.distributions: dict[str, str | Distribution | Callable] = dict(distributions or {})
+        # Precision of simulated draws and paths; float32 halves their memory traffic
+        self.dtype: np.dtype = np.dtype(dtype)
+        if not np.issubdtype(self.dtype, np.floating):
+            raise ValueError(f"The simulation dtype should be a floating point type, not {self.dtype}.")
 
         # Check for empty data
-        if (self.enterprise.income_statement.empty or
-                self.enterprise.balance_sheet.empty or
-                self.enterprise.cash_flow_statement.empty):
+        if self.enterprise.empty:
             raise ValueError("Cannot calculate correlation with empty data")
 
-        # Initialize all parameters at once instead of individual assignments
+        # Historical ratios, estimated on first access and again after the statements change
         param_functions = {
-            'revenue_growth_a': lambda: calc_revenue_growth(
-                self.enterprise.income_statement.loc['Revenues']),
-
-            'cogs_revenue_a': lambda: calc_cogs_revenue(
-                self.enterprise.income_statement.loc['Revenues'],
-                self.enterprise.income_statement.loc['Cost of Goods Sold']),
-
-            'r_and_d_revenue_a': lambda: calc_r_and_d_revenue(
-                self.enterprise.income_statement.loc['Revenues'],
-                self.enterprise.income_statement.loc['R&D Exp.']),
-
-            'sga_revenue_a': lambda: calc_sga_revenue(
-                self.enterprise.income_statement.loc['Revenues'],
-                self.enterprise.income_statement.loc['Selling General & Admin Exp.']),
-
-            'da_nppe_a': lambda: calc_da_prior_nppe(
-                self.enterprise.cash_flow_statement.loc['Depreciation & Amort.'],
-                self.enterprise.balance_sheet.loc['Net Property Plant & Equipment']),
-
-            'nwc_revenue_a': lambda: calc_nwc_revenue(
-                self.enterprise.income_statement.loc['Revenues'],
-                self.enterprise.balance_sheet.loc['Total Cash & ST Investments'],
-                self.enterprise.balance_sheet.loc['Total Current Assets'],
-                self.enterprise.balance_sheet.loc['Current Portion of Long Term Debt'],
-                self.enterprise.balance_sheet.loc['Total Current Liabilities']),
-
-            'net_capex_revenue_a': lambda: calc_net_capex_revenue(
-                self.enterprise.income_statement.loc['Revenues'],
-                self.enterprise.cash_flow_statement.loc['Cash from Investing'],
-                self.enterprise.cash_flow_statement.loc['Depreciation & Amort.'])
+            'revenue_growth_a': lambda statements: calc_revenue_growth(
+                statements['Revenues']),
+
+            'cogs_revenue_a': lambda statements: calc_cogs_revenue(
+                statements['Revenues'],
+                statements['Cost of Goods Sold']),
+
+            'r_and_d_revenue_a': lambda statements: calc_r_and_d_revenue(
+                statements['Revenues'],
+                statements['R&D Exp.']),
+
+            'sga_revenue_a': lambda statements: calc_sga_revenue(
+                statements['Revenues'],
+                statements['Selling General & Admin Exp.']),
+
+            'da_nppe_a': lambda statements: calc_da_prior_nppe(
+                statements['Depreciation & Amort.'],
+                statements['Net Property Plant & Equipment']),
+
+            'nwc_revenue_a': lambda statements: calc_nwc_revenue(
+                statements['Revenues'],
+                statements['Total Cash & ST Investments'],
+                statements['Total Current Assets'],
+                statements['Current Portion of Long Term Debt'],
+                statements['Total Current Liabilities']),
+
+            'net_capex_revenue_a': lambda statements: calc_net_capex_revenue(
+                statements['Revenues'],
+                statements['Cash from Investing'],
+                statements['Depreciation & Amort.'])
         }
-
-        # Run calculations and store results in a single params dictionary
-        for param_name, calculate_func in param_functions.items():
+        estimates: dict[str, np.ndarray] = {'revenue_growth_e': revenue_growth_e,
+                                            'cogs_revenue_e': cogs_revenue_e,
+                                            'r_and_d_revenue_e': r_and_d_revenue_e,
+                                            'sga_revenue_e': sga_revenue_e,
+                                            'da_nppe_e': da_nppe_e,
+                                            'nwc_revenue_e': nwc_revenue_e,
+                                            'net_capex_revenue_e': net_capex_revenue_e}
+
+        factories: dict = {param_name: self.historical_factory(calculate_func)
+                           for param_name, calculate_func in param_functions.items()}
+        factories.update({param_name: self.estimate_factory(data, param_name[:-2] + '_a')
+                          for param_name, data in estimates.items()})
+        self.params: ParameterSet = ParameterSet(factories, version=lambda: self.enterprise.statements_version)
+
+        horizon: int = len(revenue_growth_e)
+        self.results: ProjectionResults = ProjectionResults(n_paths=1, years=np.arange(1, horizon + 1),
+                                                            dtype=self.dtype)
+
+    def historical_factory(self, calculate_func: Callable) -> Callable[[], Parameter]:
+        return lambda: Parameter(calculate_func(self.enterprise.statements))
+
+    def estimate_factory(self, data: np.ndarray, historical_name: str) -> Callable[[], Parameter]:
+        def build() -> Parameter:
+            # Without a historical estimate the dispersion is unknown; its warning has been issued
             try:
-                self.params[param_name] = Parameter(calculate_func())
-            except (ValueError, ZeroDivisionError, IndexError) as e:
-                print(f"Warning: Could not calculate {param_name}: {e}")
-
-        self.params['revenue_growth_e'] = Parameter(data=revenue_growth_e,
-                                                    std=self.params['revenue_growth_a'].std)
-        self.params['cogs_revenue_e'] = Parameter(data=cogs_revenue_e,
-                                                  std=self.params['cogs_revenue_a'].std)
-        self.params['r_and_d_revenue_e'] = Parameter(data=r_and_d_revenue_e,
-                                                     std=self.params['r_and_d_revenue_a'].std)
-        self.params['sga_revenue_e'] = Parameter(data=sga_revenue_e,
-                                                 std=self.params['sga_revenue_a'].std)
-        self.params['da_nppe_e'] = Parameter(data=da_nppe_e,
-                                             std=self.params['da_nppe_a'].std)
-        self.params['nwc_revenue_e'] = Parameter(data=nwc_revenue_e,
-                                                 std=self.params['nwc_revenue_a'].std)
-        self.params['net_capex_revenue_e'] = Parameter(data=net_capex_revenue_e,
-                                                       std=self.params['net_capex_revenue_a'].std)
-
-        self.revenues_e: list[list] = []
-        self.cogs_e: list[list]  = []
-        self.gross_profit_e: list[list]  = []
-        self.sga_e: list[list]  = []
-        self.r_and_d_e: list[list]  = []
-        self.ebitda_e: list[list]  = []
-        self.da_e: list[list]  = []
-        self.ebit_e: list[list]  = []
-        self.tax_e: list[list]  = []
-        self.capex_e: list[list]  = []
-        self.nppe_e: list[list]  = []
-        self.change_nwc_e: list[list]  = []
-        self.fcf_e: list[list]  = []
-        self.pv_fcf_e: list[list]  = []
-
+                historical: Parameter = self.params[historical_name]
+                std, history = historical.std, historical.data
+            except KeyError:
+                std, history = np.nan, None
+            return Parameter(data=data, std=std,
+                             distribution=self.distributions.get(historical_name[:-2] + '_e', 'Normal'),
+                             history=history)
+        return build
+
+    def set_distribution(self, param_name: str, distribution: str | Distribution | Callable) -> None:
+        """
+        Draw a ratio parameter from another distribution, see make_distribution.
+
+        Parameters:
+            param_name (str): The ratio parameter, one of RATIO_PARAMS.
+            distribution (str | Distribution | Callable): The distribution's name, the distribution
+                itself, or a callable building it from the projected values and standard deviation.
+        """
+        if param_name not in RATIO_PARAMS:
+            raise KeyError(param_name)
+        self.distributions[param_name] = distribution
+        self.params.invalidate(param_name)
+
+    @instrumented('ProjectionEngine.calc_correlation')
     def calc_correlation(self) -> None:
-        if (self.enterprise.income_statement.empty or
-            self.enterprise.balance_sheet.empty or
-            self.enterprise.cash_flow_statement.empty):
+        if self.enterprise.empty:
             raise ValueError("Cannot calculate correlation with empty data")
 
         revenue_growth: np.ndarray = self.params['revenue_growth_a'].data
@@ -131,145 +208,391 @@ class ProjectionEngine:
                                              da_nppe,
                                              nwc_revenue,
                                              net_capex_revenue])
-        self.correlation_matrix = np.corrcoef(data_matrix)
-
+        self.ratio_history = data_matrix.T
+        self.ratio_covariance = RunningCovariance.from_data(self.ratio_history)
+        self.correlation_matrix = self.ratio_covariance.correlation()
+
+    @instrumented('ProjectionEngine.roll_correlation')
+    def roll_correlation(self, ratios: np.ndarray, window: int = None) -> None:
+        """
+        Absorb a new year of historical ratios without re-estimating from the first year.
+
+        Parameters:
+            ratios (np.ndarray): The new year's ratios, ordered as RATIO_PARAMS.
+            window (int): The most years to keep; the oldest years are dropped beyond it.
+        """
+        if self.ratio_covariance is None:
+            self.calc_correlation()
+
+        ratios: np.ndarray = np.asarray(ratios, dtype=np.float64)
+        if ratios.shape != (len(RATIO_PARAMS),):
+            raise IndexError(f"Expected {len(RATIO_PARAMS)} ratios, one per parameter.")
+
+        self.ratio_covariance.add(ratios)
+        self.ratio_history = np.vstack([self.ratio_history, ratios])
+        while window is not None and len(self.ratio_history) > window:
+            self.ratio_covariance.remove(self.ratio_history[0])
+            self.ratio_history = self.ratio_history[1:]
+        self.correlation_matrix = self.ratio_covariance.correlation()
+
+    revenues_e = line_item('revenues')
+    cogs_e = line_item('cogs')
+    gross_profit_e = line_item('gross_profit')
+    sga_e = line_item('sga')
+    r_and_d_e = line_item('r_and_d')
+    ebitda_e = line_item('ebitda')
+    da_e = line_item('da')
+    ebit_e = line_item('ebit')
+    tax_e = line_item('tax')
+    capex_e = line_item('capex')
+    nppe_e = line_item('nppe')
+    change_nwc_e = line_item('change_nwc')
+    fcf_e = line_item('fcf')
+    pv_fcf_e = line_item('pv_fcf')
+
+    @instrumented('ProjectionEngine.project_stmt')
     def project_stmt(self) -> None:
-        self.revenues_e.append(self.project_revenue())
-        self.cogs_e.append(self.project_cogs())
-        self.gross_profit_e.append(self.project_gross_profit())
-        self.sga_e.append(self.project_sga())
-        self.r_and_d_e.append(self.project_r_and_d())
-        self.ebitda_e.append(self.project_ebitda())
-        fixed_assets = self.project_fixed_assets()
-        self.da_e.append(fixed_assets[0])
-        self.ebit_e.append(self.project_ebit())
-        self.tax_e.append(self.project_tax())
-        self.capex_e.append(fixed_assets[1])
-        self.nppe_e.append(fixed_assets[2])
-        self.change_nwc_e.append(self.project_change_net_working_capital())
-        self.fcf_e.append(self.project_fcf())
-
-    def project_revenue(self) -> list:
-        iter_rev_e: list = []
-        revenue0: float = self.enterprise.income_statement.loc['Revenues'].iloc[-1]
-
-        for growth_rate in self.params['revenue_growth_e'].data:
-            revenue = revenue0 * (1 + growth_rate)
-            iter_rev_e.append(revenue)
-            revenue0 = revenue
-
-        return iter_rev_e
-
-    def project_cogs(self) -> list:
-        iter_cogs_e: list = np.multiply(np.array(self.revenues_e[-1]),
-                                            self.params['cogs_revenue_e'].data).tolist()
-        return iter_cogs_e
-
-    def project_sga(self) -> list:
-        iter_sga_e: list = np.multiply(np.array(self.revenues_e[-1]),
-                                           self.params['sga_revenue_e'].data).tolist()
-        return iter_sga_e
-
-    def project_r_and_d(self) -> list:
-        iter_r_and_d_e: list = np.multiply(np.array(self.revenues_e[-1]),
-                                               self.params['r_and_d_revenue_e'].data).tolist()
-        return iter_r_and_d_e
-
-    def project_fixed_assets(self) -> tuple[list, list, list]:
-        iter_da_e: list = []
-        iter_capex_e: list = []
-        iter_nppe_e: list = []
-        nppe0: float = self.enterprise.balance_sheet.loc['Net Property Plant & Equipment'].iloc[-1]
-
-        for i, da_ratio in enumerate(self.params['da_nppe_e'].data):
-            da: float = da_ratio * nppe0
-            iter_da_e.append(da)
-
-            net_capex: float = np.multiply(self.params['net_capex_revenue_e'].data[i],
-                                           np.array(self.revenues_e[-1][i]))
-            capex: float = net_capex + da
-            iter_capex_e.append(capex)
-
-            nppe: float = nppe0 - da + capex
-            iter_nppe_e.append(nppe)
-
-            nppe0 = nppe
-
-        return iter_da_e, iter_capex_e, iter_nppe_e
-
-    def project_change_net_working_capital(self) -> list:
-        iter_change_nwc_e: list = []
-        cce0: float = self.enterprise.balance_sheet.loc['Total Cash & ST Investments'].iloc[-1]
-        ca0: float = self.enterprise.balance_sheet.loc['Total Current Assets'].iloc[-1]
-        cld0: float = self.enterprise.balance_sheet.loc['Current Portion of Long Term Debt'].iloc[-1]
-        cl0: float = self.enterprise.balance_sheet.loc['Total Current Liabilities'].iloc[-1]
-        nwc0: float = (ca0 - cce0) - (cl0 - cld0)
-
-        for i, nwc_ratio in enumerate(self.params['nwc_revenue_e'].data):
-            nwc: float = nwc_ratio * self.revenues_e[-1][i]
-            change_nwc: float = nwc - nwc0
-            iter_change_nwc_e.append(change_nwc)
-            nwc0 = nwc
-
-        return iter_change_nwc_e
-
-    def project_gross_profit(self) -> list:
-        iter_gross_profit_e: list = (np.array(self.revenues_e[-1])
-                                     - np.array(self.cogs_e[-1])).tolist()
-        return iter_gross_profit_e
-
-    def project_ebitda(self) -> list:
-        iter_ebitda_e: list = (np.array(self.gross_profit_e[-1])
-                               - np.array(self.sga_e[-1])
-                               - np.array(self.r_and_d_e[-1])).tolist()
-        return iter_ebitda_e
-
-    def project_ebit(self) -> list:
-        iter_ebit_e: list = (np.array(self.ebitda_e[-1])
-                             + np.array(self.da_e[-1])).tolist()
-        return iter_ebit_e
-
-    def project_tax(self):
-        iter_tax_e: list = (np.array(self.ebit_e[-1]) * self.enterprise.stat_tax).tolist()
-        return iter_tax_e
-
-    def project_fcf(self) -> list:
-        iter_fcf_e: list = (np.array(self.ebit_e[-1])
-                            -np.array(self.tax_e[-1])
-                            +np.array(self.da_e)
-                            -np.array(self.capex_e)
-                            -np.array(self.change_nwc_e)).tolist()
-        return iter_fcf_e
-
-    def dcf_model(self, rf: float, rm: float, beta_u: float, roic: float) -> None:
+        draws: dict[str, np.ndarray] = {param_name: self.params[param_name].data[np.newaxis, :]
+                                        for param_name in RATIO_PARAMS}
+        self.project_paths(draws, out=self.results)
+
+    @instrumented('ProjectionEngine.project_revenue')
+    def project_revenue(self) -> np.ndarray:
+        revenue0: float = self.enterprise.statements.last('Revenues')
+        return project_revenue_paths(revenue0, self.params['revenue_growth_e'].data)
+
+    @instrumented('ProjectionEngine.project_cogs')
+    def project_cogs(self, revenues: np.ndarray = None) -> np.ndarray:
+        revenues = self.revenues_e[-1] if revenues is None else revenues
+        return np.multiply(revenues, self.params['cogs_revenue_e'].data)
+
+    @instrumented('ProjectionEngine.project_sga')
+    def project_sga(self, revenues: np.ndarray = None) -> np.ndarray:
+        revenues = self.revenues_e[-1] if revenues is None else revenues
+        return np.multiply(revenues, self.params['sga_revenue_e'].data)
+
+    @instrumented('ProjectionEngine.project_r_and_d')
+    def project_r_and_d(self, revenues: np.ndarray = None) -> np.ndarray:
+        revenues = self.revenues_e[-1] if revenues is None else revenues
+        return np.multiply(revenues, self.params['r_and_d_revenue_e'].data)
+
+    @instrumented('ProjectionEngine.project_fixed_assets')
+    def project_fixed_assets(self, revenues: np.ndarray = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        revenues = self.revenues_e[-1] if revenues is None else revenues
+        nppe0: float = self.enterprise.statements.last('Net Property Plant & Equipment')
+        net_capex: np.ndarray = np.multiply(revenues, self.params['net_capex_revenue_e'].data)
+        return project_fixed_asset_paths(nppe0, self.params['da_nppe_e'].data, net_capex)
+
+    @instrumented('ProjectionEngine.project_change_net_working_capital')
+    def project_change_net_working_capital(self, revenues: np.ndarray = None) -> np.ndarray:
+        revenues = self.revenues_e[-1] if revenues is None else revenues
+        nwc: np.ndarray = np.multiply(revenues, self.params['nwc_revenue_e'].data)
+        return project_change_nwc_paths(self.last_nwc(), nwc)
+
+    def last_nwc(self) -> float:
+        cce0: float = self.enterprise.statements.last('Total Cash & ST Investments')
+        ca0: float = self.enterprise.statements.last('Total Current Assets')
+        cld0: float = self.enterprise.statements.last('Current Portion of Long Term Debt')
+        cl0: float = self.enterprise.statements.last('Total Current Liabilities')
+        return (ca0 - cce0) - (cl0 - cld0)
+
+    @instrumented('ProjectionEngine.project_gross_profit')
+    def project_gross_profit(self) -> np.ndarray:
+        return self.revenues_e[-1] - self.cogs_e[-1]
+
+    @instrumented('ProjectionEngine.project_ebitda')
+    def project_ebitda(self) -> np.ndarray:
+        return self.gross_profit_e[-1] - self.sga_e[-1] - self.r_and_d_e[-1]
+
+    @instrumented('ProjectionEngine.project_ebit')
+    def project_ebit(self) -> np.ndarray:
+        return self.ebitda_e[-1] + self.da_e[-1]
+
+    @instrumented('ProjectionEngine.project_tax')
+    def project_tax(self) -> np.ndarray:
+        return self.ebit_e[-1] * self.enterprise.stat_tax
+
+    @instrumented('ProjectionEngine.project_fcf')
+    def project_fcf(self) -> np.ndarray:
+        return (self.ebit_e[-1]
+                - self.tax_e[-1]
+                + self.da_e[-1]
+                - self.capex_e[-1]
+                - self.change_nwc_e[-1])
+
+    @instrumented('ProjectionEngine.draw_ratios')
+    def draw_ratios(self, n_paths: int, seed: int = None, out: np.ndarray = None,
+                    sampling: str = 'random', n_replicates: int = None) -> dict[str, np.ndarray]:
+        """
+        Draw all ratio paths at once from the projected parameters.
+
+        Each path is centred on the parameter's projected data, year by year, and
+        shocked by the historical standard deviation through the parameter's
+        distribution, Normal by default. If the correlation matrix has been
+        calculated, the shocks are correlated across ratios, and other
+        distributions keep that dependence through their quantile functions.
+
+        Parameters:
+            n_paths (int): The number of paths to draw.
+            seed (int): The seed of the random number generator.
+            out (np.ndarray): An optional (ratio, n_paths, horizon) array to draw into,
+                ratios ordered as RATIO_PARAMS, whose dtype the draws are computed in;
+                the engine's dtype by default.
+            sampling (str): The design of the shocks, one of SAMPLING_METHODS, see standard_normal_shocks.
+            n_replicates (int): The independent blocks of a 'sobol' or 'lhs' design.
+        Returns:
+            draws (dict[str, np.ndarray]): A (n_paths, horizon) array per ratio parameter.
+        """
+        if n_paths < 1:
+            raise ValueError("The number of paths should be at least one.")
+
+        horizon: int = len(self.params['revenue_growth_e'].data)
+        for param_name in RATIO_PARAMS:
+            if len(self.params[param_name].data) != horizon:
+                raise IndexError("All projected ratios should have the same horizon.")
+
+        if out is None:
+            out = np.empty((len(RATIO_PARAMS), n_paths, horizon), dtype=self.dtype)
+        # The shocks are drawn in float64, so every dtype sees the same shocks for a seed
+        shocks: np.ndarray = standard_normal_shocks((len(RATIO_PARAMS), n_paths, horizon),
+                                                    sampling, seed, n_replicates).astype(out.dtype, copy=False)
+        if self.correlation_matrix is not None:
+            factor: np.ndarray = correlation_factor(self.correlation_matrix).astype(out.dtype)
+            shocks = np.tensordot(factor, shocks, axes=1)
+
+        draws: dict[str, np.ndarray] = {}
+        for i, param_name in enumerate(RATIO_PARAMS):
+            draws[param_name] = self.params[param_name].sampler.from_normal(shocks[i], out=out[i])
+        return draws
+
+    @instrumented('ProjectionEngine.simulate')
+    def simulate(self, n_paths: int, seed: int = None,
+                 out: ProjectionResults = None, sampling: str = 'random',
+                 n_replicates: int = None) -> ProjectionResults:
+        """
+        Project every line item from revenue through FCF for many paths in one pass.
+
+        The draws and paths are computed in the engine's dtype from shocks drawn
+        in float64, so a float32 run follows the paths of a float64 run with the
+        same seed to within its rounding error.
+
+        Parameters:
+            n_paths (int): The number of paths to simulate.
+            seed (int): The seed of the random number generator.
+            out (ProjectionResults): An optional store to append the paths to.
+            sampling (str): The design of the shocks, see draw_ratios.
+            n_replicates (int): The independent blocks of a 'sobol' or 'lhs' design.
+        Returns:
+            results (ProjectionResults): The store holding the simulated paths.
+        """
+        draws: dict[str, np.ndarray] = self.draw_ratios(n_paths, seed, sampling=sampling,
+                                                        n_replicates=n_replicates)
+        return self.project_paths(draws, out=out)
+
+    @instrumented('ProjectionEngine.project_paths')
+    def project_paths(self, draws: dict[str, np.ndarray],
+                      out: ProjectionResults = None) -> ProjectionResults:
+        """
+        Project the statements for a batch of ratio paths, writing them in place into a result store.
+
+        Parameters:
+            draws (dict[str, np.ndarray]): A (n_paths, horizon) array per ratio parameter.
+            out (ProjectionResults): An optional store to append the paths to.
+        Returns:
+            results (ProjectionResults): The store holding the projected paths.
+        """
+        n_paths, horizon = np.shape(draws['revenue_growth_e'])
+        results: ProjectionResults = out
+        if results is None:
+            results = ProjectionResults(n_paths=n_paths, years=np.arange(1, horizon + 1), dtype=self.dtype)
+        block: slice = results.add_paths(n_paths)
+        rows: dict[str, np.ndarray] = {label: results[label, block] for label in results.labels}
+
+        revenue0: float = self.enterprise.statements.last('Revenues')
+        revenues: np.ndarray = project_revenue_paths(revenue0, draws['revenue_growth_e'], out=rows['revenues'])
+
+        np.multiply(revenues, draws['cogs_revenue_e'], out=rows['cogs'])
+        np.multiply(revenues, draws['sga_revenue_e'], out=rows['sga'])
+        np.multiply(revenues, draws['r_and_d_revenue_e'], out=rows['r_and_d'])
+        np.subtract(revenues, rows['cogs'], out=rows['gross_profit'])
+        np.subtract(rows['gross_profit'], rows['sga'], out=rows['ebitda'])
+        rows['ebitda'] -= rows['r_and_d']
+
+        nppe0: float = self.enterprise.statements.last('Net Property Plant & Equipment')
+        project_fixed_asset_paths(nppe0,
+                                  draws['da_nppe_e'],
+                                  revenues * draws['net_capex_revenue_e'],
+                                  out=(rows['da'], rows['capex'], rows['nppe']))
+
+        project_change_nwc_paths(self.last_nwc(),
+                                 revenues * draws['nwc_revenue_e'],
+                                 out=rows['change_nwc'])
+
+        np.add(rows['ebitda'], rows['da'], out=rows['ebit'])
+        np.multiply(rows['ebit'], self.enterprise.stat_tax, out=rows['tax'])
+        np.subtract(rows['ebit'], rows['tax'], out=rows['fcf'])
+        rows['fcf'] += rows['da']
+        rows['fcf'] -= rows['capex']
+        rows['fcf'] -= rows['change_nwc']
+
+        return results
+
+    @instrumented('ProjectionEngine.dcf_model')
+    def dcf_model(self, rf: float, rm: float, beta_u: float, roic: float,
+                  warm_start: bool = False, cache: ValuationCache = None) -> None:
+        if cache is not None:
+            key: str = cache.key(self, rf, rm, beta_u, roic)
+            entry: dict = cache.get(key)
+            if entry is not None:
+                block: slice = self.results.add_paths(1)
+                self.results.data[:, block] = entry['projection']
+                self.enterprise.enterprise_value = entry['enterprise_value']
+                self.enterprise.equity_value = entry['equity_value']
+                # Warm-start the next solve from this scenario's leverage, as if it had been solved
+                self.last_leverage = entry['leverage'].copy()
+                return
+
         self.project_stmt()
+        cash_flows: CashFlowCache = self.cash_flows(roic, paths=slice(-1, None))
+        valuation: dict[str, np.ndarray] = self.value_cash_flows(cash_flows, rf, rm, beta_u, warm_start)
+        if not valuation['converged'][0]:
+            raise ValueError("Could not solve for a consistent leverage.")
+
+        self.pv_fcf_e[-1] = cash_flows.pv_fcf(valuation['wacc'])[0]
+        self.enterprise.enterprise_value = float(valuation['enterprise_value'][0])
+        self.enterprise.equity_value = self.enterprise.enterprise_value - self.enterprise.debt_value
+
+        if cache is not None:
+            cache.put(key, {'projection': self.results.data[:, len(self.results) - 1:len(self.results)].copy(),
+                            'enterprise_value': self.enterprise.enterprise_value,
+                            'equity_value': self.enterprise.equity_value,
+                            'leverage': self.last_leverage.copy()})
+
+    @instrumented('ProjectionEngine.dcf_paths')
+    def dcf_paths(self, rf: float, rm: float, beta_u: float, roic: float,
+                  results: ProjectionResults = None, warm_start: bool = False,
+                  maxiter: int = 100) -> dict[str, np.ndarray]:
+        """
+        Value every projected path at its own consistent leverage in one batched solve.
+
+        Parameters:
+            rf (float): The expected risk-free return.
+            rm (float): The expected market return.
+            beta_u (float): The unlevered beta.
+            roic (float): The return on invested capital.
+            results (ProjectionResults): The projected paths, the engine's result store by default.
+            warm_start (bool): Whether to start the solve from the last solution.
+            maxiter (int): The maximum number of solver iterations.
+        Returns:
+            valuation (dict[str, np.ndarray]): The leverage, WACC, growth rate, enterprise value,
+                equity value, convergence mask and iteration count of each path.
+        """
+        results = self.results if results is None else results
+        cash_flows: CashFlowCache = self.cash_flows(roic, results)
+        valuation: dict[str, np.ndarray] = self.value_cash_flows(cash_flows, rf, rm, beta_u,
+                                                                 warm_start, maxiter)
+        results['pv_fcf'][...] = cash_flows.pv_fcf(valuation['wacc'])
+        return valuation
+
+    @instrumented('ProjectionEngine.cash_flows')
+    def cash_flows(self, roic: float, results: ProjectionResults = None,
+                   paths: slice = slice(None)) -> CashFlowCache:
+        """
+        Collect the projected FCF and terminal cash flow of some paths, which do not depend on leverage.
+
+        Parameters:
+            roic (float): The return on invested capital.
+            results (ProjectionResults): The projected paths, the engine's result store by default.
+            paths (slice): The paths to collect, all paths by default.
+        Returns:
+            cash_flows (CashFlowCache): The cash flows to discount.
+        """
+        results = self.results if results is None else results
+        with np.errstate(divide='ignore', invalid='ignore'):
+            reinvestment_rate: np.ndarray = calc_reinvestment_rate(results['capex', paths, -1],
+                                                                   results['da', paths, -1],
+                                                                   results['r_and_d', paths, -1],
+                                                                   results['change_nwc', paths, -1],
+                                                                   results['ebit', paths, -1],
+                                                                   self.enterprise.stat_tax)
+        growth_rate: np.ndarray = calc_growth(roic, reinvestment_rate)
+        return CashFlowCache(results['fcf', paths], growth_rate)
+
+    @instrumented('ProjectionEngine.value_cash_flows')
+    def value_cash_flows(self, cash_flows: CashFlowCache, rf: float, rm: float, beta_u: float,
+                         warm_start: bool = False, maxiter: int = 100) -> dict[str, np.ndarray]:
+        """
+        Solve the consistent leverage of cached cash flows, only re-discounting on each iteration.
+
+        Parameters:
+            cash_flows (CashFlowCache): The cash flows to discount.
+            rf (float): The expected risk-free return.
+            rm (float): The expected market return.
+            beta_u (float): The unlevered beta.
+            warm_start (bool): Whether to start the solve from the last solution.
+            maxiter (int): The maximum number of solver iterations.
+        Returns:
+            valuation (dict[str, np.ndarray]): The leverage, WACC, growth rate, enterprise value,
+                equity value, convergence mask and iteration count of each path.
+        """
         ucoe: float = calc_ucoe(rf, rm, beta_u)
         cod: float = self.enterprise.cod
+        x0: np.ndarray = None
+        if (warm_start and self.last_leverage is not None
+                and self.last_leverage.shape == (cash_flows.n_paths,)):
+            x0 = self.last_leverage
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            solution: LeverageSolution = solve_leverage(
+                lambda begin_lev, paths: self.lev_difference(begin_lev, ucoe, cod, cash_flows, paths),
+                cash_flows.n_paths, maxiter=maxiter, x0=x0)
+
+            coe: np.ndarray = calc_coe(ucoe, cod, solution.leverage)
+            wacc: np.ndarray = calc_wacc(coe, cod, solution.leverage, self.enterprise.stat_tax)
+            enterprise_value: np.ndarray = cash_flows.enterprise_value(wacc)
+        self.last_leverage = solution.leverage
+
+        return {'leverage': solution.leverage,
+                'wacc': wacc,
+                'growth_rate': cash_flows.growth_rate,
+                'enterprise_value': enterprise_value,
+                'equity_value': enterprise_value - self.enterprise.debt_value,
+                'converged': solution.converged,
+                'iterations': solution.iterations}
+
+    @instrumented('ProjectionEngine.project_enterprise_value')
+    def project_enterprise_value(self, wacc: float, growth_rate: float,
+                                 fcf: np.ndarray = None) -> float:
+        fcf = self.fcf_e[-1] if fcf is None else fcf
+        return calc_enterprise_value(fcf, wacc, growth_rate)
+
+    def lev_difference(self, begin_lev: np.ndarray, ucoe: float, cod: float,
+                       cash_flows: CashFlowCache, paths: np.ndarray = None) -> np.ndarray:
+        coe: np.ndarray = calc_coe(ucoe, cod, begin_lev)
+        wacc: np.ndarray = calc_wacc(coe, cod, begin_lev, self.enterprise.stat_tax)
+
+        enterprise_value: np.ndarray = cash_flows.enterprise_value(wacc, paths)
+        debt_value: float = self.enterprise.debt_value
 
-        reinvestment_rate: float = calc_reinvestment_rate(self.capex_e[-1][-1],
-                                                          self.da_e[-1][-1],
-                                                          self.r_and_d_e[-1][-1],
-                                                          self.change_nwc_e[-1][-1],
-                                                          self.ebit_e[-1][-1],
-                                                          self.enterprise.stat_tax)
-        growth_rate: float = calc_growth(roic, reinvestment_rate)
-
-        fina_lev = root_scalar(
-            lambda begin_lev: self.lev_difference(begin_lev, ucoe, cod, growth_rate),
-            bracket=[0.0000, 0.9999], method='brentq')
-
-
-    def project_enterprise_value(self) -> float:
-        pass
+        ending_lev: np.ndarray = debt_value / enterprise_value
 
-    def lev_difference(self, begin_lev: float, ucoe: float, cod: float, growth_rate: float) -> float:
-        coe: float = calc_coe(ucoe, cod, begin_lev)
-        wacc: float = calc_wacc(coe, cod, begin_lev, self.enterprise.stat_tax)
+        return ending_lev - begin_lev
 
-        enterprise_value: float = self.project_enterprise_value()
-        debt_value: float = self.enterprise.debt_value
 
-        ending_lev: float = debt_value / enterprise_value
+def correlation_factor(correlation_matrix: np.ndarray) -> np.ndarray:
+    """
+    Factor a correlation matrix so that factor @ factor.T reproduces it.
 
-        return ending_lev - begin_lev
+    Historical correlation matrices are estimated from only a few years of data and
+    are usually singular, so an eigen-decomposition with clipped eigenvalues is used
+    instead of a Cholesky decomposition. Undefined correlations are treated as zero.
 
+    Parameters:
+        correlation_matrix (np.ndarray): The correlation matrix.
+    Returns:
+        factor (np.ndarray): The factor of the correlation matrix.
+    """
+    corr: np.ndarray = np.nan_to_num(correlation_matrix, nan=0.0)
+    np.fill_diagonal(corr, 1.0)
+    eigenvalues, eigenvectors = np.linalg.eigh(corr)
+    return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
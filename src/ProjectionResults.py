@@ -0,0 +1,137 @@
+"""
+A class storing projected statements as a line item x path x year array
+"""
+
+import numpy as np
+
+# Line items of a projected statement, in storage order
+LINE_ITEMS: tuple = ('revenues',
+                     'cogs',
+                     'gross_profit',
+                     'sga',
+                     'r_and_d',
+                     'ebitda',
+                     'da',
+                     'ebit',
+                     'tax',
+                     'capex',
+                     'nppe',
+                     'change_nwc',
+                     'fcf',
+                     'pv_fcf')
+
+class ProjectionResults:
+
+    def __init__(self, n_paths: int, years: np.ndarray,
+                 labels: tuple = LINE_ITEMS,
+                 dtype: np.dtype = np.float64):
+        self.labels: tuple = tuple(labels)
+        self.years: np.ndarray = np.asarray(years)
+        self.label_index: dict[str, int] = {label: i for i, label in enumerate(self.labels)}
+        self.year_index: dict = {year: i for i, year in enumerate(self.years.tolist())}
+        self.data: np.ndarray = np.full((len(self.labels), max(n_paths, 0), len(self.years)),
+                                        np.nan, dtype=dtype)
+        self.n_paths: int = 0
+
+    @classmethod
+    def from_buffer(cls, data: np.ndarray, years: np.ndarray,
+                    labels: tuple = LINE_ITEMS, n_paths: int = 0) -> 'ProjectionResults':
+        """
+        Wrap a (line item, path, year) array, such as one in shared memory, as a store without copying it.
+
+        Paths added beyond the array's capacity reallocate the store away from it.
+        """
+        results: ProjectionResults = cls(0, years, labels, data.dtype)
+        results.data = data
+        results.n_paths = n_paths
+        return results
+
+    @property
+    def capacity(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def horizon(self) -> int:
+        return self.data.shape[2]
+
+    def __len__(self) -> int:
+        return self.n_paths
+
+    def __getitem__(self, key: str | tuple) -> np.ndarray:
+        """
+        Index the filled paths of a line item, e.g. results['fcf'] or results['fcf', :, -1].
+
+        Basic indexes (integers and slices) return views into the store.
+        """
+        if isinstance(key, tuple):
+            label, *index = key
+            return self.data[self.label_index[label], :self.n_paths][tuple(index)]
+        return self.data[self.label_index[key], :self.n_paths]
+
+    def reserve(self, n_paths: int) -> None:
+        """
+        Make room for at least n_paths filled paths without reallocating.
+
+        Parameters:
+            n_paths (int): The number of paths to make room for.
+        """
+        if n_paths <= self.capacity:
+            return
+        data: np.ndarray = np.full((len(self.labels), n_paths, self.horizon), np.nan, dtype=self.data.dtype)
+        data[:, :self.n_paths] = self.data[:, :self.n_paths]
+        self.data = data
+
+    def add_paths(self, n_paths: int) -> slice:
+        """
+        Claim the next n_paths rows of the store, doubling its capacity if it is full.
+
+        Parameters:
+            n_paths (int): The number of paths to add.
+        Returns:
+            block (slice): The path rows claimed.
+        """
+        start: int = self.n_paths
+        if start + n_paths > self.capacity:
+            self.reserve(max(start + n_paths, 2 * self.capacity))
+        self.n_paths = start + n_paths
+        return slice(start, self.n_paths)
+
+    def path(self, index: int) -> np.ndarray:
+        """
+        View one path as a (line item, year) array.
+        """
+        return self.data[:, :self.n_paths][:, index]
+
+    def year(self, year) -> np.ndarray:
+        """
+        View one projected year as a (line item, path) array.
+        """
+        return self.data[:, :self.n_paths, self.year_index[year]]
+
+    def mean(self, label: str) -> np.ndarray:
+        return np.mean(self[label], axis=0)
+
+    def std(self, label: str) -> np.ndarray:
+        return np.std(self[label], axis=0)
+
+    def percentile(self, label: str, q: float | np.ndarray) -> np.ndarray:
+        return np.percentile(self[label], q, axis=0)
+
+    def summary(self, label: str, percentiles: tuple = (5, 50, 95)) -> dict[str, np.ndarray]:
+        """
+        Summarize a line item across paths, year by year.
+
+        Parameters:
+            label (str): The line item.
+            percentiles (tuple): The percentiles to report.
+        Returns:
+            summary (dict[str, np.ndarray]): The mean, std, min, max and percentiles per year.
+        """
+        values: np.ndarray = self[label]
+        summary: dict[str, np.ndarray] = {'mean': np.mean(values, axis=0),
+                                          'std': np.std(values, axis=0),
+                                          'min': np.min(values, axis=0),
+                                          'max': np.max(values, axis=0)}
+        for q, value in zip(percentiles, np.percentile(values, percentiles, axis=0)):
+            summary[f'p{q}'] = value
+        return summary
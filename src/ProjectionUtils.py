@@ -1,16 +1,22 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import numpy as np
-import pandas as pd
 
-def calc_revenue_growth(revenue:pd.Series) -> np.ndarray:
+if TYPE_CHECKING:
+    import pandas as pd
+
+def calc_revenue_growth(revenue: pd.Series | np.ndarray) -> np.ndarray:
     """
     Calculate revenue growth.
 
     Parameters:
-        revenue (pd.Series): The revenue data.
+        revenue (pd.Series | np.ndarray): The revenue data.
     Returns:
         revenue_growth (np.ndarray): The revenue growth.
     """
-    revenue: np.ndarray = revenue.to_numpy()
+    revenue: np.ndarray = np.asarray(revenue, dtype=np.float64)
 
     if 0 in revenue:
         raise ZeroDivisionError("Invalid revenue data. Revenue should not be zero.")
@@ -19,13 +25,13 @@ def calc_revenue_growth(revenue:pd.Series) -> np.ndarray:
     revenue_growth: np.ndarray = revenue_change / revenue[:-1]
     return revenue_growth
 
-def calc_cogs_revenue(revenue: pd.Series,
-                      cogs: pd.Series) -> np.ndarray:
+def calc_cogs_revenue(revenue: pd.Series | np.ndarray,
+                      cogs: pd.Series | np.ndarray) -> np.ndarray:
     """
 
     """
-    revenue: np.ndarray = revenue.to_numpy()
-    cogs: np.ndarray = cogs.to_numpy()
+    revenue: np.ndarray = np.asarray(revenue, dtype=np.float64)
+    cogs: np.ndarray = np.asarray(cogs, dtype=np.float64)
 
     if 0 in revenue:
         raise ZeroDivisionError("Invalid revenue data. Revenue should not be zero.")
@@ -36,19 +42,19 @@ def calc_cogs_revenue(revenue: pd.Series,
     cogs_revenue: np.ndarray = cogs[1:] / revenue[1:]
     return cogs_revenue
 
-def calc_r_and_d_revenue(revenue: pd.Series,
-                         r_and_d: pd.Series) -> np.ndarray:
+def calc_r_and_d_revenue(revenue: pd.Series | np.ndarray,
+                         r_and_d: pd.Series | np.ndarray) -> np.ndarray:
     """
     Calculate the ratio of revenue to R&D.
 
     Parameters:
-        revenue (pd.Series): The revenue data.
-        r_and_d (pd.Series): The R&D data.
+        revenue (pd.Series | np.ndarray): The revenue data.
+        r_and_d (pd.Series | np.ndarray): The R&D data.
     Returns:
         r_and_d_revenue (np.ndarray): The ratio of revenue to R&D.
     """
-    revenue: np.ndarray = revenue.to_numpy()
-    r_and_d: np.ndarray = r_and_d.to_numpy()
+    revenue: np.ndarray = np.asarray(revenue, dtype=np.float64)
+    r_and_d: np.ndarray = np.asarray(r_and_d, dtype=np.float64)
 
     if 0 in revenue:
         raise ZeroDivisionError("Invalid revenue data. Revenue should not be zero.")
@@ -59,19 +65,19 @@ def calc_r_and_d_revenue(revenue: pd.Series,
     r_and_d_revenue: np.ndarray = r_and_d[1:] / revenue[1:]
     return r_and_d_revenue
 
-def calc_sga_revenue(revenue: pd.Series,
-                     sga: pd.Series) -> np.ndarray:
+def calc_sga_revenue(revenue: pd.Series | np.ndarray,
+                     sga: pd.Series | np.ndarray) -> np.ndarray:
     """
     Calculate the ratio of revenue to SG&A.
 
     Parameters:
-        revenue (pd.Series): The revenue data.
-        sga (pd.Series): The SG&A data.
+        revenue (pd.Series | np.ndarray): The revenue data.
+        sga (pd.Series | np.ndarray): The SG&A data.
     Returns:
         sga_revenue (np.ndarray): The ratio of revenue to SG&A.
     """
-    revenue: np.ndarray = revenue.to_numpy()
-    sga: np.ndarray = sga.to_numpy()
+    revenue: np.ndarray = np.asarray(revenue, dtype=np.float64)
+    sga: np.ndarray = np.asarray(sga, dtype=np.float64)
 
     if 0 in revenue:
         raise ZeroDivisionError("Invalid revenue data. Revenue should not be zero.")
@@ -82,19 +88,19 @@ def calc_sga_revenue(revenue: pd.Series,
     sga_revenue: np.ndarray = sga[1:] / revenue[1:]
     return sga_revenue
 
-def calc_da_prior_nppe(da: pd.Series,
-                       nppe: pd.Series) -> np.ndarray:
+def calc_da_prior_nppe(da: pd.Series | np.ndarray,
+                       nppe: pd.Series | np.ndarray) -> np.ndarray:
     """
     Calculate the ratio of depreciation and amortization to prior Net-PP&E.
 
     Parameters:
-        da (pd.Series): The depreciation and amortization data.
-        nppe (pd.Series): The Net-PP&E data.
+        da (pd.Series | np.ndarray): The depreciation and amortization data.
+        nppe (pd.Series | np.ndarray): The Net-PP&E data.
     Returns:
         da_nppe (np.ndarray): The ratio of depreciation and amortization to prior Net-PP&E.
     """
-    da: np.ndarray = da.to_numpy()
-    nppe: np.ndarray = nppe.to_numpy()
+    da: np.ndarray = np.asarray(da, dtype=np.float64)
+    nppe: np.ndarray = np.asarray(nppe, dtype=np.float64)
 
     if 0 in nppe:
         raise ZeroDivisionError("Invalid Net-PP&E data. Net-PP&E should not be zero.")
@@ -105,18 +111,18 @@ def calc_da_prior_nppe(da: pd.Series,
     da_nppe: np.ndarray = da[1:] / nppe[:-1]
     return da_nppe
 
-def calc_nwc_revenue(revenue: pd.Series,
-                     cce: pd.Series,
-                     ca: pd.Series, cld: pd.Series,
-                     cl: pd.Series) -> np.ndarray:
+def calc_nwc_revenue(revenue: pd.Series | np.ndarray,
+                     cce: pd.Series | np.ndarray,
+                     ca: pd.Series | np.ndarray, cld: pd.Series | np.ndarray,
+                     cl: pd.Series | np.ndarray) -> np.ndarray:
     """
 
     """
-    revenue: np.ndarray = revenue.to_numpy()
-    cce: np.ndarray = cce.to_numpy()
-    ca: np.ndarray = ca.to_numpy()
-    cl: np.ndarray = cl.to_numpy()
-    cld: np.ndarray = cld.to_numpy()
+    revenue: np.ndarray = np.asarray(revenue, dtype=np.float64)
+    cce: np.ndarray = np.asarray(cce, dtype=np.float64)
+    ca: np.ndarray = np.asarray(ca, dtype=np.float64)
+    cl: np.ndarray = np.asarray(cl, dtype=np.float64)
+    cld: np.ndarray = np.asarray(cld, dtype=np.float64)
 
     if 0 in revenue:
         raise ZeroDivisionError("Invalid revenue data. Revenue should not be zero.")
@@ -128,15 +134,15 @@ def calc_nwc_revenue(revenue: pd.Series,
     nwc_revenue: np.ndarray = nwc[1:] / revenue[1:]
     return nwc_revenue
 
-def calc_net_capex_revenue(revenue: pd.Series,
-                           capex: pd.Series,
-                           da: pd.Series) -> np.ndarray:
+def calc_net_capex_revenue(revenue: pd.Series | np.ndarray,
+                           capex: pd.Series | np.ndarray,
+                           da: pd.Series | np.ndarray) -> np.ndarray:
     """
 
     """
-    revenue: np.ndarray = revenue.to_numpy()
-    capex: np.ndarray = capex.to_numpy()
-    da: np.ndarray = da.to_numpy()
+    revenue: np.ndarray = np.asarray(revenue, dtype=np.float64)
+    capex: np.ndarray = np.asarray(capex, dtype=np.float64)
+    da: np.ndarray = np.asarray(da, dtype=np.float64)
 
     if 0 in revenue:
         raise ZeroDivisionError("Invalid revenue data. Revenue should not be zero.")
@@ -149,6 +155,53 @@ def calc_net_capex_revenue(revenue: pd.Series,
     net_capex_revenue: np.ndarray = net_capex[1:] / revenue[1:]
     return net_capex_revenue
 
+def calc_all_ratios(statements: np.ndarray,
+                    label_index: dict[str, int]) -> dict[str, np.ma.MaskedArray]:
+    """
+    Calculate every historical ratio for many enterprises at once.
+
+    Applies the same formulas as the single-enterprise functions above, but
+    instead of raising on a zero denominator the affected years are masked,
+    as are years with missing inputs. Per-enterprise parameters then follow
+    from masked reductions, e.g. ratios['cogs_revenue'].std(axis=-1).
+
+    Parameters:
+        statements (np.ndarray): The line items, (enterprise, line item, year), such as from stack_statements.
+        label_index (dict[str, int]): The row of each line item along the second axis.
+    Returns:
+        ratios (dict[str, np.ma.MaskedArray]): The seven ratios, each (enterprise, year - 1).
+    """
+    statements: np.ndarray = np.asarray(statements, dtype=np.float64)
+    if statements.ndim != 3:
+        raise IndexError("Statements should be stacked as (enterprise, line item, year).")
+
+    def row(label: str) -> np.ndarray:
+        return statements[:, label_index[label], :]
+
+    revenue: np.ndarray = row('Revenues')
+    da: np.ndarray = row('Depreciation & Amort.')
+    nppe: np.ndarray = row('Net Property Plant & Equipment')
+    nwc: np.ndarray = ((row('Total Current Assets') - row('Total Cash & ST Investments'))
+                       - (row('Total Current Liabilities') - row('Current Portion of Long Term Debt')))
+    net_capex: np.ndarray = -row('Cash from Investing') - da
+
+    numerators: dict[str, np.ndarray] = {'revenue_growth': np.diff(revenue, axis=-1),
+                                         'cogs_revenue': row('Cost of Goods Sold')[:, 1:],
+                                         'r_and_d_revenue': row('R&D Exp.')[:, 1:],
+                                         'sga_revenue': row('Selling General & Admin Exp.')[:, 1:],
+                                         'da_nppe': da[:, 1:],
+                                         'nwc_revenue': nwc[:, 1:],
+                                         'net_capex_revenue': net_capex[:, 1:]}
+    denominators: dict[str, np.ndarray] = {'revenue_growth': revenue[:, :-1], 'da_nppe': nppe[:, :-1]}
+
+    ratios: dict[str, np.ma.MaskedArray] = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, numerator in numerators.items():
+            denominator: np.ndarray = denominators.get(name, revenue[:, 1:])
+            ratio: np.ndarray = numerator / denominator
+            ratios[name] = np.ma.masked_array(ratio, mask=(denominator == 0) | ~np.isfinite(ratio))
+    return ratios
+
 def calc_ucoe(rf: float,
               rm: float,
               beta_u: float) -> float:
@@ -209,4 +262,130 @@ def calc_growth(roic: float,
     Returns:
         The long-term growth rate.
     """
-    return roic * reinvestment_rate
\ No newline at end of file
+    return roic * reinvestment_rate
+
+def project_revenue_paths(revenue0: float | np.ndarray,
+                          revenue_growth: np.ndarray,
+                          out: np.ndarray = None) -> np.ndarray:
+    """
+    Compound revenue over the horizon for a batch of growth paths.
+
+    Parameters:
+        revenue0 (float | np.ndarray): The last historical revenue, a scalar or one per path.
+        revenue_growth (np.ndarray): The revenue growth, (..., horizon).
+        out (np.ndarray): An optional array to write the projected revenue into.
+    Returns:
+        revenues (np.ndarray): The projected revenue, (..., horizon).
+    """
+    if out is None:
+        # A start per path broadcasts against ratios shared by every path
+        shape: tuple = np.broadcast_shapes(np.shape(revenue0) + (1,), np.shape(revenue_growth))
+        out = np.empty(shape, np.result_type(revenue_growth, 1.0))
+    revenues: np.ndarray = np.add(1.0, revenue_growth, out=out)
+    # Keep the arithmetic in the dtype of the paths, e.g. float32
+    revenue0: np.ndarray = np.asarray(revenue0, dtype=revenues.dtype)[..., np.newaxis]
+    np.cumprod(revenues, axis=-1, out=revenues)
+    revenues *= revenue0
+    return revenues
+
+def project_fixed_asset_paths(nppe0: float | np.ndarray,
+                              da_nppe: np.ndarray,
+                              net_capex: np.ndarray,
+                              out: tuple[np.ndarray, np.ndarray, np.ndarray] = None
+                              ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Roll Net-PP&E forward over the horizon for a batch of paths.
+
+    The roll-forward nppe = prior_nppe * (1 - da_nppe) + capex with
+    capex = net_capex + da_nppe * prior_nppe is a linear recurrence whose
+    depreciation terms cancel, so it is solved as a cumulative sum of net CAPEX.
+
+    Parameters:
+        nppe0 (float | np.ndarray): The last historical Net-PP&E, a scalar or one per path.
+        da_nppe (np.ndarray): The ratio of depreciation and amortization to prior Net-PP&E, (..., horizon).
+        net_capex (np.ndarray): The net capital expenditure, (..., horizon).
+        out (tuple): Optional arrays to write the D&A, CAPEX and Net-PP&E into.
+    Returns:
+        da (np.ndarray): The depreciation and amortization, (..., horizon).
+        capex (np.ndarray): The capital expenditure, (..., horizon).
+        nppe (np.ndarray): The Net-PP&E, (..., horizon).
+    """
+    if out is None:
+        shape: tuple = np.broadcast_shapes(np.shape(nppe0) + (1,), np.shape(da_nppe), np.shape(net_capex))
+        dtype: np.dtype = np.result_type(da_nppe, net_capex, 1.0)
+        out = (np.empty(shape, dtype), np.empty(shape, dtype), np.empty(shape, dtype))
+    da, capex, nppe = out
+    nppe0: np.ndarray = np.asarray(nppe0, dtype=nppe.dtype)[..., np.newaxis]
+
+    np.cumsum(np.broadcast_to(net_capex, nppe.shape), axis=-1, out=nppe)
+    nppe += nppe0
+    np.multiply(da_nppe[..., :1], nppe0, out=da[..., :1])
+    np.multiply(da_nppe[..., 1:], nppe[..., :-1], out=da[..., 1:])
+    np.add(net_capex, da, out=capex)
+    return da, capex, nppe
+
+def project_change_nwc_paths(nwc0: float | np.ndarray,
+                             nwc: np.ndarray,
+                             out: np.ndarray = None) -> np.ndarray:
+    """
+    Calculate the change in net-working capital for a batch of paths.
+
+    Parameters:
+        nwc0 (float | np.ndarray): The last historical net-working capital, a scalar or one per path.
+        nwc (np.ndarray): The projected net-working capital, (..., horizon).
+        out (np.ndarray): An optional array to write the change in net-working capital into.
+    Returns:
+        change_nwc (np.ndarray): The change in net-working capital, (..., horizon).
+    """
+    if out is None:
+        out = np.empty(np.broadcast_shapes(np.shape(nwc0) + (1,), np.shape(nwc)), np.result_type(nwc, 1.0))
+    nwc0: np.ndarray = np.asarray(nwc0, dtype=out.dtype)[..., np.newaxis]
+    np.subtract(nwc[..., :1], nwc0, out=out[..., :1])
+    np.subtract(nwc[..., 1:], nwc[..., :-1], out=out[..., 1:])
+    return out
+
+def calc_discount_factors(wacc: float | np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Calculate end-of-year discount factors over the horizon.
+
+    Parameters:
+        wacc (float | np.ndarray): The weighted average cost of capital, a scalar or one per path.
+        horizon (int): The number of projected years.
+    Returns:
+        discount_factors (np.ndarray): The discount factors, (..., horizon).
+    """
+    wacc: np.ndarray = np.asarray(wacc)[..., np.newaxis]
+    years: np.ndarray = np.arange(1, horizon + 1)
+    return (1.0 + wacc) ** -years
+
+def calc_terminal_value(fcf: float | np.ndarray,
+                        wacc: float | np.ndarray,
+                        growth_rate: float | np.ndarray) -> float | np.ndarray:
+    """
+    Calculate the terminal value at the end of the horizon with the Gordon growth model.
+
+    Parameters:
+        fcf (float | np.ndarray): The free cash flow of the last projected year.
+        wacc (float | np.ndarray): The weighted average cost of capital.
+        growth_rate (float | np.ndarray): The long-term growth rate.
+    Returns:
+        terminal_value (float | np.ndarray): The terminal value.
+    """
+    return fcf * (1.0 + growth_rate) / (wacc - growth_rate)
+
+def calc_enterprise_value(fcf: np.ndarray,
+                          wacc: float | np.ndarray,
+                          growth_rate: float | np.ndarray) -> float | np.ndarray:
+    """
+    Calculate the enterprise value of projected free cash flows.
+
+    Parameters:
+        fcf (np.ndarray): The projected free cash flow, (..., horizon).
+        wacc (float | np.ndarray): The weighted average cost of capital, a scalar or one per path.
+        growth_rate (float | np.ndarray): The long-term growth rate, a scalar or one per path.
+    Returns:
+        enterprise_value (float | np.ndarray): The enterprise value, one per path.
+    """
+    discount_factors: np.ndarray = calc_discount_factors(wacc, np.shape(fcf)[-1])
+    terminal_value: np.ndarray = calc_terminal_value(fcf[..., -1], wacc, growth_rate)
+    return np.sum(fcf * discount_factors, axis=-1) + terminal_value * discount_factors[..., -1]
@@ -0,0 +1,95 @@
+"""
+A class estimating covariance and correlation incrementally, one observation at a time
+"""
+
+import numpy as np
+
+class RunningCovariance:
+    """
+    Running means and co-moments of k variables, updated with Welford's method.
+
+    Adding or removing one observation costs O(k^2), so a rolling window moves
+    forward a year without revisiting the years it kept. Many independent
+    estimators, such as one per enterprise, are updated together by giving a
+    batch shape; an observation with a missing value leaves its estimator as is.
+    """
+
+    def __init__(self, n_vars: int, batch_shape: tuple = ()):
+        self.n_vars: int = n_vars
+        self.batch_shape: tuple = tuple(batch_shape)
+        self.count: np.ndarray = np.zeros(self.batch_shape, dtype=np.int64)
+        self.mean: np.ndarray = np.zeros(self.batch_shape + (n_vars,))
+        self.comoment: np.ndarray = np.zeros(self.batch_shape + (n_vars, n_vars))
+
+    @classmethod
+    def from_data(cls, data: np.ndarray) -> 'RunningCovariance':
+        """
+        Build an estimator from existing observations.
+
+        Parameters:
+            data (np.ndarray): The observations, (*batch, observation, variable).
+        Returns:
+            running_covariance (RunningCovariance): The estimator holding every observation.
+        """
+        data: np.ndarray = np.asarray(data, dtype=np.float64)
+        running_covariance: RunningCovariance = cls(data.shape[-1], data.shape[:-2])
+        for i in range(data.shape[-2]):
+            running_covariance.add(data[..., i, :])
+        return running_covariance
+
+    def add(self, x: np.ndarray) -> None:
+        """
+        Absorb one observation per estimator.
+
+        Parameters:
+            x (np.ndarray): The observation, (*batch, variable).
+        """
+        x: np.ndarray = np.asarray(x, dtype=np.float64)
+        valid: np.ndarray = np.isfinite(x).all(axis=-1)
+        count: np.ndarray = self.count + valid
+
+        delta: np.ndarray = np.where(valid[..., np.newaxis], x - self.mean, 0.0)
+        mean: np.ndarray = self.mean + delta / np.maximum(count, 1)[..., np.newaxis]
+        self.comoment += delta[..., :, np.newaxis] * np.where(valid[..., np.newaxis], x - mean, 0.0)[..., np.newaxis, :]
+        self.mean, self.count = mean, count
+
+    def remove(self, x: np.ndarray) -> None:
+        """
+        Drop one observation per estimator, such as the oldest year of a rolling window.
+
+        The observation must be one that was added; removing a missing value does nothing.
+
+        Parameters:
+            x (np.ndarray): The observation, (*batch, variable).
+        """
+        x: np.ndarray = np.asarray(x, dtype=np.float64)
+        valid: np.ndarray = np.isfinite(x).all(axis=-1) & (self.count > 0)
+        count: np.ndarray = self.count - valid
+
+        # Invert the update of add: the mean before x was absorbed, then its co-moment term
+        delta: np.ndarray = np.where(valid[..., np.newaxis], x - self.mean, 0.0)
+        mean: np.ndarray = np.where((count > 0)[..., np.newaxis],
+                                    self.mean - delta / np.maximum(count, 1)[..., np.newaxis], 0.0)
+        self.comoment -= (np.where(valid[..., np.newaxis], x - mean, 0.0)[..., :, np.newaxis]
+                          * delta[..., np.newaxis, :])
+        self.comoment[count == 0] = 0.0
+        self.mean, self.count = mean, count
+
+    def covariance(self, ddof: int = 1) -> np.ndarray:
+        """
+        The covariance matrix of each estimator, NaN with too few observations.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dof: np.ndarray = (self.count - ddof).astype(np.float64)
+            dof[dof <= 0] = np.nan
+            return self.comoment / dof[..., np.newaxis, np.newaxis]
+
+    def correlation(self) -> np.ndarray:
+        """
+        The correlation matrix of each estimator, NaN for variables that do not vary.
+        """
+        variance: np.ndarray = np.diagonal(self.comoment, axis1=-2, axis2=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std: np.ndarray = np.sqrt(np.where(variance > 0, variance, np.nan))
+            correlation: np.ndarray = self.comoment / (std[..., :, np.newaxis] * std[..., np.newaxis, :])
+        return np.clip(correlation, -1.0, 1.0)
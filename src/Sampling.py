@@ -0,0 +1,203 @@
+"""
+Variance-reduced sampling of ratio shocks and the estimators that measure the reduction
+"""
+
+import numpy as np
+
+# Ways of drawing the standard normal shocks behind the simulated paths
+SAMPLING_METHODS: tuple = ('random', 'antithetic', 'sobol', 'lhs')
+
+# Independent randomizations of a quasi-random design, from which its error is estimated
+DEFAULT_REPLICATES: int = 8
+
+def standard_normal_shocks(shape: tuple, method: str = 'random', seed=None,
+                           n_replicates: int = None) -> np.ndarray:
+    """
+    Draw independent standard normal shocks, (ratio, path, year), with a sampling design.
+
+    'random' draws plain pseudo-random normals. 'antithetic' draws the first
+    half of the paths and mirrors them in the second half, so path i and path
+    i + ceil(n_paths / 2) are a pair. 'sobol' and 'lhs' map a scrambled Sobol
+    sequence or a Latin hypercube, one dimension per ratio and year, through
+    the normal quantile function. Their paths are split into n_replicates
+    consecutive blocks, each an independent randomization of the design.
+    A Sobol block is only balanced when its size is a power of two, so pick
+    n_paths as n_replicates times a power of two, e.g. 8 * 1024; a block of
+    another size takes the first points of the next power-of-two design.
+
+    Parameters:
+        shape (tuple): The number of ratios, paths and years.
+        method (str): One of SAMPLING_METHODS.
+        seed: The seed of the random number generator.
+        n_replicates (int): The quasi-random blocks, DEFAULT_REPLICATES by default.
+    Returns:
+        shocks (np.ndarray): The shocks.
+    """
+    n_ratios, n_paths, horizon = shape
+    rng: np.random.Generator = np.random.default_rng(seed)
+    if method == 'random':
+        return rng.standard_normal(shape)
+    if method == 'antithetic':
+        half: np.ndarray = rng.standard_normal((n_ratios, (n_paths + 1) // 2, horizon))
+        return np.concatenate([half, -half], axis=1)[:, :n_paths]
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method {method!r}, expected one of {', '.join(SAMPLING_METHODS)}.")
+
+    from scipy.special import ndtri
+    from scipy.stats import qmc
+
+    n_replicates = min(n_replicates or DEFAULT_REPLICATES, n_paths)
+    dims: int = n_ratios * horizon
+    blocks: list = []
+    for size in replicate_sizes(n_paths, n_replicates):
+        if method == 'sobol':
+            # Draw whole powers of two, which scipy warns against breaking with random(size)
+            sobol: qmc.Sobol = qmc.Sobol(dims, scramble=True, rng=rng)
+            blocks.append(sobol.random_base2(int(np.ceil(np.log2(size))))[:size])
+        else:
+            blocks.append(qmc.LatinHypercube(dims, rng=rng).random(size))
+    uniforms: np.ndarray = np.concatenate(blocks)
+    # Keep the quantile function finite at the edges of the unit cube
+    np.clip(uniforms, np.finfo(float).eps, 1 - np.finfo(float).eps, out=uniforms)
+    return ndtri(uniforms).reshape(n_paths, n_ratios, horizon).transpose(1, 0, 2)
+
+def replicate_sizes(n_paths: int, n_replicates: int) -> list[int]:
+    return [len(block) for block in np.array_split(np.arange(n_paths), n_replicates)]
+
+def mean_estimate(values: np.ndarray, method: str = 'random', n_replicates: int = None) -> dict[str, float]:
+    """
+    Estimate the mean of a per-path output, with the standard error its sampling design achieved.
+
+    The variance reduction is the variance of a plain Monte Carlo mean over as
+    many paths divided by the variance of this design's mean; 1 for 'random'.
+    Paths whose output is not finite, such as those that could not be valued,
+    are left out, along with their antithetic partners.
+
+    Parameters:
+        values (np.ndarray): The output of each path, in the order the shocks were drawn.
+        method (str): The design the shocks were drawn with.
+        n_replicates (int): The quasi-random blocks the shocks were drawn in.
+    Returns:
+        estimate (dict[str, float]): The mean, its standard error, the variance reduction,
+            the paths simulated and those left out.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_paths: int = len(values)
+    finite: np.ndarray = np.isfinite(values)
+    plain_variance: float = float(values[finite].var(ddof=1)) / np.count_nonzero(finite)
+
+    if method == 'random':
+        mean: float = float(values[finite].mean())
+        variance: float = plain_variance
+    elif method == 'antithetic':
+        first: int = (n_paths + 1) // 2
+        n_pairs: int = n_paths - first
+        pair_means: np.ndarray = (values[:n_pairs] + values[first:first + n_pairs]) / 2
+        pair_means = pair_means[np.isfinite(pair_means)]
+        mean = float(pair_means.mean())
+        variance = float(pair_means.var(ddof=1)) / len(pair_means)
+    elif method in SAMPLING_METHODS:
+        n_replicates = min(n_replicates or DEFAULT_REPLICATES, n_paths)
+        if n_replicates < 2:
+            raise ValueError("At least two replicates are needed to estimate the error of a quasi-random design.")
+        bounds: np.ndarray = np.cumsum([0] + replicate_sizes(n_paths, n_replicates))
+        replicate_means: np.ndarray = np.array([np.nanmean(np.where(finite, values, np.nan)[start:stop])
+                                                for start, stop in zip(bounds[:-1], bounds[1:])])
+        mean = float(replicate_means.mean())
+        variance = float(replicate_means.var(ddof=1)) / n_replicates
+    else:
+        raise ValueError(f"Unknown sampling method {method!r}, expected one of {', '.join(SAMPLING_METHODS)}.")
+
+    return {'mean': mean,
+            'std_error': float(np.sqrt(variance)),
+            'variance_reduction': plain_variance / variance if variance > 0 else float('inf'),
+            'n_paths': n_paths,
+            'n_failed': n_paths - int(np.count_nonzero(finite))}
+
+def control_variate(values: np.ndarray, controls: np.ndarray, expected: np.ndarray) -> dict[str, float]:
+    """
+    Adjust a Monte Carlo mean with control variates of known expectation.
+
+    Each path's output is corrected by beta @ (control - expected), with beta
+    the least-squares fit of the outputs on the controls, which removes the
+    share of the output's variance the controls explain.
+
+    Parameters:
+        values (np.ndarray): The output of each path; paths whose output is not finite are left out.
+        controls (np.ndarray): The controls of each path, (path, control).
+        expected (np.ndarray): The known expectation of each control.
+    Returns:
+        estimate (dict[str, float]): The adjusted mean, its standard error, the variance
+            reduction against the plain mean, the paths used and the fitted coefficients.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    centred: np.ndarray = np.atleast_2d(np.asarray(controls, dtype=np.float64).T).T - expected
+    finite: np.ndarray = np.isfinite(values)
+    values, centred = values[finite], centred[finite]
+    n_paths, n_controls = centred.shape
+    if n_paths <= n_controls + 1:
+        raise ValueError("A control variate needs more paths than controls.")
+
+    design: np.ndarray = centred - centred.mean(axis=0)
+    beta: np.ndarray = np.linalg.lstsq(design, values - values.mean(), rcond=None)[0]
+    adjusted: np.ndarray = values - centred @ beta
+
+    plain_variance: float = float(values.var(ddof=1)) / n_paths
+    variance: float = float(adjusted.var(ddof=n_controls + 1)) / n_paths
+    return {'mean': float(adjusted.mean()),
+            'std_error': float(np.sqrt(variance)),
+            'variance_reduction': plain_variance / variance if variance > 0 else float('inf'),
+            'n_paths': n_paths,
+            'beta': beta}
+
+def estimate_value(engine, rf: float, rm: float, beta_u: float, roic: float,
+                   n_paths: int, seed=None, sampling: str = 'random', n_replicates: int = None,
+                   use_control_variate: bool = False, percentiles: tuple = (5, 50, 95)) -> dict:
+    """
+    Simulate and value paths with a sampling design, estimating the mean equity value and its error.
+
+    The control variates are each path's draw of every ratio in every year, whose
+    expectation is the exact mean of the ratio's distribution; for a Normal
+    ratio, the value projected by the deterministic project_stmt path.
+    They apply to 'random' sampling; antithetic pairs already cancel them exactly.
+
+    Parameters:
+        engine (ProjectionEngine): The engine to simulate.
+        rf (float): The expected risk-free return.
+        rm (float): The expected market return.
+        beta_u (float): The unlevered beta.
+        roic (float): The return on invested capital.
+        n_paths (int): The number of paths.
+        seed: The seed of the random number generator.
+        sampling (str): The design of the shocks, one of SAMPLING_METHODS.
+        n_replicates (int): The independent blocks of a 'sobol' or 'lhs' design.
+        use_control_variate (bool): Whether to adjust the mean with the ratio control variates.
+        percentiles (tuple): The equity value percentiles to report.
+    Returns:
+        report (dict): The mean equity value, its standard error, the variance reduction against
+            plain Monte Carlo, the paths that could not be valued, the percentiles of those
+            that could and, with control variates, the adjusted estimate.
+    """
+    try:
+        from .ProjectionEngine import RATIO_PARAMS
+    except ImportError:
+        from ProjectionEngine import RATIO_PARAMS
+
+    draws: dict[str, np.ndarray] = engine.draw_ratios(n_paths, seed, sampling=sampling, n_replicates=n_replicates)
+    results = engine.project_paths(draws)
+    equity_value: np.ndarray = engine.dcf_paths(rf, rm, beta_u, roic, results=results)['equity_value']
+
+    report: dict = {'sampling': sampling, **mean_estimate(equity_value, sampling, n_replicates)}
+    valued: np.ndarray = equity_value[np.isfinite(equity_value)]
+    for q, value in zip(percentiles, np.percentile(valued, percentiles)):
+        report[f'p{q}'] = float(value)
+
+    if use_control_variate:
+        if sampling != 'random':
+            raise ValueError("Control variates apply to 'random' sampling.")
+        controls: np.ndarray = np.hstack([draws[param_name] for param_name in RATIO_PARAMS])
+        expected: np.ndarray = np.concatenate([np.broadcast_to(engine.params[param_name].sampler.mean,
+                                                               draws[param_name].shape[1:])
+                                               for param_name in RATIO_PARAMS])
+        report['control_variate'] = control_variate(equity_value, controls, expected)
+    return report
@@ -0,0 +1,234 @@
+"""
+Functions and a class for valuing an enterprise over a grid of market inputs and ratio shocks
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .CashFlowCache import CashFlowCache
+from .LeverageSolver import LeverageSolution, solve_leverage
+from .ProjectionEngine import ProjectionEngine, RATIO_PARAMS
+from .ProjectionResults import ProjectionResults
+from .ProjectionUtils import calc_ucoe, calc_coe, calc_wacc
+
+if TYPE_CHECKING:
+    # pandas is only needed for tabulating, not in the pool workers valuing grid points
+    import pandas as pd
+
+# Market input axes of a grid, in order; ratio shock axes follow them
+MARKET_AXES: tuple = ('rf', 'rm', 'beta_u', 'roic')
+
+# Outputs valued at every grid point
+OUTPUTS: tuple = ('enterprise_value', 'equity_value', 'wacc', 'leverage', 'growth_rate', 'converged')
+
+class SensitivityGrid:
+    """
+    Valuation outputs over the Cartesian product of the input axes.
+
+    Each output is an array with one dimension per axis, in the order of axes.
+    """
+
+    def __init__(self, axes: dict[str, np.ndarray], values: dict[str, np.ndarray]):
+        self.axes: dict[str, np.ndarray] = axes
+        self.values: dict[str, np.ndarray] = values
+
+    @property
+    def dims(self) -> tuple:
+        return tuple(self.axes)
+
+    @property
+    def shape(self) -> tuple:
+        return tuple(len(values) for values in self.axes.values())
+
+    def __getitem__(self, output: str) -> np.ndarray:
+        return self.values[output]
+
+    def index(self, **coords) -> tuple:
+        """
+        Index the grid at axis values; axes left out are kept whole.
+        """
+        unknown: set = set(coords) - set(self.axes)
+        if unknown:
+            raise KeyError(f"Unknown axes: {', '.join(sorted(unknown))}")
+
+        index: list = []
+        for dim, values in self.axes.items():
+            if dim not in coords:
+                index.append(slice(None))
+                continue
+            matches: np.ndarray = np.flatnonzero(np.isclose(values, coords[dim]))
+            if matches.size == 0:
+                raise KeyError(f"{coords[dim]} is not on the {dim} axis")
+            index.append(int(matches[0]))
+        return tuple(index)
+
+    def sel(self, output: str = 'equity_value', **coords) -> np.ndarray:
+        """
+        Select an output at axis values, e.g. grid.sel('wacc', rf=0.04, rm=0.09).
+        """
+        return self.values[output][self.index(**coords)]
+
+    def base(self, **coords) -> dict:
+        """
+        The given axis values, with the middle value of every other axis.
+        """
+        return {dim: coords.get(dim, values[(len(values) - 1) // 2]) for dim, values in self.axes.items()}
+
+    def heatmap(self, x: str, y: str, output: str = 'equity_value', **coords) -> pd.DataFrame:
+        """
+        Tabulate an output over two axes, holding the others at coords or their middle value.
+
+        Returns:
+            heatmap (pd.DataFrame): The output, indexed by y and with x as columns.
+        """
+        import pandas as pd
+
+        base: dict = self.base(**coords)
+        fixed: dict = {dim: value for dim, value in base.items() if dim not in (x, y)}
+        table: np.ndarray = self.sel(output, **fixed)
+        # The two remaining dimensions keep their axis order; put y on the rows
+        if self.dims.index(x) < self.dims.index(y):
+            table = table.T
+        return pd.DataFrame(table, index=pd.Index(self.axes[y], name=y),
+                            columns=pd.Index(self.axes[x], name=x))
+
+    def tornado(self, output: str = 'equity_value', **coords) -> pd.DataFrame:
+        """
+        Swing an output along one axis at a time around a base point.
+
+        Returns:
+            tornado (pd.DataFrame): The low, high and swing of the output per axis, widest swing first.
+        """
+        import pandas as pd
+
+        base: dict = self.base(**coords)
+        rows: dict = {}
+        for dim in self.dims:
+            fixed: dict = {other: value for other, value in base.items() if other != dim}
+            values: np.ndarray = self.sel(output, **fixed)
+            rows[dim] = {'low': values[0], 'high': values[-1], 'swing': abs(values[-1] - values[0])}
+        tornado: pd.DataFrame = pd.DataFrame.from_dict(rows, orient='index')
+        return tornado.sort_values('swing', ascending=False)
+
+def sensitivity_grid(engine: ProjectionEngine,
+                     rf: np.ndarray, rm: np.ndarray, beta_u: np.ndarray, roic: np.ndarray,
+                     shocks: dict[str, np.ndarray] = None,
+                     max_workers: int = 1,
+                     maxiter: int = 100) -> SensitivityGrid:
+    """
+    Value an enterprise at every combination of market inputs and ratio shocks.
+
+    Each combination of shocks is projected once as a path of its own, and
+    every grid point is then solved for its consistent leverage in batches.
+    With more than one worker the batches are spread over a process pool.
+
+    Parameters:
+        engine (ProjectionEngine): The engine holding the enterprise and estimated ratios.
+        rf (np.ndarray): The expected risk-free returns.
+        rm (np.ndarray): The expected market returns.
+        beta_u (np.ndarray): The unlevered betas.
+        roic (np.ndarray): The returns on invested capital.
+        shocks (dict[str, np.ndarray]): Additive shifts applied to every year of a ratio
+            parameter, keyed by its name in RATIO_PARAMS.
+        max_workers (int): The number of processes, or None for all cores.
+        maxiter (int): The maximum number of solver iterations.
+    Returns:
+        grid (SensitivityGrid): The valuation outputs over the grid.
+    """
+    shocks: dict = shocks or {}
+    unknown: set = set(shocks) - set(RATIO_PARAMS)
+    if unknown:
+        raise ValueError(f"Cannot shock {', '.join(sorted(unknown))}; expected one of {RATIO_PARAMS}")
+
+    axes: dict[str, np.ndarray] = {dim: np.atleast_1d(np.asarray(values, dtype=np.float64))
+                                   for dim, values in zip(MARKET_AXES, (rf, rm, beta_u, roic))}
+    axes.update({param_name: np.atleast_1d(np.asarray(values, dtype=np.float64))
+                 for param_name, values in shocks.items()})
+    shape: tuple = tuple(len(values) for values in axes.values())
+
+    # Project each combination of shocks once
+    shock_shape: tuple = shape[len(MARKET_AXES):]
+    scenarios: np.ndarray = np.array(list(itertools.product(*(axes[param_name] for param_name in shocks))))
+    draws: dict[str, np.ndarray] = {}
+    for param_name in RATIO_PARAMS:
+        data: np.ndarray = np.asarray(engine.params[param_name].data, dtype=np.float64)
+        shift: np.ndarray = np.zeros(len(scenarios))
+        if param_name in shocks:
+            shift = scenarios[:, list(shocks).index(param_name)]
+        draws[param_name] = data[np.newaxis, :] + shift[:, np.newaxis]
+    results: ProjectionResults = engine.project_paths(draws, out=ProjectionResults(
+        n_paths=len(scenarios), years=engine.results.years))
+
+    # Growth is linear in ROIC, so one reinvestment rate per scenario serves every ROIC
+    scenario_flows: CashFlowCache = engine.cash_flows(1.0, results)
+    reinvestment_rate: np.ndarray = scenario_flows.growth_rate
+
+    def cells(values: np.ndarray, axis: int) -> np.ndarray:
+        # Spread values along one or more leading axes of the grid, then flatten
+        expanded: np.ndarray = values.reshape((1,) * axis + values.shape + (1,) * (len(shape) - axis - values.ndim))
+        return np.broadcast_to(expanded, shape).ravel()
+
+    ucoe: np.ndarray = cells(calc_ucoe(axes['rf'][:, None, None], axes['rm'][None, :, None],
+                                       axes['beta_u'][None, None, :]), 0)
+    roic_cells: np.ndarray = cells(axes['roic'], 3)
+    scenario_cells: np.ndarray = cells(np.arange(len(scenarios)).reshape(shock_shape), 4)
+    with np.errstate(invalid='ignore'):
+        growth_rate: np.ndarray = roic_cells * reinvestment_rate[scenario_cells]
+
+    enterprise = engine.enterprise
+    args: tuple = (scenario_flows.fcf, enterprise.cod, enterprise.stat_tax, enterprise.debt_value, maxiter)
+    max_workers: int = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        valuations: list = [value_grid_cells(scenario_cells, growth_rate, ucoe, *args)]
+    else:
+        chunks: list = [chunk for chunk in np.array_split(np.arange(ucoe.size), 4 * max_workers) if chunk.size]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures: list = [executor.submit(value_grid_cells, scenario_cells[chunk], growth_rate[chunk],
+                                             ucoe[chunk], *args) for chunk in chunks]
+            valuations = [future.result() for future in futures]
+
+    values: dict[str, np.ndarray] = {output: np.concatenate([valuation[output] for valuation in valuations])
+                                     .reshape(shape) for output in OUTPUTS}
+    return SensitivityGrid(axes, values)
+
+def value_grid_cells(scenarios: np.ndarray, growth_rate: np.ndarray, ucoe: np.ndarray,
+                     fcf: np.ndarray, cod: float, stat_tax: float, debt_value: float,
+                     maxiter: int = 100) -> dict[str, np.ndarray]:
+    """
+    Solve the consistent leverage of a batch of grid points.
+
+    Parameters:
+        scenarios (np.ndarray): The projected scenario of each point, a row of fcf.
+        growth_rate (np.ndarray): The long-term growth rate of each point.
+        ucoe (np.ndarray): The unlevered cost of equity of each point.
+        fcf (np.ndarray): The projected free cash flow of each scenario, (scenario, horizon).
+        cod (float): The cost of debt.
+        stat_tax (float): The statutory tax rate.
+        debt_value (float): The value of debt.
+        maxiter (int): The maximum number of solver iterations.
+    Returns:
+        valuation (dict[str, np.ndarray]): The outputs of each point.
+    """
+    cash_flows: CashFlowCache = CashFlowCache(fcf[scenarios], growth_rate)
+
+    def lev_difference(begin_lev: np.ndarray, paths: np.ndarray) -> np.ndarray:
+        wacc: np.ndarray = calc_wacc(calc_coe(ucoe[paths], cod, begin_lev), cod, begin_lev, stat_tax)
+        return debt_value / cash_flows.enterprise_value(wacc, paths) - begin_lev
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        solution: LeverageSolution = solve_leverage(lev_difference, cash_flows.n_paths, maxiter=maxiter)
+        wacc: np.ndarray = calc_wacc(calc_coe(ucoe, cod, solution.leverage), cod, solution.leverage, stat_tax)
+        enterprise_value: np.ndarray = cash_flows.enterprise_value(wacc)
+
+    return {'enterprise_value': enterprise_value,
+            'equity_value': enterprise_value - debt_value,
+            'wacc': wacc,
+            'leverage': solution.leverage,
+            'growth_rate': cash_flows.growth_rate,
+            'converged': solution.converged}
@@ -0,0 +1,220 @@
+"""
+Simulation across worker processes over shared-memory statement, draw and result arrays
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .Enterprise import Enterprise, StatementArrays
+from .ProjectionEngine import ProjectionEngine, RATIO_PARAMS
+from .ProjectionResults import ProjectionResults, LINE_ITEMS
+
+# Per-path valuation outputs, in storage order
+VALUATION_FIELDS: tuple = ('leverage', 'wacc', 'growth_rate', 'enterprise_value',
+                           'equity_value', 'converged', 'iterations')
+
+class SharedArray:
+    """
+    A numpy array in a named shared-memory block.
+
+    The process creating the block owns it and unlinks it; other processes
+    attach to it by its spec, a small picklable tuple, and view the same memory.
+    Arrays from view() keep the block open, and it is closed once the last of
+    them and the SharedArray itself are gone.
+    """
+
+    def __init__(self, shape: tuple, dtype: np.dtype = np.float64, name: str = None):
+        self.shape: tuple = tuple(shape)
+        self.dtype: np.dtype = np.dtype(dtype)
+        self.owner: bool = name is None
+        if self.owner:
+            size: int = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+            self.block: shared_memory.SharedMemory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.block = attach_block(name)
+        self.array: np.ndarray = np.ndarray(self.shape, dtype=self.dtype, buffer=self.block.buf)
+        self.closed: bool = False
+
+    @classmethod
+    def copy_of(cls, array: np.ndarray) -> 'SharedArray':
+        shared: SharedArray = cls(np.shape(array), np.asarray(array).dtype)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec: tuple) -> 'SharedArray':
+        name, shape, dtype = spec
+        return cls(shape, dtype, name)
+
+    @property
+    def spec(self) -> tuple:
+        return self.block.name, self.shape, self.dtype.str
+
+    @property
+    def __array_interface__(self) -> dict:
+        return self.array.__array_interface__
+
+    def view(self) -> np.ndarray:
+        """
+        An array over the block whose base is this SharedArray, so the block outlives it.
+        """
+        return np.asarray(self)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        # Views of the block must be gone before it can be closed
+        self.closed = True
+        self.array = None
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+
+    def __del__(self) -> None:
+        # Also reached once the last array from view() is collected
+        if hasattr(self, 'closed'):
+            self.close()
+
+    def __enter__(self) -> 'SharedArray':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def attach_block(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing block, leaving its cleanup to the owner.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the block again, which is harmless
+        # for pool workers as they share their parent's resource tracker
+        return shared_memory.SharedMemory(name=name)
+
+# The engine and shared arrays of a worker process, set up once by init_worker
+worker: dict = {}
+
+def init_worker(spec: dict) -> None:
+    """
+    Attach a worker process to the shared arrays and rebuild the engine over them.
+    """
+    statements: SharedArray = SharedArray.attach(spec['statements'])
+    enterprise: Enterprise = Enterprise.from_statement_arrays(
+        *spec['terms'], StatementArrays.from_values(statements.array, spec['label_index']))
+    worker.update({'engine': ProjectionEngine(enterprise, **spec['estimates'], dtype=spec['dtype']),
+                   'statements': statements,
+                   'draws': SharedArray.attach(spec['draws']),
+                   'output': SharedArray.attach(spec['output']),
+                   'valuation': SharedArray.attach(spec['valuation']) if spec['valuation'] else None,
+                   'years': spec['years']})
+
+def run_block(start: int, stop: int, market: dict = None) -> int:
+    """
+    Project, and optionally value, paths start to stop, writing them into the shared output.
+
+    Returns:
+        n_paths (int): The number of paths done.
+    """
+    engine: ProjectionEngine = worker['engine']
+    draws: np.ndarray = worker['draws'].array
+    block: dict[str, np.ndarray] = {param_name: draws[i, start:stop] for i, param_name in enumerate(RATIO_PARAMS)}
+    results: ProjectionResults = ProjectionResults.from_buffer(worker['output'].array[:, start:stop],
+                                                               worker['years'])
+    engine.project_paths(block, out=results)
+
+    if market is not None:
+        valuation: dict[str, np.ndarray] = engine.dcf_paths(**market, results=results)
+        out: np.ndarray = worker['valuation'].array
+        for i, field in enumerate(VALUATION_FIELDS):
+            out[i, start:stop] = valuation[field]
+    return stop - start
+
+def simulate_shared(engine: ProjectionEngine, n_paths: int, seed: int = None,
+                    market: dict = None,
+                    max_workers: int = None,
+                    n_blocks: int = None,
+                    copy: bool = False) -> tuple[ProjectionResults, dict[str, np.ndarray]]:
+    """
+    Simulate paths across processes, sharing the inputs and output instead of pickling them.
+
+    The historical line items, the ratio draws and the output live in
+    shared-memory blocks. Each worker attaches to them once, rebuilds the
+    engine over the shared line items and writes its blocks of paths straight
+    into the shared output, so tasks only carry path ranges. The draws are made
+    in this process from the seed, so the paths match engine.simulate(n_paths, seed),
+    in the engine's dtype.
+
+    The results and valuation are views of the shared output rather than copies.
+    The output block stays open while any of them is referenced and is released
+    with the last one.
+
+    Parameters:
+        engine (ProjectionEngine): The engine to simulate.
+        n_paths (int): The number of paths.
+        seed (int): The seed of the random number generator.
+        market (dict): Optional rf, rm, beta_u and roic to also value each path at, as in dcf_paths.
+        max_workers (int): The number of processes, all cores by default.
+        n_blocks (int): The number of tasks the paths are split into, four per worker by default.
+        copy (bool): Whether to copy the output into private memory and release the shared blocks at once.
+    Returns:
+        results (ProjectionResults): The projected paths.
+        valuation (dict[str, np.ndarray]): The VALUATION_FIELDS of each path, or None without market inputs.
+    """
+    if n_paths < 1:
+        raise ValueError("The number of paths should be at least one.")
+    max_workers: int = max_workers or os.cpu_count() or 1
+    n_blocks: int = min(n_blocks or 4 * max_workers, n_paths)
+
+    horizon: int = len(engine.params['revenue_growth_e'].data)
+    years: np.ndarray = np.arange(1, horizon + 1)
+    enterprise: Enterprise = engine.enterprise
+    arrays: StatementArrays = enterprise.statements
+
+    shared: list[SharedArray] = []
+    try:
+        statements: SharedArray = SharedArray.copy_of(arrays.values)
+        shared.append(statements)
+        draws: SharedArray = SharedArray((len(RATIO_PARAMS), n_paths, horizon), engine.dtype)
+        shared.append(draws)
+        engine.draw_ratios(n_paths, seed, out=draws.array)
+        output: SharedArray = SharedArray((len(LINE_ITEMS), n_paths, horizon), engine.dtype)
+        shared.append(output)
+        output.array.fill(np.nan)
+        valuation: SharedArray = None
+        if market is not None:
+            valuation = SharedArray((len(VALUATION_FIELDS), n_paths))
+            shared.append(valuation)
+
+        spec: dict = {'terms': (enterprise.name, enterprise.ticker, enterprise.fdso,
+                                enterprise.debt_value, enterprise.stat_tax, enterprise.cod),
+                      'label_index': arrays.label_index,
+                      'estimates': {param_name: engine.params[param_name].data for param_name in RATIO_PARAMS},
+                      'dtype': engine.dtype.str,
+                      'statements': statements.spec,
+                      'draws': draws.spec,
+                      'output': output.spec,
+                      'valuation': valuation.spec if valuation is not None else None,
+                      'years': years}
+        bounds: np.ndarray = np.linspace(0, n_paths, n_blocks + 1).astype(int)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(spec,)) as executor:
+            list(executor.map(run_block, bounds[:-1], bounds[1:], [market] * n_blocks))
+
+        if not copy:
+            # The caller's views now own the output blocks, which close with the last of them
+            shared = [array for array in shared if array is not output and array is not valuation]
+        take = np.array if copy else SharedArray.view
+        results: ProjectionResults = ProjectionResults.from_buffer(take(output), years, n_paths=n_paths)
+        values: dict[str, np.ndarray] = None
+        if valuation is not None:
+            fields: np.ndarray = take(valuation)
+            values = {field: fields[i] for i, field in enumerate(VALUATION_FIELDS)}
+            values['converged'] = values['converged'].astype(bool)
+            values['iterations'] = values['iterations'].astype(int)
+        return results, values
+    finally:
+        for array in shared:
+            array.close()
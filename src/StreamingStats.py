@@ -0,0 +1,239 @@
+"""
+Summaries of simulation outputs accumulated chunk by chunk in constant memory
+"""
+
+import numpy as np
+
+class RunningMoments:
+    """
+    Count, mean, variance, min and max of each column, merged a batch at a time.
+
+    Batches are combined with Chan's parallel update, which stays accurate
+    where summing squares would cancel. NaN values are left out.
+    """
+
+    def __init__(self, n_columns: int = 1):
+        self.count: np.ndarray = np.zeros(n_columns)
+        self.mean: np.ndarray = np.zeros(n_columns)
+        self.m2: np.ndarray = np.zeros(n_columns)
+        self.min: np.ndarray = np.full(n_columns, np.inf)
+        self.max: np.ndarray = np.full(n_columns, -np.inf)
+
+    def add(self, values: np.ndarray) -> None:
+        """
+        Parameters:
+            values (np.ndarray): A (n, n_columns) batch, or (n,) for one column.
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+        valid: np.ndarray = ~np.isnan(values)
+        count: np.ndarray = valid.sum(axis=0)
+        if not count.any():
+            return
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean: np.ndarray = np.where(count > 0, np.nansum(values, axis=0) / count, 0.0)
+            m2: np.ndarray = np.nansum((values - mean) ** 2, axis=0)
+
+            total: np.ndarray = self.count + count
+            delta: np.ndarray = mean - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * count / total, 0.0)
+            self.m2 = np.where(total > 0, self.m2 + m2 + delta ** 2 * self.count * count / total, 0.0)
+        self.count = total
+        self.min = np.fmin(self.min, np.nanmin(np.where(valid, values, np.inf), axis=0))
+        self.max = np.fmax(self.max, np.nanmax(np.where(valid, values, -np.inf), axis=0))
+
+    def variance(self, ddof: int = 1) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        return np.sqrt(self.variance(ddof))
+
+    def std_error(self) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.std() / np.sqrt(self.count)
+
+class TDigest:
+    """
+    A t-digest of one stream of values, estimating its quantiles from at most about compression centroids.
+
+    Each batch is merged in one vectorized pass: the centroids and the new
+    values are sorted together and adjacent ones grouped by a scale function
+    that spends half the compression on the k1 scale, for resolution in the
+    body, and half on the k2 scale, whose centroids shrink geometrically
+    towards the tails down to single values at the extremes, so p0.1 and
+    p99.9 of a skewed output stay accurate.
+    """
+
+    def __init__(self, compression: float = 200):
+        self.compression: float = compression
+        self.means: np.ndarray = np.empty(0)
+        self.weights: np.ndarray = np.empty(0)
+        self.min: float = np.inf
+        self.max: float = -np.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def add(self, values: np.ndarray, weights: np.ndarray = None) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=np.float64).ravel()
+        valid: np.ndarray = ~np.isnan(values)
+        values, weights = values[valid], weights[valid]
+        if len(values) == 0:
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        means: np.ndarray = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, weights])
+        order: np.ndarray = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        # Group by the k1 plus k2 scale of each point's left cumulative quantile. k1 spans
+        # pi, and over n values k2's log-odds span 2 log n, so each gives compression / 2 groups
+        cumulative: np.ndarray = np.cumsum(weights)
+        total: float = cumulative[-1]
+        q_left: np.ndarray = (cumulative - weights) / total
+        with np.errstate(divide='ignore'):
+            k: np.ndarray = (self.compression / (2 * np.pi) * np.arcsin(2 * q_left - 1)
+                             + self.compression / (4 * max(np.log(total), 1.0)) * np.log(q_left / (1 - q_left)))
+        group: np.ndarray = np.floor(k)
+        starts: np.ndarray = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def merge(self, other: 'TDigest') -> None:
+        if other.count:
+            self.add(other.means, other.weights)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+    def quantile(self, q: float | np.ndarray) -> np.ndarray:
+        """
+        Estimate quantiles, interpolating between centroid centres and the observed min and max.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if len(self.means) == 0:
+            return np.full(q.shape, np.nan)
+        total: float = self.count
+        centres: np.ndarray = np.cumsum(self.weights) - self.weights / 2
+        positions: np.ndarray = np.r_[0.0, centres, total]
+        values: np.ndarray = np.r_[self.min, self.means, self.max]
+        return np.interp(q * total, positions, values)
+
+class Histogram:
+    """
+    Fixed-bin counts of a stream, with the values outside the bins counted apart.
+
+    Without edges, they are spread over the range of the first batch widened
+    by half its width on each side.
+    """
+
+    def __init__(self, edges: np.ndarray = None, n_bins: int = 50):
+        self.edges: np.ndarray = None if edges is None else np.asarray(edges, dtype=np.float64)
+        self.n_bins: int = n_bins if edges is None else len(edges) - 1
+        self.counts: np.ndarray = np.zeros(self.n_bins, dtype=np.int64)
+        self.underflow: int = 0
+        self.overflow: int = 0
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        if self.edges is None:
+            low, high = float(values.min()), float(values.max())
+            margin: float = (high - low) / 2 or abs(low) / 2 or 1.0
+            self.edges = np.linspace(low - margin, high + margin, self.n_bins + 1)
+        self.counts += np.histogram(values, self.edges)[0]
+        self.underflow += int(np.count_nonzero(values < self.edges[0]))
+        self.overflow += int(np.count_nonzero(values > self.edges[-1]))
+
+    def to_dict(self) -> dict:
+        return {'edges': self.edges, 'counts': self.counts,
+                'underflow': self.underflow, 'overflow': self.overflow}
+
+class StreamingSummary:
+    """
+    Running moments, t-digest quantiles and a histogram of each column of one output.
+    """
+
+    def __init__(self, n_columns: int = 1, compression: float = 200, n_bins: int = 50,
+                 edges: np.ndarray = None):
+        self.n_columns: int = n_columns
+        self.moments: RunningMoments = RunningMoments(n_columns)
+        self.digests: list[TDigest] = [TDigest(compression) for _ in range(n_columns)]
+        self.histograms: list[Histogram] = [Histogram(edges, n_bins) for _ in range(n_columns)]
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).reshape(len(values), self.n_columns)
+        values = np.where(np.isfinite(values), values, np.nan)
+        self.moments.add(values)
+        for column, (digest, histogram) in enumerate(zip(self.digests, self.histograms)):
+            digest.add(values[:, column])
+            histogram.add(values[:, column])
+
+    def summary(self, quantiles: tuple = (0.05, 0.5, 0.95)) -> dict:
+        """
+        Returns:
+            summary (dict): The count, mean, std, standard error, min, max, quantiles and
+                histograms, each with one entry per column, or a scalar for a single column.
+        """
+        def squeeze(value):
+            return value[0] if self.n_columns == 1 else value
+
+        summary: dict = {'count': squeeze(self.moments.count),
+                         'mean': squeeze(self.moments.mean),
+                         'std': squeeze(self.moments.std()),
+                         'std_error': squeeze(self.moments.std_error()),
+                         'min': squeeze(self.moments.min),
+                         'max': squeeze(self.moments.max)}
+        estimates: np.ndarray = np.array([digest.quantile(quantiles) for digest in self.digests])
+        for i, q in enumerate(quantiles):
+            summary[f'p{100 * q:g}'] = squeeze(estimates[:, i])
+        summary['histogram'] = squeeze([histogram.to_dict() for histogram in self.histograms])
+        return summary
+
+class ValuationAggregator:
+    """
+    Streams the FCF, enterprise value and value per share of valued paths into summaries.
+
+    FCF is summarized year by year. Paths that could not be valued count in
+    n_failed and are left out of the value summaries.
+    """
+
+    def __init__(self, horizon: int, fdso: float, compression: float = 200, n_bins: int = 50,
+                 edges: dict[str, np.ndarray] = None):
+        edges = edges or {}
+        self.fdso: float = fdso
+        self.n_paths: int = 0
+        self.n_failed: int = 0
+        # The drift of a reduced-precision run from float64, see Precision.precision_drift
+        self.precision: dict = None
+        self.outputs: dict[str, StreamingSummary] = {
+            'fcf': StreamingSummary(horizon, compression, n_bins, edges.get('fcf')),
+            'enterprise_value': StreamingSummary(1, compression, n_bins, edges.get('enterprise_value')),
+            'value_per_share': StreamingSummary(1, compression, n_bins, edges.get('value_per_share'))}
+
+    def add(self, fcf: np.ndarray, enterprise_value: np.ndarray, equity_value: np.ndarray) -> None:
+        """
+        Parameters:
+            fcf (np.ndarray): The (paths, horizon) FCF of a chunk.
+            enterprise_value (np.ndarray): The enterprise value of each path.
+            equity_value (np.ndarray): The equity value of each path.
+        """
+        self.n_paths += len(enterprise_value)
+        self.n_failed += int(np.count_nonzero(~np.isfinite(enterprise_value)))
+        self.outputs['fcf'].add(fcf)
+        self.outputs['enterprise_value'].add(enterprise_value)
+        self.outputs['value_per_share'].add(np.asarray(equity_value) / self.fdso)
+
+    def summary(self, quantiles: tuple = (0.05, 0.5, 0.95)) -> dict:
+        summary: dict = {'n_paths': self.n_paths,
+                         'n_failed': self.n_failed,
+                         **{name: output.summary(quantiles) for name, output in self.outputs.items()}}
+        if self.precision is not None:
+            summary['precision'] = self.precision
+        return summary
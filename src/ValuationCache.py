@@ -0,0 +1,102 @@
+"""
+A class memoizing valuations by the data and assumptions that produced them
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+class ValuationCache:
+    """
+    A least-recently-used cache of valuations.
+
+    Entries are keyed on a hash of the statement arrays, the enterprise's
+    scalar inputs, every estimated (*_e) parameter and the market inputs, so
+    any change to what a valuation depends on misses the cache. The least
+    recently used entries are evicted beyond max_entries or max_bytes.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 2 ** 20):
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.entries: OrderedDict[str, dict] = OrderedDict()
+        self.nbytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    @staticmethod
+    def key(engine, *inputs: float) -> str:
+        """
+        Hash what a valuation by the engine depends on.
+
+        Parameters:
+            engine (ProjectionEngine): The engine.
+            inputs (float): The market inputs, such as rf, rm, beta_u and roic.
+        Returns:
+            key (str): The hex digest.
+        """
+        enterprise = engine.enterprise
+        statements = enterprise.statements
+        digest = hashlib.sha256()
+        digest.update(repr(sorted(statements.label_index.items())).encode())
+        digest.update(np.ascontiguousarray(statements.values).tobytes())
+        digest.update(np.array([enterprise.fdso, enterprise.debt_value, enterprise.stat_tax, enterprise.cod],
+                               dtype=np.float64).tobytes())
+        for param_name in sorted(engine.params):
+            if param_name.endswith('_e'):
+                param = engine.params[param_name]
+                digest.update(param_name.encode())
+                digest.update(np.ascontiguousarray(param.data, dtype=np.float64).tobytes())
+                digest.update(np.float64(param.std).tobytes())
+        digest.update(np.array(inputs, dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """
+        Look up a valuation, marking it as recently used.
+        """
+        entry: dict = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        """
+        Store a valuation, then evict the least recently used entries beyond the limits.
+
+        Parameters:
+            key (str): The key, from ValuationCache.key.
+            entry (dict): The valuation; its arrays are counted towards max_bytes.
+        """
+        if key in self.entries:
+            self.nbytes -= entry_nbytes(self.entries.pop(key))
+        self.entries[key] = entry
+        self.nbytes += entry_nbytes(entry)
+        while self.entries and (len(self.entries) > self.max_entries or self.nbytes > self.max_bytes):
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= entry_nbytes(evicted)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.nbytes = 0
+
+    def stats(self) -> dict:
+        lookups: int = self.hits + self.misses
+        return {'entries': len(self.entries),
+                'nbytes': self.nbytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
+
+def entry_nbytes(entry: dict) -> int:
+    return sum(value.nbytes if isinstance(value, np.ndarray) else 8 for value in entry.values())
@@ -9,6 +9,7 @@ class MenuBar(QMenuBar):
 
         file_menu: QMenu = self.addMenu('&File')
         edit_menu: QMenu = self.addMenu('&Edit')
+        valuation_menu: QMenu = self.addMenu('&Valuation')
         help_menu: QMenu = self.addMenu('&Help')
 
         # File menu actions
@@ -43,6 +44,12 @@ class MenuBar(QMenuBar):
         paste_action.setShortcut("Ctrl+V")
         edit_menu.addAction(paste_action)
 
+        # Valuation menu actions, enabled once statements are imported
+        simulate_action: QAction = QAction("&Simulate...", self)
+        simulate_action.setShortcut("Ctrl+R")
+        simulate_action.setEnabled(False)
+        valuation_menu.addAction(simulate_action)
+
         # Help menu actions
         about_action: QAction = QAction("&About", self)
         help_menu.addAction(about_action)
@@ -51,4 +58,5 @@ class MenuBar(QMenuBar):
         self.open_action: QAction = open_action
         self.save_action: QAction = save_action
         self.exit_action: QAction = exit_action
+        self.simulate_action: QAction = simulate_action
         self.about_action: QAction = about_action
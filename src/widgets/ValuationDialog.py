@@ -0,0 +1,82 @@
+#
+
+from PyQt6.QtWidgets import (QDialog,
+                             QDialogButtonBox,
+                             QDoubleSpinBox,
+                             QFormLayout,
+                             QLineEdit,
+                             QSpinBox)
+
+class ValuationDialog(QDialog):
+    """
+    Ask for the terms of an enterprise and the market inputs to value it at.
+    """
+
+    def __init__(self, name: str = '', parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Simulate valuation")
+
+        self.name_edit: QLineEdit = QLineEdit(name)
+        self.ticker_edit: QLineEdit = QLineEdit(name.upper())
+        self.fdso_box: QDoubleSpinBox = self.number_box(1.0, 1e12, 1000.0, 0)
+        self.debt_box: QDoubleSpinBox = self.number_box(0.0, 1e15, 0.0, 2)
+        self.tax_box: QDoubleSpinBox = self.number_box(0.0, 1.0, 0.21, 4)
+        self.cod_box: QDoubleSpinBox = self.number_box(0.0, 1.0, 0.05, 4)
+        self.rf_box: QDoubleSpinBox = self.number_box(0.0, 1.0, 0.04, 4)
+        self.rm_box: QDoubleSpinBox = self.number_box(0.0, 1.0, 0.09, 4)
+        self.beta_box: QDoubleSpinBox = self.number_box(0.0, 10.0, 1.0, 3)
+        self.roic_box: QDoubleSpinBox = self.number_box(-1.0, 1.0, 0.1, 4)
+        self.paths_box: QSpinBox = QSpinBox()
+        self.paths_box.setRange(0, 100_000_000)
+        self.paths_box.setSingleStep(10000)
+        self.paths_box.setValue(100000)
+
+        layout: QFormLayout = QFormLayout(self)
+        layout.addRow("Name", self.name_edit)
+        layout.addRow("Ticker", self.ticker_edit)
+        layout.addRow("Diluted shares", self.fdso_box)
+        layout.addRow("Debt value", self.debt_box)
+        layout.addRow("Tax rate", self.tax_box)
+        layout.addRow("Cost of debt", self.cod_box)
+        layout.addRow("Risk-free return", self.rf_box)
+        layout.addRow("Market return", self.rm_box)
+        layout.addRow("Unlevered beta", self.beta_box)
+        layout.addRow("ROIC", self.roic_box)
+        layout.addRow("Paths", self.paths_box)
+
+        buttons: QDialogButtonBox = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok
+                                                     | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    @staticmethod
+    def number_box(low: float, high: float, value: float, decimals: int) -> QDoubleSpinBox:
+        box: QDoubleSpinBox = QDoubleSpinBox()
+        box.setDecimals(decimals)
+        box.setRange(low, high)
+        box.setValue(value)
+        return box
+
+    def terms(self) -> dict:
+        """
+        The name, ticker, fdso, debt_value, stat_tax and cod of the enterprise.
+        """
+        return {'name': self.name_edit.text(),
+                'ticker': self.ticker_edit.text(),
+                'fdso': self.fdso_box.value(),
+                'debt_value': self.debt_box.value(),
+                'stat_tax': self.tax_box.value(),
+                'cod': self.cod_box.value()}
+
+    def market(self) -> dict:
+        """
+        The rf, rm, beta_u and roic to value the enterprise at.
+        """
+        return {'rf': self.rf_box.value(),
+                'rm': self.rm_box.value(),
+                'beta_u': self.beta_box.value(),
+                'roic': self.roic_box.value()}
+
+    def n_paths(self) -> int:
+        return self.paths_box.value()
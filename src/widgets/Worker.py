@@ -0,0 +1,57 @@
+#
+
+import inspect
+import threading
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+
+from Cancellation import Cancelled
+
+class WorkerSignals(QObject):
+    # Emitted from the pool thread; queued connections deliver them on the UI thread
+    progress = pyqtSignal(int, int)
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()
+
+class Worker(QRunnable):
+    """
+    Run a function on a QThreadPool thread and report back through signals.
+
+    A function taking a progress argument is handed a callable emitting
+    progress(done, total), and one taking a cancelled argument is handed a
+    callable that turns True once cancel() is called; raising Cancelled then
+    ends the run with the cancelled signal.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args: tuple = args
+        self.kwargs: dict = kwargs
+        self.signals: WorkerSignals = WorkerSignals()
+        self.cancel_event: threading.Event = threading.Event()
+
+        parameters = inspect.signature(fn).parameters
+        if 'progress' in parameters:
+            self.kwargs.setdefault('progress', self.signals.progress.emit)
+        if 'cancelled' in parameters:
+            self.kwargs.setdefault('cancelled', self.cancel_event.is_set)
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    @pyqtSlot()
+    def run(self) -> None:
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Cancelled:
+            self.signals.cancelled.emit()
+        except Exception:
+            self.signals.error.emit(traceback.format_exc())
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
@@ -0,0 +1,45 @@
+import importlib.util
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+src_dir = Path(__file__).resolve().parent.parent / 'src'
+
+
+def import_from_src(statement: str) -> subprocess.CompletedProcess:
+    """
+    Run an import the way the desktop app does, as top-level modules from the src directory.
+    """
+    return subprocess.run([sys.executable, '-c', statement], cwd=src_dir, capture_output=True, text=True)
+
+
+class TestAppImports(unittest.TestCase):
+    def test_jobs_imports_as_top_level_module(self):
+        completed = import_from_src('import Jobs; Jobs.simulate_in_chunks, Jobs.value_in_chunks, Jobs.value_enterprise')
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+
+    def test_import_wizard_imports_as_top_level_module(self):
+        completed = import_from_src('import ImportWizard; ImportWizard.load_all_statements')
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+
+    def test_import_wizard_does_not_load_the_engine(self):
+        completed = import_from_src("import sys, ImportWizard; assert 'ProjectionEngine' not in sys.modules")
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+
+    def test_sampling_values_as_top_level_module(self):
+        completed = import_from_src('import sys; sys.path.insert(0, ".."); '
+                                    'from tests import fixtures; import Sampling; '
+                                    'Sampling.estimate_value(fixtures.mock_engine(), 0.04, 0.09, 1.0, 0.12, '
+                                    'n_paths=64, seed=1)')
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+
+    @unittest.skipUnless(importlib.util.find_spec('PyQt6'), "PyQt6 is not installed")
+    def test_app_imports(self):
+        completed = import_from_src('import AdvancedValuation; from widgets.Worker import Worker; '
+                                    'from widgets.ValuationDialog import ValuationDialog')
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
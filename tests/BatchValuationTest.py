@@ -0,0 +1,105 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.BatchValuation import (batch_value, completed_tickers, read_manifest, read_results,
+                                ResultWriter, value_company, FIELDS)
+
+ibm_file = os.path.join(os.path.dirname(__file__), '..', 'IBM.xlsx')
+defaults = {'fdso': 920, 'debt_value': 56.0, 'stat_tax': 0.21, 'cod': 0.05,
+            'rf': 0.04, 'rm': 0.09, 'beta_u': 1.0, 'roic': 0.1}
+
+
+class TestBatchValuation(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        shutil.copy(ibm_file, os.path.join(self.directory, 'IBM.xlsx'))
+        self.manifest = os.path.join(self.directory, 'manifest.json')
+        with open(self.manifest, 'w') as f:
+            json.dump({'defaults': defaults,
+                       'companies': [{'ticker': 'IBM', 'file': 'IBM.xlsx', 'n_paths': 100, 'seed': 1},
+                                     {'ticker': 'IBM_LOW', 'file': 'IBM.xlsx',
+                                      'revenue_growth_e': [0.01, 0.01, 0.01]},
+                                     {'ticker': 'MISSING', 'file': 'MISSING.xlsx'}]}, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_manifest(self):
+        records = read_manifest(self.manifest)
+        self.assertEqual([record['ticker'] for record in records], ['IBM', 'IBM_LOW', 'MISSING'])
+        self.assertEqual(records[0]['file'], str(Path(self.directory, 'IBM.xlsx').resolve()))
+        self.assertEqual(records[1]['roic'], 0.1)
+
+        csv_manifest = os.path.join(self.directory, 'manifest.csv')
+        with open(csv_manifest, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['ticker', 'file', *defaults, 'revenue_growth_e', 'seed'])
+            writer.writeheader()
+            writer.writerow({'ticker': 'IBM', 'file': 'IBM.xlsx', **defaults,
+                             'revenue_growth_e': '0.02;0.03', 'seed': '7'})
+        record = read_manifest(csv_manifest)[0]
+        self.assertEqual(record['revenue_growth_e'], [0.02, 0.03])
+        self.assertEqual(record['seed'], 7)
+        self.assertEqual(record['fdso'], 920)
+
+    def test_value_company(self):
+        ibm, low, missing = [value_company(record) for record in read_manifest(self.manifest)]
+        self.assertEqual(ibm['status'], 'ok')
+        self.assertAlmostEqual(ibm['value_per_share'], ibm['equity_value'] / 920)
+        self.assertLessEqual(ibm['equity_value_p05'], ibm['equity_value_p50'])
+        self.assertLessEqual(ibm['equity_value_p50'], ibm['equity_value_p95'])
+        self.assertEqual(low['status'], 'ok')
+        self.assertNotAlmostEqual(low['equity_value'], ibm['equity_value'])
+        self.assertIsNone(low['n_paths'])
+        self.assertEqual(missing['status'], 'error')
+        self.assertIn('FileNotFoundError', missing['error'])
+        self.assertEqual(set(ibm), set(FIELDS))
+
+    def test_resumes_after_interruption(self):
+        output = os.path.join(self.directory, 'results.jsonl')
+        with ResultWriter(output) as writer:
+            writer.write(value_company(read_manifest(self.manifest)[0]))
+        with open(output, 'a') as f:
+            f.write('{"ticker": "IBM_LOW", "sta')
+
+        rows = list(batch_value(self.manifest, output, max_workers=2, max_pending=1))
+        self.assertEqual({row['ticker'] for row in rows}, {'IBM_LOW', 'MISSING'})
+        self.assertEqual([row['ticker'] for row in read_results(output)][0], 'IBM')
+        self.assertEqual(len(read_results(output)), 3)
+        self.assertEqual(completed_tickers(output), {'IBM', 'IBM_LOW'})
+
+        rows = list(batch_value(self.manifest, output, max_workers=1))
+        self.assertEqual([row['ticker'] for row in rows], ['MISSING'])
+        self.assertEqual(list(batch_value(self.manifest, output, retry_failed=False)), [])
+
+    def test_retry_replaces_failed_row(self):
+        output = os.path.join(self.directory, 'results.jsonl')
+        list(batch_value(self.manifest, output, max_workers=2))
+        self.assertEqual({row['ticker']: row['status'] for row in read_results(output)}['MISSING'], 'error')
+
+        shutil.copy(ibm_file, os.path.join(self.directory, 'MISSING.xlsx'))
+        rows = list(batch_value(self.manifest, output, max_workers=1))
+        self.assertEqual([(row['ticker'], row['status']) for row in rows], [('MISSING', 'ok')])
+        results = read_results(output)
+        self.assertEqual(sorted(row['ticker'] for row in results), ['IBM', 'IBM_LOW', 'MISSING'])
+        self.assertTrue(all(row['status'] == 'ok' for row in results))
+        self.assertNotIn('results.tmp.jsonl', os.listdir(self.directory))
+
+    def test_csv_output(self):
+        output = os.path.join(self.directory, 'results.csv')
+        list(batch_value(self.manifest, output, max_workers=2))
+        list(batch_value(self.manifest, output, max_workers=2))
+        rows = read_results(output)
+        self.assertEqual(sorted(row['ticker'] for row in rows), ['IBM', 'IBM_LOW', 'MISSING'])
+        self.assertEqual(list(rows[0]), list(FIELDS))
+
+        list(batch_value(self.manifest, output, max_workers=2, resume=False))
+        self.assertEqual(len(read_results(output)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
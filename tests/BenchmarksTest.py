@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+
+from benchmarks.Benchmarks import compare, make_enterprise, make_engine, measure_import, run, time_call
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_synthetic_enterprise(self):
+        engine = make_engine(make_enterprise(n_years=8, seed=3), horizon=4)
+        engine.calc_correlation()
+        self.assertEqual(engine.params['revenue_growth_a'].data.shape, (7,))
+        self.assertFalse(np.isnan(engine.correlation_matrix).any())
+
+    def test_time_call(self):
+        calls = []
+        timing = time_call(lambda: calls.append(1), repeat=3, number=2)
+        self.assertEqual(len(calls), 7)
+        self.assertLessEqual(timing['min'], timing['median'])
+        self.assertLessEqual(timing['median'], timing['max'])
+
+    def test_time_call_sets_up_each_repeat(self):
+        states = []
+        calls = []
+        time_call(calls.append, repeat=3, number=2, setup=lambda: states.append([]) or states[-1])
+        self.assertEqual(len(states), 4)
+        self.assertEqual(calls, [states[0]] + [state for state in states[1:] for _ in range(2)])
+
+    def test_run_subset(self):
+        report = run('small', repeat=1, only=['project_stmt', 'calc_correlation'])
+        self.assertEqual(set(report['results']), {'project_stmt', 'calc_correlation'})
+        self.assertEqual(report['scale']['name'], 'small')
+
+    def test_compare_flags_regressions(self):
+        baseline = {'results': {'fast': {'median': 1.0}, 'slow': {'median': 1.0}, 'gone': {'median': 1.0}}}
+        report = {'results': {'fast': {'median': 0.9}, 'slow': {'median': 1.5}, 'new': {'median': 1.0}}}
+        comparison = compare(report, baseline, threshold=1.25)
+        self.assertEqual(set(comparison), {'fast', 'slow'})
+        self.assertFalse(comparison['fast']['regressed'])
+        self.assertTrue(comparison['slow']['regressed'])
+        self.assertAlmostEqual(comparison['slow']['ratio'], 1.5)
+
+    def test_headless_import_defers_heavy_modules(self):
+        for module in ('src', 'src.ProjectionEngine', 'src.SensitivityGrid', 'src.Jobs'):
+            import_time = measure_import(module)
+            self.assertEqual(import_time['deferred_loaded'], [], module)
+            self.assertGreater(import_time['total'], import_time['own'])
+
+
+if __name__ == '__main__':
+    unittest.main()
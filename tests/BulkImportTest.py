@@ -0,0 +1,76 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import pandas as pd
+from pathlib import Path
+
+from src.BulkImport import bulk_import, find_workbooks, import_workbook, ImportStats
+from src.ImportWizard import load_all_statements, TEMPLATE_LABELS
+
+ibm_file = os.path.join(os.path.dirname(__file__), '..', 'IBM.xlsx')
+ibm_terms = {'fdso': 920, 'debt_value': 56.0, 'stat_tax': 0.21, 'cod': 0.05}
+
+
+class TestBulkImport(unittest.TestCase):
+    def setUp(self):
+        self.source_dir = tempfile.mkdtemp()
+        for stem in ('IBM', 'IBM_COPY'):
+            shutil.copy(ibm_file, os.path.join(self.source_dir, f'{stem}.xlsx'))
+        Path(self.source_dir, 'BROKEN.xlsx').write_bytes(b'not a workbook')
+        Path(self.source_dir, '~$IBM.xlsx').write_bytes(b'lock file')
+
+    def tearDown(self):
+        shutil.rmtree(self.source_dir)
+
+    def test_find_workbooks(self):
+        expected = ['BROKEN.xlsx', 'IBM.xlsx', 'IBM_COPY.xlsx']
+        self.assertEqual([path.name for path in find_workbooks(self.source_dir)], expected)
+        self.assertEqual([path.name for path in find_workbooks(os.path.join(self.source_dir, 'IBM*.xlsx'))],
+                         expected[1:])
+
+    def test_import_workbook(self):
+        result = import_workbook(ibm_file, {**ibm_terms, 'ticker': 'NYSE:IBM'})
+        self.assertTrue(result.ok)
+        self.assertEqual(result.enterprise.ticker, 'NYSE:IBM')
+        self.assertEqual(result.enterprise.name, 'IBM')
+        expected = load_all_statements(ibm_file)
+        pd.testing.assert_frame_equal(result.enterprise.income_statement, expected['is'].rename(index=TEMPLATE_LABELS))
+        pd.testing.assert_frame_equal(result.enterprise.balance_sheet, expected['bs'].rename(index=TEMPLATE_LABELS))
+
+    def test_missing_terms_are_captured(self):
+        result = import_workbook(ibm_file, {'fdso': 920})
+        self.assertFalse(result.ok)
+        self.assertIn('debt_value', result.error)
+
+    def test_bulk_import_captures_errors(self):
+        stats = ImportStats()
+        results = list(bulk_import(self.source_dir, default_terms=ibm_terms,
+                                   terms={'IBM': {'ticker': 'NYSE:IBM'}},
+                                   max_workers=2, max_pending=1, stats=stats))
+
+        by_name = {Path(result.file_name).name: result for result in results}
+        self.assertEqual(set(by_name), {'BROKEN.xlsx', 'IBM.xlsx', 'IBM_COPY.xlsx'})
+        self.assertFalse(by_name['BROKEN.xlsx'].ok)
+        self.assertEqual(by_name['IBM.xlsx'].enterprise.ticker, 'NYSE:IBM')
+        self.assertEqual(by_name['IBM_COPY.xlsx'].enterprise.ticker, 'IBM_COPY')
+        pd.testing.assert_frame_equal(by_name['IBM.xlsx'].enterprise.cash_flow_statement,
+                                      by_name['IBM_COPY.xlsx'].enterprise.cash_flow_statement)
+
+        report = stats.report()
+        self.assertEqual(report['n_files'], 3)
+        self.assertEqual(report['n_failed'], 1)
+        self.assertGreater(report['files_per_second'], 0)
+
+
+    def test_runs_as_module(self):
+        completed = subprocess.run([sys.executable, '-m', 'src.BulkImport', os.path.join(self.source_dir, 'IBM.xlsx')],
+                                   cwd=Path(__file__).resolve().parent.parent, capture_output=True, text=True)
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertIn('IBM.xlsx: ok', completed.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -22,7 +22,9 @@ class TestProjectionEngine(unittest.TestCase):
         enterprise = Enterprise(name='Test Corp',
                                 ticker='TEST',
                                 fdso=100,
-                                debt_value=0.0)
+                                debt_value=0.0,
+                                stat_tax=0.21,
+                                cod=0.05)
 
         # Create consistent data across all years to avoid NaN values
         # Use 7 years of data to ensure enough data points for correlation
@@ -125,7 +127,7 @@ class TestProjectionEngine(unittest.TestCase):
     def test_calc_correlation_with_empty_data(self):
         """Test that correlation calculation properly handles empty data."""
         # Create Enterprise object with empty data frames
-        enterprise = Enterprise(name='Test', ticker='TEST', fdso=0, debt_value=0.0)
+        enterprise = Enterprise(name='Test', ticker='TEST', fdso=0, debt_value=0.0, stat_tax=0.21, cod=0.05)
 
         # Create empty DataFrames with the expected indexes
         income_index = ['Revenues', 'Cost of Goods Sold', 'R&D Exp.', 'Selling General & Admin Exp.']
@@ -0,0 +1,88 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from pathlib import Path
+
+from src.DiskResults import DiskResults
+from src.Jobs import Cancelled, simulate_in_chunks
+from tests import fixtures
+
+
+class TestDiskResults(unittest.TestCase):
+    def setUp(self):
+        self.projection_engine = fixtures.mock_engine()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_simulates_chunk_by_chunk(self):
+        store = DiskResults.create(self.directory, years=np.arange(1, 4))
+        returned = simulate_in_chunks(self.projection_engine, 25, chunk_size=10, seed=2, store=store)
+        self.assertIs(returned, store)
+        store.close()
+        expected = simulate_in_chunks(self.projection_engine, 25, chunk_size=10, seed=2)
+
+        with DiskResults.open(self.directory) as reopened:
+            self.assertEqual(len(reopened), 25)
+            self.assertEqual([len(chunk) for chunk in reopened.chunks()], [10, 10, 5])
+            self.assertIsInstance(reopened.chunk(0).data, np.memmap)
+            np.testing.assert_array_equal(reopened['fcf'], expected['fcf'])
+            np.testing.assert_array_equal(reopened['revenues', :, -1], expected['revenues', :, -1])
+            np.testing.assert_allclose(reopened.mean('fcf'), expected.mean('fcf'))
+            np.testing.assert_allclose(reopened.std('ebit'), expected.std('ebit'))
+            np.testing.assert_allclose(reopened.percentile('fcf', 50), expected.percentile('fcf', 50))
+            with self.assertRaises(PermissionError):
+                reopened.new_chunk(5)
+
+    def test_single_chunk_reads_are_views(self):
+        store = DiskResults.create(self.directory, years=np.arange(1, 4))
+        store.append(self.projection_engine.simulate(8, seed=1))
+        store.close()
+        reopened = DiskResults.open(self.directory)
+        self.assertTrue(np.shares_memory(reopened['fcf'], reopened.chunk(0).data))
+        self.assertFalse(reopened['fcf'].flags.writeable)
+
+    def test_uncommitted_chunk_is_not_kept(self):
+        store = DiskResults.create(self.directory, years=np.arange(1, 4))
+        with self.assertRaises(Cancelled):
+            simulate_in_chunks(self.projection_engine, 30, chunk_size=10, seed=3, store=store,
+                               cancelled=lambda: len(store) >= 20)
+        self.projection_engine.simulate(4, seed=1, out=store.new_chunk(10))
+        with self.assertRaises(ValueError):
+            store.commit_chunk()
+        store.discard_chunk()
+        self.assertEqual(sorted(path.name for path in Path(self.directory).glob('chunk_*.npy')),
+                         ['chunk_00000.npy', 'chunk_00001.npy'])
+
+        reopened = DiskResults.open(self.directory, mode='r+')
+        self.assertEqual(len(reopened), 20)
+        reopened.append(self.projection_engine.simulate(5, seed=4))
+        self.assertEqual(len(DiskResults.open(self.directory)), 25)
+
+
+    def test_failed_chunk_is_discarded(self):
+        store = DiskResults.create(self.directory, years=np.arange(1, 4))
+        simulate = self.projection_engine.simulate
+
+        def fail_on_second_chunk(n_paths, seed=None, out=None):
+            if len(store) >= 10:
+                raise FloatingPointError("projection failed")
+            return simulate(n_paths, seed=seed, out=out)
+
+        self.projection_engine.simulate = fail_on_second_chunk
+        with self.assertRaises(FloatingPointError):
+            simulate_in_chunks(self.projection_engine, 30, chunk_size=10, seed=3, store=store)
+        self.assertEqual(len(store), 10)
+        self.assertFalse(Path(self.directory, 'chunk_00001.npy').exists())
+
+        # The store takes new chunks after the failure
+        self.projection_engine.simulate = simulate
+        simulate_in_chunks(self.projection_engine, 5, seed=4, store=store)
+        store.close()
+        self.assertEqual(len(DiskResults.open(self.directory)), 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
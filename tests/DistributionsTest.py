@@ -0,0 +1,122 @@
+import functools
+import unittest
+import numpy as np
+
+from src.Distributions import (Distribution, Empirical, LogNormal, Normal, StudentT, Triangular, TruncatedNormal,
+                               make_distribution, DISTRIBUTIONS)
+from src.Parameter import Parameter
+from tests import fixtures
+
+loc = np.array([0.6, 0.62, 0.64])
+history = np.array([0.55, 0.6, 0.58, 0.65, 0.62])
+
+
+class TestDistributions(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.shocks = self.rng.standard_normal((200000, 3))
+
+    def test_blocks_match_moments(self):
+        for name in ('Normal', 'LogNormal', 'Triangular', 'StudentT'):
+            distribution = make_distribution(name, loc, 0.05)
+            for draws in (distribution.sample((200000, 3), self.rng), distribution.from_normal(self.shocks)):
+                self.assertEqual(draws.shape, (200000, 3))
+                np.testing.assert_allclose(draws.mean(axis=0), loc, atol=2e-3, err_msg=name)
+                np.testing.assert_allclose(draws.std(axis=0), 0.05, rtol=0.03, err_msg=name)
+
+    def test_truncated_normal_stays_in_bounds(self):
+        distribution = TruncatedNormal(np.array([0.05, 0.5, 0.95]), 0.2)
+        for draws in (distribution.sample((100000, 3), self.rng), distribution.from_normal(self.shocks)):
+            self.assertGreaterEqual(draws.min(), 0.0)
+            self.assertLessEqual(draws.max(), 1.0)
+            self.assertAlmostEqual(draws[:, 1].mean(), 0.5, delta=2e-3)
+            self.assertGreater(draws[:, 0].mean(), 0.05)
+
+    def test_triangular_bounds(self):
+        draws = Triangular(loc, 0.05, lower=0.5, upper=0.7).from_normal(self.shocks)
+        self.assertGreaterEqual(draws.min(), 0.5)
+        self.assertLessEqual(draws.max(), 0.7)
+
+    def test_student_t_has_heavier_tails(self):
+        normal = Normal(loc, 0.05).from_normal(self.shocks)
+        student = StudentT(loc, 0.05, df=4).from_normal(self.shocks)
+        self.assertGreater(np.abs(student - loc).max(), np.abs(normal - loc).max())
+
+    def test_empirical_bootstraps_history(self):
+        distribution = make_distribution('Empirical', loc, 0.05, history)
+        residuals = history - history.mean()
+        for draws in (distribution.sample((1000, 3), self.rng), distribution.from_normal(self.shocks)):
+            np.testing.assert_allclose(np.unique(draws[:, 0] - loc[0]), np.sort(residuals), atol=1e-12)
+        with self.assertRaises(ValueError):
+            make_distribution('Empirical', loc, 0.05)
+
+    def test_exact_means(self):
+        distributions = [make_distribution(name, loc, 0.05, history) for name in DISTRIBUTIONS]
+        distributions += [TruncatedNormal(loc, 0.05, lower=0.6), Triangular(loc, 0.05, lower=0.5, upper=0.7)]
+        for distribution in distributions:
+            draws = distribution.from_normal(self.shocks)
+            np.testing.assert_allclose(distribution.mean, draws.mean(axis=0), atol=5e-4,
+                                       err_msg=type(distribution).__name__)
+        self.assertGreater(TruncatedNormal(loc, 0.05, lower=0.6).mean[0], 0.6)
+
+    def test_invalid_distributions(self):
+        with self.assertRaises(ValueError):
+            LogNormal(np.array([-0.1, 0.2]), 0.05)
+        with self.assertRaises(ValueError):
+            StudentT(loc, 0.05, df=2)
+        with self.assertRaises(ValueError):
+            make_distribution('Cauchy', loc, 0.05)
+        self.assertEqual(set(DISTRIBUTIONS), {'Normal', 'LogNormal', 'TruncatedNormal', 'Triangular',
+                                              'StudentT', 'Empirical'})
+
+    def test_distribution_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Distribution(loc, 0.05)
+
+        class Shifted(Distribution):
+            def from_normal(self, shocks, out=None):
+                return shocks + self.loc
+
+        with self.assertRaises(TypeError):
+            Shifted(loc, 0.05)
+
+    def test_from_normal_writes_out(self):
+        out = np.empty((200000, 3))
+        draws = Empirical(loc, history).from_normal(self.shocks, out=out)
+        self.assertIs(draws, out)
+
+
+class TestParameterDistributions(unittest.TestCase):
+    def setUp(self):
+        self.projection_engine = fixtures.mock_engine()
+        self.projection_engine.calc_correlation()
+
+    def test_parameter_sample(self):
+        param = Parameter(loc, 0.05, functools.partial(TruncatedNormal, upper=0.63))
+        draws = param.sample((1000, 3), np.random.default_rng(1))
+        self.assertEqual(draws.shape, (1000, 3))
+        self.assertLessEqual(draws.max(), 0.63)
+        self.assertIsInstance(Parameter(loc).sampler, Normal)
+
+    def test_normal_draws_unchanged(self):
+        self.projection_engine.correlation_matrix = None
+        draws = self.projection_engine.draw_ratios(50, seed=3)
+        shocks = np.random.default_rng(3).standard_normal((7, 50, 3))
+        param = self.projection_engine.params['sga_revenue_e']
+        np.testing.assert_array_equal(draws['sga_revenue_e'], param.data + param.std * shocks[2])
+
+    def test_set_distribution(self):
+        self.projection_engine.set_distribution('cogs_revenue_e', 'Empirical')
+        param = self.projection_engine.params['cogs_revenue_e']
+        self.assertIsInstance(param.sampler, Empirical)
+        np.testing.assert_array_equal(param.history, self.projection_engine.params['cogs_revenue_a'].data)
+
+        draws = self.projection_engine.draw_ratios(2000, seed=1)['cogs_revenue_e']
+        residuals = param.history - param.history.mean()
+        np.testing.assert_allclose(np.unique(draws[:, 0] - param.data[0]), np.unique(residuals), atol=1e-12)
+        with self.assertRaises(KeyError):
+            self.projection_engine.set_distribution('cogs_revenue_a', 'Normal')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.Enterprise import Enterprise, StatementArrays, stack_statements
+
+
+class TestStatementArrays(unittest.TestCase):
+    def setUp(self):
+        self.enterprise = Enterprise(name='Test Corp', ticker='TEST', fdso=100,
+                                     debt_value=50.0, stat_tax=0.21, cod=0.05)
+        years = ['2020', '2021', '2022']
+        self.enterprise.income_statement = pd.DataFrame({'Revenues': [100, 110, 121],
+                                                         'Cost of Goods Sold': [60, 65, 'NM'],
+                                                         'Unused Line': [1, 2, 3]}, index=years).T
+        self.enterprise.balance_sheet = pd.DataFrame({'Total Current Assets': [44, 48.4]},
+                                                     index=years[1:]).T
+        self.enterprise.cash_flow_statement = pd.DataFrame({'Depreciation & Amort.': [7, 7.7, 8.5]},
+                                                           index=years).T
+
+    def test_extracts_used_line_items(self):
+        statements = self.enterprise.statements
+        self.assertIsInstance(statements, StatementArrays)
+        self.assertEqual(statements.values.dtype, np.float64)
+        self.assertNotIn('Unused Line', statements)
+        np.testing.assert_array_equal(statements['Revenues'], [100, 110, 121])
+        self.assertTrue(np.isnan(statements['Cost of Goods Sold'][-1]))
+        self.assertEqual(statements.last('Depreciation & Amort.'), 8.5)
+
+    def test_aligns_on_latest_period(self):
+        np.testing.assert_array_equal(self.enterprise.statements['Total Current Assets'], [np.nan, 44, 48.4])
+
+    def test_missing_line_item(self):
+        with self.assertRaises(KeyError):
+            self.enterprise.statements['Total Current Liabilities']
+
+    def test_rebuilt_when_statement_replaced(self):
+        first = self.enterprise.statements
+        self.assertIs(self.enterprise.statements, first)
+        self.enterprise.income_statement = pd.DataFrame({'Revenues': [200, 220, 242]},
+                                                        index=['2020', '2021', '2022']).T
+        self.assertIsNot(self.enterprise.statements, first)
+        self.assertEqual(self.enterprise.statements.last('Revenues'), 242)
+
+    def test_rebuilt_after_invalidate(self):
+        first = self.enterprise.statements
+        version = self.enterprise.statements_version
+        self.enterprise.income_statement.loc['Revenues', '2022'] = 242
+        self.assertIs(self.enterprise.statements, first)
+
+        self.enterprise.invalidate()
+        self.assertEqual(self.enterprise.statements_version, version + 1)
+        self.assertEqual(self.enterprise.statements.last('Revenues'), 242)
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            self.enterprise.statements.extra = 1
+
+    def test_stack_statements(self):
+        other = Enterprise(name='Other Corp', ticker='OTHER', fdso=10,
+                           debt_value=5.0, stat_tax=0.21, cod=0.05)
+        other.income_statement = pd.DataFrame({'Revenues': [300, 330]}, index=['2021', '2022']).T
+        other.balance_sheet = pd.DataFrame({'Total Current Assets': [1, 2]}, index=['2021', '2022']).T
+        other.cash_flow_statement = pd.DataFrame({'Cash from Investing': [-1, -2]}, index=['2021', '2022']).T
+
+        statements, label_index = stack_statements([self.enterprise, other])
+        self.assertEqual(statements.shape, (2, 11, 3))
+        np.testing.assert_array_equal(statements[1, label_index['Revenues']], [np.nan, 300, 330])
+        self.assertTrue(np.isnan(statements[1, label_index['Depreciation & Amort.']]).all())
+        np.testing.assert_array_equal(statements[0, label_index['Revenues']], [100, 110, 121])
+
+
+if __name__ == '__main__':
+    unittest.main()
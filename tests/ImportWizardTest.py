@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from pathlib import Path
+
+from src.EnterpriseBuilder import EnterpriseBuilder
+from src.ImportWizard import import_statements, load_all_statements, split_statements, StatementCache, TEMPLATE_LABELS
+from src.Cancellation import Cancelled
+
+ibm_file = os.path.join(os.path.dirname(__file__), '..', 'IBM.xlsx')
+
+
+class TestStatementCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = StatementCache(self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_round_trip(self):
+        for stmt in ('is', 'cf', 'bs'):
+            expected = import_statements(stmt, ibm_file)
+            first = import_statements(stmt, ibm_file, cache=self.cache)
+            cached = import_statements(stmt, ibm_file, cache=self.cache)
+
+            pd.testing.assert_frame_equal(first, expected)
+            pd.testing.assert_frame_equal(cached, expected)
+        self.assertEqual(self.cache.misses, 3)
+        self.assertEqual(self.cache.hits, 3)
+
+    def test_invalidated_when_workbook_changes(self):
+        workbook = os.path.join(self.cache_dir, 'template.xlsx')
+        shutil.copy(ibm_file, workbook)
+        import_statements('bs', workbook, cache=self.cache)
+
+        # Appending bytes changes the content hash, so the old entry no longer matches
+        with open(workbook, 'ab') as file:
+            file.write(b'\0')
+        self.assertIsNone(self.cache.load('bs', Path(workbook)))
+        import_statements('bs', workbook, cache=self.cache)
+        self.assertEqual(len([name for name in os.listdir(self.cache_dir) if name.endswith('.npz')]), 2)
+
+    def test_lru_eviction(self):
+        import_statements('is', ibm_file, cache=self.cache)
+        import_statements('cf', ibm_file, cache=self.cache)
+        size = sum(os.path.getsize(os.path.join(self.cache_dir, name))
+                   for name in os.listdir(self.cache_dir) if name.endswith('.npz'))
+
+        # Touch the income statement so the cash flow statement is least recently used
+        import_statements('is', ibm_file, cache=self.cache)
+        self.cache.max_bytes = size
+        import_statements('bs', ibm_file, cache=self.cache)
+
+        names = os.listdir(self.cache_dir)
+        self.assertTrue(any('_is_' in name for name in names))
+        self.assertTrue(any('_bs_' in name for name in names))
+        self.assertFalse(any('_cf_' in name for name in names))
+
+    def test_invalid_statement(self):
+        with self.assertRaises(ValueError):
+            import_statements('xx', ibm_file, cache=self.cache)
+
+
+class TestLoadAllStatements(unittest.TestCase):
+    def test_matches_import_statements(self):
+        statements = load_all_statements(ibm_file)
+
+        self.assertEqual(set(statements), {'is', 'cf', 'bs'})
+        for stmt, df in statements.items():
+            pd.testing.assert_frame_equal(df, import_statements(stmt, ibm_file))
+
+    def test_split_by_header_labels(self):
+        header = ('Period Date', '2022', '2023')
+        rows = [('Some Company', None, None),
+                (None, None, None),
+                header, ('Revenues', 100, 110), ('Cost of Goods Sold', 60, 'NA'),
+                header, ('Net Income', 10, 12),
+                (None, None, None),
+                header, ('Total Current Assets', 40, 44), ('Total Equity', 20, 22),
+                (None, None, None)]
+
+        statements = split_statements(rows)
+
+        self.assertEqual(statements['is'].index.tolist(), ['Revenues', 'Cost of Goods Sold'])
+        self.assertTrue(pd.isna(statements['is'].loc['Cost of Goods Sold', '2023']))
+        self.assertEqual(statements['cf'].index.tolist(), ['Net Income'])
+        self.assertEqual(statements['bs'].loc['Total Equity'].tolist(), [20, 22])
+
+    def test_cancelled_while_reading(self):
+        polls = []
+        with self.assertRaises(Cancelled):
+            load_all_statements(ibm_file, cancelled=lambda: polls.append(True) or len(polls) > 1)
+        self.assertEqual(len(polls), 2)
+
+    def test_missing_statement(self):
+        with self.assertRaises(ValueError):
+            split_statements([('Period Date', '2022'), ('Revenues', 100)])
+
+    def test_uses_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache = StatementCache(cache_dir)
+            first = load_all_statements(ibm_file, cache=cache)
+            second = load_all_statements(ibm_file, cache=cache)
+            self.assertEqual(cache.hits, 3)
+            pd.testing.assert_frame_equal(first['bs'], second['bs'])
+        finally:
+            shutil.rmtree(cache_dir)
+
+
+class TestEnterpriseBuilder(unittest.TestCase):
+    def test_build(self):
+        enterprise = EnterpriseBuilder('IBM', 'IBM', 900, 50000.0, 0.21, 0.05, ibm_file).build()
+
+        self.assertEqual((enterprise.stat_tax, enterprise.cod), (0.21, 0.05))
+        statements = load_all_statements(ibm_file)
+        pd.testing.assert_frame_equal(enterprise.income_statement, statements['is'].rename(index=TEMPLATE_LABELS))
+        pd.testing.assert_frame_equal(enterprise.cash_flow_statement, statements['cf'])
+        pd.testing.assert_frame_equal(enterprise.balance_sheet, statements['bs'].rename(index=TEMPLATE_LABELS))
+
+    def test_build_renames_template_labels(self):
+        statements = load_all_statements(ibm_file)
+        enterprise = EnterpriseBuilder('IBM', 'IBM', 900, 50000.0, 0.21, 0.05, ibm_file).build(statements)
+
+        self.assertIn('Cost of Goods Sold', enterprise.income_statement.index)
+        self.assertIn('R&D Exp.', enterprise.income_statement.index)
+        self.assertIn('Net Property Plant & Equipment', enterprise.balance_sheet.index)
+        self.assertIn('Cost Of Goods Sold', statements['is'].index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src import Instrumentation
+from src.Instrumentation import instrument, instrumented
+from src.ImportWizard import load_all_statements
+from tests import fixtures
+
+ibm_file = os.path.join(os.path.dirname(__file__), '..', 'IBM.xlsx')
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.projection_engine = fixtures.mock_engine()
+
+    def tearDown(self):
+        Instrumentation.disable()
+
+    def test_disabled_records_nothing(self):
+        self.assertIsNone(Instrumentation.active)
+        self.projection_engine.project_stmt()
+        self.assertIsNone(Instrumentation.active)
+
+    def test_records_engine_stages(self):
+        with instrument() as stats:
+            self.projection_engine.calc_correlation()
+            self.projection_engine.simulate(n_paths=200, seed=1)
+            self.projection_engine.dcf_model(rf=0.04, rm=0.09, beta_u=1.0, roic=0.1)
+            self.projection_engine.dcf_model(rf=0.04, rm=0.09, beta_u=1.0, roic=0.12)
+        self.assertIsNone(Instrumentation.active)
+
+        report = stats.to_dict()
+        self.assertEqual(report['ProjectionEngine.dcf_model']['calls'], 2)
+        self.assertEqual(report['solve_leverage']['calls'], 2)
+        self.assertEqual(report['ProjectionEngine.draw_ratios']['max_size'], 7 * 200 * 3)
+        self.assertGreater(report['ProjectionEngine.simulate']['wall'], 0)
+        self.assertGreaterEqual(report['ProjectionEngine.dcf_model']['wall'],
+                                report['ProjectionEngine.value_cash_flows']['wall'])
+
+    def test_records_imports(self):
+        with instrument() as stats:
+            load_all_statements(ibm_file)
+        self.assertEqual(stats.stats['ImportWizard.load_all_statements'].calls, 1)
+        self.assertGreater(stats.stats['ImportWizard.load_all_statements'].size, 0)
+
+    def test_exports(self):
+        @instrumented('outer')
+        def outer():
+            return inner()
+
+        @instrumented('inner')
+        def inner():
+            return [1, 2]
+
+        with instrument() as stats:
+            outer()
+
+        with tempfile.TemporaryDirectory() as directory:
+            trace_file = os.path.join(directory, 'trace.json')
+            stats.to_chrome_trace(trace_file)
+            with open(trace_file) as f:
+                events = json.load(f)['traceEvents']
+            self.assertEqual([event['name'] for event in events], ['inner', 'outer'])
+            self.assertTrue(all(event['ph'] == 'X' for event in events))
+
+        report = json.loads(stats.to_json())
+        self.assertEqual(report['outer']['calls'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+
+from src.Jobs import Cancelled, simulate_in_chunks, value_enterprise
+from tests import fixtures
+
+
+class TestSimulateInChunks(unittest.TestCase):
+    def setUp(self):
+        self.projection_engine = fixtures.mock_engine()
+
+    def test_reports_progress(self):
+        reports = []
+        results = simulate_in_chunks(self.projection_engine, 25, chunk_size=10, seed=1,
+                                     progress=lambda done, total: reports.append((done, total)))
+        self.assertEqual(len(results), 25)
+        self.assertEqual(reports, [(10, 25), (20, 25), (25, 25)])
+        self.assertFalse(np.isnan(results['fcf']).any())
+
+    def test_reproducible(self):
+        first = simulate_in_chunks(self.projection_engine, 30, chunk_size=7, seed=5)
+        second = simulate_in_chunks(self.projection_engine, 30, chunk_size=7, seed=5)
+        np.testing.assert_array_equal(first['fcf'], second['fcf'])
+
+    def test_cancelled(self):
+        reports = []
+        with self.assertRaises(Cancelled):
+            simulate_in_chunks(self.projection_engine, 50, chunk_size=10,
+                               progress=lambda done, total: reports.append(done),
+                               cancelled=lambda: len(reports) >= 2)
+        self.assertEqual(reports, [10, 20])
+
+    def test_invalid_path_count(self):
+        with self.assertRaises(ValueError):
+            simulate_in_chunks(self.projection_engine, 0)
+
+
+class TestValueEnterprise(unittest.TestCase):
+    def setUp(self):
+        self.enterprise = fixtures.mock_enterprise()
+        self.market = {'rf': 0.04, 'rm': 0.09, 'beta_u': 1.0, 'roic': 0.12}
+
+    def test_values_and_simulates(self):
+        reports = []
+        valuation = value_enterprise(self.enterprise, **self.market, n_paths=300, horizon=3, chunk_size=100,
+                                     seed=2, progress=lambda done, total: reports.append(done))
+        self.assertAlmostEqual(valuation['value_per_share'], self.enterprise.equity_value / self.enterprise.fdso)
+        self.assertEqual(reports, [100, 200, 300])
+        simulation = valuation['simulation']
+        self.assertEqual(simulation['n_paths'], 300)
+        self.assertTrue(np.isfinite(simulation['value_per_share']['mean']))
+
+    def test_without_paths(self):
+        valuation = value_enterprise(self.enterprise, **self.market, n_paths=0, horizon=3)
+        self.assertIsNone(valuation['simulation'])
+        self.assertTrue(np.isfinite(valuation['value_per_share']))
+
+    def test_cancelled(self):
+        with self.assertRaises(Cancelled):
+            value_enterprise(self.enterprise, **self.market, n_paths=300, horizon=3, cancelled=lambda: True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import numpy as np
+from scipy.optimize import brentq
+
+from src.CashFlowCache import CashFlowCache
+from src.LeverageSolver import solve_leverage
+from src.ProjectionUtils import calc_ucoe, calc_coe, calc_wacc, calc_enterprise_value
+from tests import fixtures
+
+
+class TestSolveLeverage(unittest.TestCase):
+    def test_matches_brentq(self):
+        targets = np.array([0.05, 0.2, 0.3, 0.4])
+
+        def lev_difference(lev, paths):
+            return targets[paths] * (1 + lev) ** 2 / 2 - lev
+
+        solution = solve_leverage(lev_difference, len(targets))
+
+        self.assertTrue(solution.converged.all())
+        for i, target in enumerate(targets):
+            expected = brentq(lambda lev: target * (1 + lev) ** 2 / 2 - lev, 0.0, 0.9999)
+            self.assertAlmostEqual(solution.leverage[i], expected, places=10)
+        self.assertTrue((solution.iterations > 0).all())
+
+    def test_unbracketed_paths_are_masked(self):
+        offsets = np.array([0.3, 2.0, np.nan])
+
+        def lev_difference(lev, paths):
+            return offsets[paths] - lev
+
+        solution = solve_leverage(lev_difference, len(offsets))
+
+        np.testing.assert_array_equal(solution.converged, [True, False, False])
+        self.assertAlmostEqual(solution.leverage[0], 0.3)
+        self.assertEqual(solution.iterations[1], 0)
+        self.assertEqual(solution.diagnostics()['n_converged'], 1)
+
+    def test_only_active_paths_are_evaluated(self):
+        evaluated = []
+
+        def lev_difference(lev, paths):
+            evaluated.append(len(paths))
+            return np.array([0.0, 0.4])[paths] - lev
+
+        solve_leverage(lev_difference, 2)
+
+        # The first path sits on the lower bracket and is never iterated
+        self.assertTrue(all(count == 1 for count in evaluated[2:]))
+
+
+class TestDcfPaths(unittest.TestCase):
+    def setUp(self):
+        self.projection_engine = fixtures.mock_engine()
+
+    def test_paths_match_scalar_solve(self):
+        results = self.projection_engine.simulate(n_paths=50, seed=3)
+        valuation = self.projection_engine.dcf_paths(rf=0.04, rm=0.09, beta_u=1.0, roic=0.12, results=results)
+
+        self.assertTrue(valuation['converged'].all())
+        ucoe = calc_ucoe(0.04, 0.09, 1.0)
+        for i in (0, 17, 49):
+            def lev_difference(lev):
+                wacc = calc_wacc(calc_coe(ucoe, 0.05, lev), 0.05, lev, 0.21)
+                ev = calc_enterprise_value(results['fcf', i], wacc, valuation['growth_rate'][i])
+                return 50.0 / ev - lev
+
+            self.assertAlmostEqual(valuation['leverage'][i], brentq(lev_difference, 0.0, 0.9999), places=10)
+        np.testing.assert_allclose(valuation['equity_value'], valuation['enterprise_value'] - 50.0)
+        self.assertFalse(np.isnan(results['pv_fcf']).any())
+
+    def test_dcf_model_sets_enterprise_value(self):
+        self.projection_engine.dcf_model(rf=0.04, rm=0.09, beta_u=1.0, roic=0.12)
+        valuation = self.projection_engine.dcf_paths(rf=0.04, rm=0.09, beta_u=1.0, roic=0.12)
+
+        self.assertAlmostEqual(self.projection_engine.enterprise.enterprise_value,
+                               valuation['enterprise_value'][-1], places=6)
+        self.assertAlmostEqual(self.projection_engine.enterprise.equity_value,
+                               self.projection_engine.enterprise.enterprise_value - 50.0)
+
+    def test_warm_start(self):
+        results = self.projection_engine.simulate(n_paths=200, seed=5)
+        cash_flows = self.projection_engine.cash_flows(roic=0.12, results=results)
+        cold = self.projection_engine.value_cash_flows(cash_flows, rf=0.04, rm=0.09, beta_u=1.0)
+
+        # A small tweak to the market inputs re-discounts the same cash flows from the last solution
+        warm = self.projection_engine.value_cash_flows(cash_flows, rf=0.041, rm=0.09, beta_u=1.0,
+                                                       warm_start=True)
+        reference = self.projection_engine.value_cash_flows(cash_flows, rf=0.041, rm=0.09, beta_u=1.0)
+
+        self.assertTrue(warm['converged'].all())
+        np.testing.assert_allclose(warm['leverage'], reference['leverage'], rtol=1e-9)
+        self.assertLess(warm['iterations'].sum(), cold['iterations'].sum())
+
+
+class TestCashFlowCache(unittest.TestCase):
+    def test_matches_enterprise_value(self):
+        rng = np.random.default_rng(1)
+        fcf = rng.normal(10.0, 2.0, (6, 30))
+        growth_rate = rng.uniform(0.0, 0.03, 6)
+        wacc = rng.uniform(0.06, 0.1, 6)
+        cash_flows = CashFlowCache(fcf, growth_rate)
+
+        np.testing.assert_allclose(cash_flows.enterprise_value(wacc),
+                                   calc_enterprise_value(fcf, wacc, growth_rate), rtol=1e-12)
+        np.testing.assert_allclose(cash_flows.enterprise_value(wacc[[1, 4]], np.array([1, 4])),
+                                   calc_enterprise_value(fcf[[1, 4]], wacc[[1, 4]], growth_rate[[1, 4]]),
+                                   rtol=1e-12)
+        np.testing.assert_allclose(cash_flows.pv_fcf(wacc),
+                                   fcf * (1 + wacc[:, np.newaxis]) ** -np.arange(1, 31), rtol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
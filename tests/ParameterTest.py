@@ -0,0 +1,79 @@
+import unittest
+import warnings
+import numpy as np
+
+from src.Parameter import Parameter, ParameterSet, ParameterWarning
+from tests import fixtures
+
+
+class TestParameterSet(unittest.TestCase):
+    def setUp(self):
+        self.enterprise = fixtures.mock_enterprise()
+        self.projection_engine = fixtures.mock_engine(self.enterprise)
+
+    def test_nothing_estimated_at_construction(self):
+        params = self.projection_engine.params
+        self.assertEqual(dict.__len__(params), 0)
+        self.assertEqual(len(params), 14)
+        self.assertIn('revenue_growth_a', params)
+
+    def test_estimated_once_on_access(self):
+        params = self.projection_engine.params
+        first = params['revenue_growth_a']
+        self.assertIs(params['revenue_growth_a'], first)
+        np.testing.assert_allclose(first.data[0], 0.1)
+        self.assertEqual(params['revenue_growth_e'].std, first.std)
+
+    def test_invalidated_when_statements_change(self):
+        params = self.projection_engine.params
+        first = params['revenue_growth_a']
+        statement = self.enterprise.income_statement.copy()
+        statement.loc['Revenues'] = statement.loc['Revenues'] * [1, 1, 1, 1, 1, 1, 2]
+        self.enterprise.income_statement = statement
+
+        second = params['revenue_growth_a']
+        self.assertIsNot(second, first)
+        self.assertAlmostEqual(second.data[-1], 177.1 * 2 / 161 - 1)
+
+    def test_invalidated_after_edit_in_place(self):
+        params = self.projection_engine.params
+        first = params['revenue_growth_a']
+        statement = self.enterprise.income_statement
+        statement.loc['Revenues', statement.columns[-1]] *= 2
+        self.assertIs(params['revenue_growth_a'], first)
+
+        self.enterprise.invalidate()
+        second = params['revenue_growth_a']
+        self.assertIsNot(second, first)
+        self.assertAlmostEqual(second.data[-1], 177.1 * 2 / 161 - 1)
+
+    def test_warning_instead_of_print(self):
+        statement = self.enterprise.income_statement.copy()
+        statement.loc['Revenues', '2018'] = 0.0
+        self.enterprise.income_statement = statement
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            with self.assertRaises(KeyError):
+                self.projection_engine.params['cogs_revenue_a']
+            std = self.projection_engine.params['cogs_revenue_e'].std
+
+        self.assertTrue(np.isnan(std))
+        self.assertEqual(len(caught), 1)
+        self.assertIsInstance(caught[0].message, ParameterWarning)
+        self.assertEqual(caught[0].message.param_name, 'cogs_revenue_a')
+        self.assertIsInstance(caught[0].message.error, ZeroDivisionError)
+        self.assertNotIn('cogs_revenue_a', dict(self.projection_engine.params.items()))
+
+    def test_assigned_parameter_survives_refresh(self):
+        version = [0]
+        params = ParameterSet({'a': lambda: Parameter(np.array([1.0, 2.0]))}, version=lambda: version[0])
+        params['b'] = Parameter(np.array([3.0]))
+        version[0] += 1
+        self.assertEqual(params['b'].mean, 3.0)
+        self.assertEqual(list(params), ['a', 'b'])
+        self.assertIsNone(params.get('c'))
+
+
+if __name__ == '__main__':
+    unittest.main()
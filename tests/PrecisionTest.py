@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+
+from src.Jobs import value_in_chunks
+from src.Precision import PrecisionWarning, precision_drift
+from src.ProjectionEngine import ProjectionEngine, RATIO_PARAMS
+from tests import fixtures
+
+
+class TestPrecision(unittest.TestCase):
+    def setUp(self):
+        self.enterprise = fixtures.mock_enterprise()
+        self.projection_engine = fixtures.mock_engine(self.enterprise)
+        self.engine32 = fixtures.mock_engine(self.enterprise, dtype=np.float32)
+        self.market = {'rf': 0.04, 'rm': 0.09, 'beta_u': 1.0, 'roic': 0.12}
+
+    def test_float32_simulation_follows_float64(self):
+        results = self.engine32.simulate(500, seed=4)
+        reference = self.projection_engine.simulate(500, seed=4)
+        self.assertEqual(results.data.dtype, np.float32)
+        self.assertEqual(self.engine32.draw_ratios(10, seed=4)['cogs_revenue_e'].dtype, np.float32)
+        scale = np.abs(reference['fcf']).max()
+        np.testing.assert_allclose(results['fcf'], reference['fcf'], atol=1e-5 * scale)
+        np.testing.assert_allclose(results['revenues'], reference['revenues'], rtol=1e-5)
+
+        valuation = self.engine32.dcf_paths(**self.market, results=results)
+        expected = self.projection_engine.dcf_paths(**self.market, results=reference)
+        self.assertEqual(valuation['equity_value'].dtype, np.float64)
+        np.testing.assert_allclose(valuation['equity_value'], expected['equity_value'], rtol=1e-4)
+
+    def test_results_use_engine_dtype(self):
+        self.assertEqual(self.engine32.results.data.dtype, np.float32)
+        self.engine32.project_stmt()
+        self.projection_engine.project_stmt()
+        self.assertEqual(self.engine32.results.data.dtype, np.float32)
+        np.testing.assert_allclose(self.engine32.results['fcf'], self.projection_engine.results['fcf'],
+                                   rtol=1e-5)
+
+    def test_drift_report(self):
+        report = precision_drift(self.engine32, n_paths=1000, seed=5, market=self.market)
+        self.assertEqual(report['dtype'], 'float32')
+        self.assertTrue(report['within_tolerance'])
+        self.assertGreater(report['max_drift'], 0)
+        self.assertLess(report['max_drift'], 1e-4)
+        self.assertEqual(set(report['drift']), {'revenues', 'ebit', 'fcf', 'equity_value'})
+        self.assertEqual(set(report['drift']['fcf']), {'mean', 'std', 'p5', 'p50', 'p95'})
+
+        # float64 is its own reference
+        self.assertEqual(precision_drift(self.projection_engine, n_paths=200, seed=5)['max_drift'], 0)
+
+        with self.assertWarns(PrecisionWarning):
+            report = precision_drift(self.engine32, n_paths=200, seed=5, tolerance=1e-12)
+        self.assertFalse(report['within_tolerance'])
+
+    def test_values_in_chunks_checks_precision(self):
+        aggregator = value_in_chunks(self.engine32, 1000, **self.market, chunk_size=400, seed=6, check_paths=300)
+        summary = aggregator.summary()
+        self.assertEqual(summary['precision']['n_paths'], 300)
+        self.assertTrue(summary['precision']['within_tolerance'])
+
+        reference = value_in_chunks(self.projection_engine, 1000, **self.market, chunk_size=400, seed=6)
+        self.assertNotIn('precision', reference.summary())
+        self.assertAlmostEqual(summary['value_per_share']['mean'],
+                               reference.summary()['value_per_share']['mean'], places=3)
+
+    def test_rejects_integer_dtype(self):
+        with self.assertRaises(ValueError):
+            ProjectionEngine(self.projection_engine.enterprise,
+                             **{param_name: self.projection_engine.params[param_name].data
+                                for param_name in RATIO_PARAMS},
+                             dtype=np.int64)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,9 +8,15 @@ from src.ProjectionUtils import (
     calc_sga_revenue,
     calc_r_and_d_revenue,
     calc_da_prior_nppe,
+    calc_nwc_revenue,
+    calc_net_capex_revenue,
+    calc_all_ratios,
     calc_ucoe,
     calc_reinvestment_rate,
-    calc_growth
+    calc_growth,
+    project_revenue_paths,
+    project_fixed_asset_paths,
+    project_change_nwc_paths
 )
 
 class TestCalcRevenueGrowth(unittest.TestCase):
@@ -175,6 +181,55 @@ class TestCalcDaNppe(unittest.TestCase):
         self.assertEqual(len(result), 2)
         np.testing.assert_almost_equal(result, expected)
 
+class TestCalcAllRatios(unittest.TestCase):
+    labels = ('Revenues', 'Cost of Goods Sold', 'R&D Exp.', 'Selling General & Admin Exp.',
+              'Depreciation & Amort.', 'Cash from Investing', 'Net Property Plant & Equipment',
+              'Total Cash & ST Investments', 'Total Current Assets',
+              'Current Portion of Long Term Debt', 'Total Current Liabilities')
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.label_index = {label: i for i, label in enumerate(self.labels)}
+        self.statements = rng.uniform(10, 100, size=(4, len(self.labels), 6))
+
+    def test_matches_single_enterprise_functions(self):
+        ratios = calc_all_ratios(self.statements, self.label_index)
+        for i, company in enumerate(self.statements):
+            row = dict(zip(self.labels, company))
+            expected = {
+                'revenue_growth': calc_revenue_growth(row['Revenues']),
+                'cogs_revenue': calc_cogs_revenue(row['Revenues'], row['Cost of Goods Sold']),
+                'r_and_d_revenue': calc_r_and_d_revenue(row['Revenues'], row['R&D Exp.']),
+                'sga_revenue': calc_sga_revenue(row['Revenues'], row['Selling General & Admin Exp.']),
+                'da_nppe': calc_da_prior_nppe(row['Depreciation & Amort.'],
+                                              row['Net Property Plant & Equipment']),
+                'nwc_revenue': calc_nwc_revenue(row['Revenues'], row['Total Cash & ST Investments'],
+                                                row['Total Current Assets'],
+                                                row['Current Portion of Long Term Debt'],
+                                                row['Total Current Liabilities']),
+                'net_capex_revenue': calc_net_capex_revenue(row['Revenues'], row['Cash from Investing'],
+                                                            row['Depreciation & Amort.'])}
+            for name, values in expected.items():
+                self.assertEqual(ratios[name].shape, (4, 5))
+                np.testing.assert_allclose(ratios[name][i].filled(np.nan), values, err_msg=name)
+
+    def test_zero_and_missing_values_are_masked(self):
+        self.statements[1, self.label_index['Revenues'], 2] = 0.0
+        self.statements[2, self.label_index['Cost of Goods Sold'], 4] = np.nan
+        ratios = calc_all_ratios(self.statements, self.label_index)
+
+        # Zero revenue in year 2 masks growth out of it and the revenue ratios of that year
+        np.testing.assert_array_equal(ratios['revenue_growth'].mask[1], [False, False, True, False, False])
+        np.testing.assert_array_equal(ratios['cogs_revenue'].mask[1], [False, True, False, False, False])
+        self.assertTrue(ratios['cogs_revenue'].mask[2, 3])
+        self.assertFalse(ratios['cogs_revenue'].mask[0].any())
+        self.assertTrue(np.isfinite(ratios['cogs_revenue'].std(axis=-1)).all())
+
+    def test_requires_stacked_statements(self):
+        with self.assertRaises(IndexError):
+            calc_all_ratios(self.statements[0], self.label_index)
+
+
 class TestCalcUcoe(unittest.TestCase):
     def test_typical_case(self):
         # Test with typical values
@@ -308,5 +363,71 @@ class TestCalcGrowth(unittest.TestCase):
         self.assertAlmostEqual(result, expected)
 
 
+class TestProjectPaths(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.growth = rng.normal(0.05, 0.02, (4, 30))
+        self.da_nppe = rng.normal(0.1, 0.01, (4, 30))
+        self.net_capex = rng.normal(2.0, 0.5, (4, 30))
+        self.nwc = rng.normal(20.0, 1.0, (4, 30))
+
+    def test_revenue_matches_recurrence(self):
+        result = project_revenue_paths(100.0, self.growth)
+
+        expected = np.empty_like(self.growth)
+        for p in range(4):
+            revenue0 = 100.0
+            for t in range(30):
+                revenue0 = revenue0 * (1 + self.growth[p, t])
+                expected[p, t] = revenue0
+
+        np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+    def test_revenue_per_path_start(self):
+        revenue0 = np.array([100.0, 200.0, 300.0, 400.0])
+        result = project_revenue_paths(revenue0, np.zeros((4, 5)))
+        np.testing.assert_allclose(result, np.repeat(revenue0[:, np.newaxis], 5, axis=1))
+
+    def test_per_path_start_with_shared_ratios(self):
+        # Ratios shared by every path broadcast against one start per path
+        starts = np.array([100.0, 200.0])
+        revenues = project_revenue_paths(starts, np.array([0.1, 0.1, 0.1]))
+        np.testing.assert_allclose(revenues, starts[:, np.newaxis] * 1.1 ** np.arange(1, 4))
+
+        da, capex, nppe = project_fixed_asset_paths(starts, np.array([0.1, 0.1]), np.array([5.0, 5.0]))
+        self.assertEqual(nppe.shape, (2, 2))
+        np.testing.assert_allclose(da[:, 0], 0.1 * starts)
+        np.testing.assert_allclose(nppe[:, -1], starts + 10.0)
+        np.testing.assert_allclose(capex, da + 5.0)
+
+        change_nwc = project_change_nwc_paths(starts, np.array([150.0, 250.0]))
+        np.testing.assert_allclose(change_nwc, [[50.0, 100.0], [-50.0, 100.0]])
+
+    def test_fixed_assets_match_recurrence(self):
+        da, capex, nppe = project_fixed_asset_paths(70.0, self.da_nppe, self.net_capex)
+
+        for p in range(4):
+            nppe0 = 70.0
+            for t in range(30):
+                expected_da = self.da_nppe[p, t] * nppe0
+                expected_capex = self.net_capex[p, t] + expected_da
+                nppe0 = nppe0 * (1 - self.da_nppe[p, t]) + expected_capex
+                self.assertAlmostEqual(da[p, t], expected_da)
+                self.assertAlmostEqual(capex[p, t], expected_capex)
+                self.assertAlmostEqual(nppe[p, t], nppe0)
+
+    def test_change_nwc(self):
+        result = project_change_nwc_paths(18.0, self.nwc)
+
+        self.assertEqual(result.shape, self.nwc.shape)
+        np.testing.assert_allclose(result[:, 0], self.nwc[:, 0] - 18.0)
+        np.testing.assert_allclose(result[:, 1:], self.nwc[:, 1:] - self.nwc[:, :-1])
+
+    def test_single_path(self):
+        # One-dimensional inputs project a single scenario
+        result = project_change_nwc_paths(18.0, self.nwc[0])
+        self.assertEqual(result.shape, (30,))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
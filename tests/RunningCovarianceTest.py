@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+
+from src.RunningCovariance import RunningCovariance
+from src.ProjectionEngine import RATIO_PARAMS
+from tests import fixtures
+
+
+class TestRunningCovariance(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.data = rng.normal(size=(6, 9, 7))
+        self.new_year = rng.normal(size=(6, 7))
+
+    def test_matches_numpy(self):
+        running = RunningCovariance.from_data(self.data)
+        for i, company in enumerate(self.data):
+            np.testing.assert_allclose(running.covariance()[i], np.cov(company.T), atol=1e-12)
+            np.testing.assert_allclose(running.correlation()[i], np.corrcoef(company.T), atol=1e-12)
+
+    def test_rolling_window(self):
+        running = RunningCovariance.from_data(self.data)
+        running.add(self.new_year)
+        running.remove(self.data[:, 0])
+
+        window = np.concatenate([self.data[:, 1:], self.new_year[:, np.newaxis]], axis=1)
+        expected = RunningCovariance.from_data(window)
+        np.testing.assert_array_equal(running.count, 9)
+        np.testing.assert_allclose(running.covariance(), expected.covariance(), atol=1e-12)
+
+    def test_missing_values_are_skipped(self):
+        year = self.new_year.copy()
+        year[2, 4] = np.nan
+        running = RunningCovariance(7, batch_shape=(6,))
+        running.add(year)
+        running.remove(year)
+        np.testing.assert_array_equal(running.count, 0)
+        self.assertFalse(running.comoment.any())
+
+    def test_constant_variable(self):
+        data = self.data[0].copy()
+        data[:, 3] = 1.0
+        correlation = RunningCovariance.from_data(data).correlation()
+        self.assertTrue(np.isnan(correlation[3]).all())
+        self.assertFalse(np.isnan(np.delete(np.delete(correlation, 3, 0), 3, 1)).any())
+
+
+class TestRollCorrelation(unittest.TestCase):
+    def setUp(self):
+        self.projection_engine = fixtures.mock_engine()
+
+    def test_roll_correlation(self):
+        engine = self.projection_engine
+        engine.calc_correlation()
+        history = engine.ratio_history.copy()
+        new_year = np.array([0.12, 0.58, 0.14, 0.09, 0.11, 0.21, 0.06])
+
+        engine.roll_correlation(new_year, window=len(history))
+        expected = np.corrcoef(np.vstack([history[1:], new_year]).T)
+        np.testing.assert_allclose(engine.correlation_matrix, expected, atol=1e-10)
+        self.assertEqual(engine.ratio_history.shape, (len(history), len(RATIO_PARAMS)))
+
+    def test_roll_correlation_wrong_size(self):
+        with self.assertRaises(IndexError):
+            self.projection_engine.roll_correlation(np.zeros(3))
+
+
+if __name__ == '__main__':
+    unittest.main()
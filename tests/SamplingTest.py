@@ -0,0 +1,106 @@
+import functools
+import unittest
+import warnings
+import numpy as np
+
+from src.Distributions import TruncatedNormal
+from src.Sampling import (control_variate, estimate_value, mean_estimate, standard_normal_shocks,
+                          SAMPLING_METHODS)
+from tests import fixtures
+
+market = {'rf': 0.04, 'rm': 0.09, 'beta_u': 1.0, 'roic': 0.1}
+
+
+class TestShocks(unittest.TestCase):
+    def test_random_matches_generator(self):
+        expected = np.random.default_rng(5).standard_normal((7, 10, 3))
+        np.testing.assert_array_equal(standard_normal_shocks((7, 10, 3), 'random', 5), expected)
+
+    def test_designs_are_standard_normal(self):
+        for method in SAMPLING_METHODS:
+            shocks = standard_normal_shocks((3, 1024, 2), method, seed=1)
+            self.assertEqual(shocks.shape, (3, 1024, 2))
+            self.assertTrue(np.isfinite(shocks).all())
+            np.testing.assert_allclose(shocks.mean(axis=1), 0.0, atol=0.1)
+            np.testing.assert_allclose(shocks.std(axis=1), 1.0, atol=0.1)
+
+    def test_sobol_blocks_of_any_size(self):
+        # 1000 paths make blocks of 125; they are drawn from 128-point designs without scipy's balance warning
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            shocks = standard_normal_shocks((3, 1000, 2), 'sobol', seed=1)
+        self.assertEqual(shocks.shape, (3, 1000, 2))
+        self.assertTrue(np.isfinite(shocks).all())
+        np.testing.assert_allclose(shocks.mean(axis=1), 0.0, atol=0.1)
+
+    def test_antithetic_pairs(self):
+        shocks = standard_normal_shocks((2, 7, 3), 'antithetic', seed=2)
+        np.testing.assert_array_equal(shocks[:, 4:], -shocks[:, :3])
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            standard_normal_shocks((1, 4, 1), 'halton')
+
+
+class TestEstimators(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def test_random_has_no_reduction(self):
+        estimate = mean_estimate(self.rng.normal(3.0, 2.0, 1000))
+        self.assertEqual(estimate['variance_reduction'], 1.0)
+        self.assertAlmostEqual(estimate['std_error'], 2.0 / np.sqrt(1000), delta=0.01)
+
+    def test_antithetic_cancels_linear_output(self):
+        shocks = standard_normal_shocks((1, 1000, 1), 'antithetic', seed=1)[0, :, 0]
+        values = 5.0 + 2.0 * shocks + 0.01 * shocks ** 2
+        estimate = mean_estimate(values, 'antithetic')
+        self.assertGreater(estimate['variance_reduction'], 1000)
+        self.assertAlmostEqual(estimate['mean'], 5.01, delta=0.002)
+
+    def test_failed_paths_are_left_out(self):
+        values = self.rng.normal(size=100)
+        values[[3, 60]] = np.nan
+        estimate = mean_estimate(values, 'antithetic')
+        self.assertEqual(estimate['n_failed'], 2)
+        self.assertTrue(np.isfinite(estimate['mean']))
+
+    def test_control_variate(self):
+        controls = self.rng.normal(1.0, 1.0, (2000, 2))
+        values = controls @ np.array([3.0, -1.0]) + self.rng.normal(0.0, 0.1, 2000)
+        estimate = control_variate(values, controls, np.array([1.0, 1.0]))
+        np.testing.assert_allclose(estimate['beta'], [3.0, -1.0], atol=0.02)
+        self.assertAlmostEqual(estimate['mean'], 2.0, delta=0.01)
+        self.assertGreater(estimate['variance_reduction'], 100)
+
+
+class TestEstimateValue(unittest.TestCase):
+    def setUp(self):
+        self.projection_engine = fixtures.mock_engine()
+        self.projection_engine.calc_correlation()
+
+    def test_designs_reduce_variance(self):
+        plain = estimate_value(self.projection_engine, **market, n_paths=1024, seed=1,
+                               use_control_variate=True)
+        self.assertGreater(plain['control_variate']['variance_reduction'], 2)
+        self.assertLessEqual(plain['p5'], plain['p50'])
+
+        for method in ('antithetic', 'sobol', 'lhs'):
+            report = estimate_value(self.projection_engine, **market, n_paths=1024, seed=1, sampling=method)
+            self.assertGreater(report['variance_reduction'], 2, method)
+            self.assertAlmostEqual(report['mean'], plain['mean'], delta=5 * plain['std_error'])
+
+    def test_control_variate_with_truncated_margin(self):
+        # The controls' expectation is the truncated mean, not the projected ratio
+        self.projection_engine.set_distribution('cogs_revenue_e', functools.partial(TruncatedNormal, lower=0.6))
+        report = estimate_value(self.projection_engine, **market, n_paths=4000, seed=1, use_control_variate=True)
+        self.assertAlmostEqual(report['control_variate']['mean'], report['mean'], delta=3 * report['std_error'])
+
+    def test_control_variate_needs_random_sampling(self):
+        with self.assertRaises(ValueError):
+            estimate_value(self.projection_engine, **market, n_paths=64, sampling='sobol',
+                           use_control_variate=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
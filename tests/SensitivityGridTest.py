@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+
+from src.SensitivityGrid import sensitivity_grid
+from tests import fixtures
+
+
+class TestSensitivityGrid(unittest.TestCase):
+    def setUp(self):
+        self.projection_engine = fixtures.mock_engine()
+        self.axes = {'rf': [0.03, 0.04], 'rm': [0.08, 0.09, 0.1], 'beta_u': [0.9, 1.1], 'roic': [0.08, 0.1]}
+
+    def test_matches_dcf_model(self):
+        grid = sensitivity_grid(self.projection_engine, **self.axes)
+        self.assertEqual(grid.shape, (2, 3, 2, 2))
+        self.assertEqual(grid['enterprise_value'].shape, grid.shape)
+
+        for index in np.argwhere(grid['converged'])[:5]:
+            inputs = {dim: grid.axes[dim][i] for dim, i in zip(grid.dims, index)}
+            self.projection_engine.dcf_model(**inputs)
+            self.assertAlmostEqual(grid.sel('enterprise_value', **inputs),
+                                   self.projection_engine.enterprise.enterprise_value, places=6)
+
+    def test_ratio_shocks(self):
+        grid = sensitivity_grid(self.projection_engine, **self.axes,
+                                shocks={'revenue_growth_e': [-0.02, 0.0, 0.02]})
+        plain = sensitivity_grid(self.projection_engine, **self.axes)
+        self.assertEqual(grid.dims[-1], 'revenue_growth_e')
+        np.testing.assert_allclose(grid.sel('enterprise_value', revenue_growth_e=0.0),
+                                   plain['enterprise_value'])
+
+        growth = grid.sel('enterprise_value', rf=0.03, rm=0.09, beta_u=0.9, roic=0.08)
+        self.assertTrue(np.all(np.diff(growth) > 0), "Faster revenue growth should raise the value")
+
+    def test_unknown_shock(self):
+        with self.assertRaises(ValueError):
+            sensitivity_grid(self.projection_engine, **self.axes, shocks={'tax_rate': [0.1]})
+
+    def test_process_pool_matches_serial(self):
+        serial = sensitivity_grid(self.projection_engine, **self.axes)
+        pooled = sensitivity_grid(self.projection_engine, **self.axes, max_workers=2)
+        np.testing.assert_array_equal(serial['enterprise_value'], pooled['enterprise_value'])
+
+    def test_heatmap_and_tornado(self):
+        grid = sensitivity_grid(self.projection_engine, **self.axes)
+        heatmap = grid.heatmap('rm', 'roic', beta_u=1.1)
+        self.assertEqual(heatmap.shape, (2, 3))
+        self.assertEqual(heatmap.loc[0.1, 0.08], grid.sel(rf=0.03, rm=0.08, beta_u=1.1, roic=0.1))
+
+        tornado = grid.tornado()
+        self.assertEqual(set(tornado.index), set(grid.dims))
+        self.assertTrue((np.diff(tornado['swing'].to_numpy()) <= 0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
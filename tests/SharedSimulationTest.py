@@ -0,0 +1,86 @@
+import gc
+import unittest
+import weakref
+import numpy as np
+
+from src.Enterprise import Enterprise, StatementArrays
+from src.ProjectionEngine import ProjectionEngine
+from src.SharedSimulation import SharedArray, simulate_shared
+from tests import fixtures
+
+market = {'rf': 0.04, 'rm': 0.09, 'beta_u': 1.0, 'roic': 0.1}
+
+
+class TestSharedSimulation(unittest.TestCase):
+    def setUp(self):
+        self.enterprise = fixtures.mock_enterprise()
+        self.projection_engine = fixtures.mock_engine(self.enterprise)
+        self.projection_engine.calc_correlation()
+
+    def test_shared_array_attach(self):
+        with SharedArray.copy_of(np.arange(6.0).reshape(2, 3)) as owner:
+            attached = SharedArray.attach(owner.spec)
+            attached.array[1, 2] = -1.0
+            self.assertEqual(owner.array[1, 2], -1.0)
+            self.assertFalse(attached.owner)
+            attached.close()
+
+    def test_enterprise_from_statement_arrays(self):
+        arrays = self.enterprise.statements
+        enterprise = Enterprise.from_statement_arrays(
+            'Shared', 'SHR', self.enterprise.fdso, self.enterprise.debt_value,
+            self.enterprise.stat_tax, self.enterprise.cod,
+            StatementArrays.from_values(arrays.values, arrays.label_index))
+        self.assertFalse(enterprise.empty)
+        self.assertIs(enterprise.statements.values, arrays.values)
+
+        estimates = {name: param.data for name, param in self.projection_engine.params.items()
+                     if name.endswith('_e')}
+        engine = ProjectionEngine(enterprise, **estimates)
+        engine.project_stmt()
+        self.projection_engine.project_stmt()
+        np.testing.assert_allclose(engine.fcf_e[-1], self.projection_engine.fcf_e[-1])
+
+    def test_matches_serial_simulation(self):
+        results, valuation = simulate_shared(self.projection_engine, 500, seed=4,
+                                             market=market, max_workers=2, n_blocks=3)
+        expected = self.projection_engine.simulate(500, seed=4)
+        expected_valuation = self.projection_engine.dcf_paths(**market, results=expected)
+
+        self.assertEqual(len(results), 500)
+        np.testing.assert_array_equal(results.data, expected.data)
+        np.testing.assert_allclose(valuation['equity_value'], expected_valuation['equity_value'])
+        np.testing.assert_array_equal(valuation['converged'], expected_valuation['converged'])
+
+    def test_results_view_shared_output(self):
+        results, valuation = simulate_shared(self.projection_engine, 20, seed=2, market=market, max_workers=1)
+        self.assertIsInstance(results.data.base, SharedArray)
+        output = weakref.ref(results.data.base)
+        fcf = results['fcf']
+        del results, valuation
+        gc.collect()
+        self.assertFalse(output().closed)
+        self.assertTrue(np.isfinite(fcf).all())
+
+        del fcf
+        gc.collect()
+        self.assertIsNone(output())
+
+    def test_copy_releases_shared_output(self):
+        results, valuation = simulate_shared(self.projection_engine, 20, seed=2, market=market,
+                                             max_workers=1, copy=True)
+        expected, expected_valuation = simulate_shared(self.projection_engine, 20, seed=2, market=market,
+                                                       max_workers=1)
+        self.assertIsNone(results.data.base)
+        np.testing.assert_array_equal(results.data, expected.data)
+        np.testing.assert_array_equal(valuation['equity_value'], expected_valuation['equity_value'])
+
+    def test_projection_only(self):
+        results, valuation = simulate_shared(self.projection_engine, 10, seed=1, max_workers=1)
+        self.assertIsNone(valuation)
+        self.assertTrue(np.isfinite(results['fcf']).all())
+        self.assertTrue(np.isnan(results['pv_fcf']).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+from src.ProjectionEngine import RATIO_PARAMS
+from tests import fixtures
+
+
+class TestSimulation(unittest.TestCase):
+    def setUp(self):
+        self.enterprise = fixtures.mock_enterprise()
+        self.projection_engine = fixtures.mock_engine(self.enterprise)
+
+    def test_simulate_shapes(self):
+        paths = self.projection_engine.simulate(n_paths=500, seed=1)
+        self.assertEqual(len(paths), 500)
+        for line_item in paths.labels:
+            self.assertEqual(paths[line_item].shape, (500, 3), f"{line_item} should be (n_paths, horizon)")
+            if line_item != 'pv_fcf':
+                self.assertFalse(np.isnan(paths[line_item]).any(),
+                                 f"{line_item} should not contain NaN values")
+
+    def test_simulate_is_reproducible(self):
+        first = self.projection_engine.simulate(n_paths=100, seed=42)
+        second = self.projection_engine.simulate(n_paths=100, seed=42)
+        np.testing.assert_array_equal(first['fcf'], second['fcf'])
+
+    def test_zero_std_matches_project_stmt(self):
+        # Without dispersion every simulated path should equal the deterministic projection
+        for param_name in RATIO_PARAMS:
+            self.projection_engine.params[param_name].std = 0.0
+        paths = self.projection_engine.simulate(n_paths=4, seed=0)
+        self.projection_engine.project_stmt()
+
+        expected = {'revenues': self.projection_engine.revenues_e,
+                    'cogs': self.projection_engine.cogs_e,
+                    'ebitda': self.projection_engine.ebitda_e,
+                    'da': self.projection_engine.da_e,
+                    'capex': self.projection_engine.capex_e,
+                    'nppe': self.projection_engine.nppe_e,
+                    'change_nwc': self.projection_engine.change_nwc_e,
+                    'fcf': self.projection_engine.fcf_e}
+        for line_item, values in expected.items():
+            for path in paths[line_item]:
+                np.testing.assert_allclose(path, values[-1], rtol=1e-10,
+                                           err_msg=f"Simulated {line_item} doesn't match project_stmt.")
+
+    def test_correlated_draws(self):
+        self.projection_engine.calc_correlation()
+        draws = self.projection_engine.draw_ratios(n_paths=20000, seed=7)
+        sample = np.corrcoef(draws['revenue_growth_e'][:, 0], draws['cogs_revenue_e'][:, 0])[0, 1]
+        expected = self.projection_engine.correlation_matrix[0, 1]
+        self.assertAlmostEqual(sample, expected, delta=0.05)
+
+    def test_simulate_appends_to_store(self):
+        results = self.projection_engine.simulate(n_paths=10, seed=1)
+        self.projection_engine.simulate(n_paths=25, seed=2, out=results)
+        self.assertEqual(len(results), 35)
+        self.assertGreaterEqual(results.capacity, 35)
+
+        summary = results.summary('fcf')
+        self.assertEqual(set(summary), {'mean', 'std', 'min', 'max', 'p5', 'p50', 'p95'})
+        np.testing.assert_allclose(summary['mean'], results['fcf'].mean(axis=0))
+        self.assertEqual(results.year(1).shape, (14, 35))
+        self.assertEqual(results.path(0).shape, (14, 3))
+
+    def test_invalid_path_count(self):
+        with self.assertRaises(ValueError):
+            self.projection_engine.simulate(n_paths=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
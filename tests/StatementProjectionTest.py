@@ -22,7 +22,9 @@ class TestProjectionEngine(unittest.TestCase):
         enterprise = Enterprise(name='Test Corp',
                                 ticker='TEST',
                                 fdso=100,
-                                debt_value=0.0)
+                                debt_value=0.0,
+                                stat_tax=0.21,
+                                cod=0.05)
 
         years = ['2016', '2017', '2018', '2019', '2020', '2021', '2022']
 
@@ -61,38 +63,34 @@ class TestProjectionEngine(unittest.TestCase):
                                    err_msg="Projected Revenues don't match expected growth values.")
 
     def test_project_cogs(self):
-        self.projection_engine.revenues_e.append(self.projection_engine.project_revenue())
-        projected_cogs = self.projection_engine.project_cogs()
+        projected_cogs = self.projection_engine.project_cogs(self.projection_engine.project_revenue())
         projected_revenue = [177.1 * 1.1, 177.1 * (1.1 ** 2), 177.1 * (1.1 ** 3)]
         expected_cogs = [rev * 0.6 for rev in projected_revenue]
         np.testing.assert_allclose(projected_cogs, expected_cogs, rtol=1e-5,
                                    err_msg="Projected COGS don't match expected proportional values.")
 
     def test_project_sga(self):
-        self.projection_engine.revenues_e.append(self.projection_engine.project_revenue())
-        projected_sga = self.projection_engine.project_sga()
+        projected_sga = self.projection_engine.project_sga(self.projection_engine.project_revenue())
         projected_revenue = [177.1 * 1.1, 177.1 * (1.1 ** 2), 177.1 * (1.1 ** 3)]
         expected_sga = [rev * 0.15 for rev in projected_revenue]
         np.testing.assert_allclose(projected_sga, expected_sga, rtol=1e-5,
                                    err_msg="Projected SG&A don't match expected proportional values.")
 
     def test_project_r_and_d(self):
-        self.projection_engine.revenues_e.append(self.projection_engine.project_revenue())
-        projected_r_and_d = self.projection_engine.project_r_and_d()
+        projected_r_and_d = self.projection_engine.project_r_and_d(self.projection_engine.project_revenue())
         projected_revenue = [177.1 * 1.1, 177.1 * (1.1 ** 2), 177.1 * (1.1 ** 3)]
         expected_r_and_d = [rev * 0.1 for rev in projected_revenue]
         np.testing.assert_allclose(projected_r_and_d, expected_r_and_d, rtol=1e-5,
                                    err_msg="Projected R&D don't match expected proportional values.")
 
     def test_project_fixed_assets(self):
-        self.projection_engine.revenues_e.append(self.projection_engine.project_revenue())
-        projected_fixed_assets = self.projection_engine.project_fixed_assets()
+        projected_fixed_assets = self.projection_engine.project_fixed_assets(self.projection_engine.project_revenue())
         # simplified example for expected fixed-assets calculation
         self.assertEqual(len(projected_fixed_assets), 3)
 
     def test_project_net_working_capital(self):
-        self.projection_engine.revenues_e.append(self.projection_engine.project_revenue())
-        projected_nwc = self.projection_engine.project_change_net_working_capital()
+        projected_nwc = self.projection_engine.project_change_net_working_capital(
+            self.projection_engine.project_revenue())
         expected_nwc = [47.762, 3.8962, 4.28582]
         np.testing.assert_allclose(projected_nwc, expected_nwc, rtol=1e-5,
                                    err_msg="Projected NWC doesn't match expected proportional values.")
@@ -120,6 +118,17 @@ class TestProjectionEngine(unittest.TestCase):
         self.assertEqual(len(self.projection_engine.change_nwc_e), 2,
                          "The container should have exactly two projected statements.")
 
+    def test_project_stmt_writes_result_store(self):
+        self.projection_engine.project_stmt()
+        results = self.projection_engine.results
+
+        # The line item attributes are views into the preallocated store
+        self.assertEqual(results.data.shape[0], 14)
+        self.assertTrue(np.shares_memory(self.projection_engine.revenues_e, results.data))
+        np.testing.assert_allclose(results['revenues', 0], [177.1 * 1.1, 177.1 * (1.1 ** 2), 177.1 * (1.1 ** 3)])
+        np.testing.assert_allclose(results['cogs', 0], results['revenues', 0] * 0.6)
+        np.testing.assert_allclose(results['fcf', 0], self.projection_engine.project_fcf())
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
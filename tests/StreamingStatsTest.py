@@ -0,0 +1,112 @@
+import unittest
+import numpy as np
+
+from src.Jobs import Cancelled, simulate_in_chunks, value_in_chunks
+from src.StreamingStats import Histogram, RunningMoments, TDigest, ValuationAggregator
+from tests import fixtures
+
+
+class TestStreamingStats(unittest.TestCase):
+    def setUp(self):
+        self.enterprise = fixtures.mock_enterprise()
+        self.projection_engine = fixtures.mock_engine(self.enterprise)
+        self.rng = np.random.default_rng(0)
+
+    def test_running_moments_match_batch(self):
+        values = self.rng.normal(1e6, 1.0, (5000, 3))
+        values[10, 1] = np.nan
+        moments = RunningMoments(3)
+        for batch in np.array_split(values, 7):
+            moments.add(batch)
+
+        np.testing.assert_array_equal(moments.count, [5000, 4999, 5000])
+        np.testing.assert_allclose(moments.mean, np.nanmean(values, axis=0))
+        np.testing.assert_allclose(moments.std(), np.nanstd(values, axis=0, ddof=1), rtol=1e-9)
+        np.testing.assert_allclose(moments.std_error(), moments.std() / np.sqrt(moments.count))
+        np.testing.assert_array_equal(moments.max, np.nanmax(values, axis=0))
+
+    def test_tdigest_quantiles_stay_bounded(self):
+        digest = TDigest(compression=100)
+        values = self.rng.lognormal(0, 1, 200000)
+        for batch in np.array_split(values, 20):
+            digest.add(batch)
+
+        self.assertEqual(digest.count, 200000)
+        self.assertLessEqual(len(digest.means), 100)
+        q = np.array([0.001, 0.01, 0.05, 0.5, 0.95, 0.99, 0.999])
+        # The error of a t-digest is in rank, smallest in the tails
+        ranks = np.searchsorted(np.sort(values), digest.quantile(q)) / len(values)
+        np.testing.assert_allclose(ranks, q, atol=0.002)
+        np.testing.assert_allclose(digest.quantile(q[1:-1]), np.quantile(values, q[1:-1]), rtol=0.05)
+        self.assertEqual(digest.quantile(0.0), values.min())
+        self.assertEqual(digest.quantile(1.0), values.max())
+
+        other = TDigest(compression=100)
+        extra = self.rng.lognormal(0, 1, 50000)
+        other.add(extra)
+        digest.merge(other)
+        both = np.concatenate([values, extra])
+        ranks = np.searchsorted(np.sort(both), digest.quantile(q)) / len(both)
+        np.testing.assert_allclose(ranks, q, atol=0.002)
+
+    def test_tdigest_tail_quantiles(self):
+        digest = TDigest(compression=200)
+        values = self.rng.lognormal(0, 1, 1000000)
+        for batch in np.array_split(values, 100):
+            digest.add(batch)
+
+        self.assertLessEqual(len(digest.means), 200)
+        q = np.array([0.001, 0.999])
+        np.testing.assert_allclose(digest.quantile(q), np.quantile(values, q), rtol=0.01)
+        # The extreme centroids are single values
+        self.assertEqual(digest.weights[0], 1)
+        self.assertEqual(digest.weights[-1], 1)
+
+    def test_histogram_counts_outside_bins(self):
+        histogram = Histogram(edges=np.linspace(0, 1, 11))
+        histogram.add(np.array([-0.5, 0.05, 0.15, 0.15, 1.0, 2.0, np.nan]))
+        self.assertEqual(histogram.counts.sum(), 4)
+        self.assertEqual(histogram.counts[1], 2)
+        self.assertEqual((histogram.underflow, histogram.overflow), (1, 1))
+
+        automatic = Histogram(n_bins=20)
+        automatic.add(np.array([1.0, 3.0]))
+        self.assertEqual((automatic.edges[0], automatic.edges[-1]), (0.0, 4.0))
+        automatic.add(np.array([10.0]))
+        self.assertEqual(automatic.overflow, 1)
+
+    def test_values_in_chunks(self):
+        market = {'rf': 0.04, 'rm': 0.09, 'beta_u': 1.0, 'roic': 0.12}
+        done = []
+        aggregator = value_in_chunks(self.projection_engine, 2000, **market, chunk_size=300, seed=3,
+                                     progress=lambda n, total: done.append(n))
+        self.assertEqual(done[-1], 2000)
+
+        results = simulate_in_chunks(self.projection_engine, 2000, chunk_size=300, seed=3)
+        valuation = self.projection_engine.dcf_paths(**market, results=results)
+        per_share = valuation['equity_value'] / self.enterprise.fdso
+        valued = np.isfinite(per_share)
+
+        summary = aggregator.summary(quantiles=(0.05, 0.5, 0.95))
+        self.assertEqual(summary['n_paths'], 2000)
+        self.assertEqual(summary['n_failed'], np.count_nonzero(~valued))
+        self.assertAlmostEqual(summary['value_per_share']['mean'], per_share[valued].mean())
+        self.assertAlmostEqual(summary['enterprise_value']['std'],
+                               valuation['enterprise_value'][valued].std(ddof=1), delta=1e-6)
+        np.testing.assert_allclose(summary['fcf']['mean'], results.mean('fcf'))
+        np.testing.assert_allclose(summary['fcf']['p50'], np.percentile(results['fcf'], 50, axis=0), rtol=0.01)
+        np.testing.assert_allclose(summary['value_per_share']['p5'], np.percentile(per_share[valued], 5), rtol=0.01)
+        self.assertEqual(summary['value_per_share']['histogram']['counts'].sum(), np.count_nonzero(valued))
+        self.assertEqual(len(summary['fcf']['histogram']), 3)
+
+    def test_cancelled_valuation_stops(self):
+        aggregator = ValuationAggregator(3, self.enterprise.fdso)
+        calls = []
+        with self.assertRaises(Cancelled):
+            value_in_chunks(self.projection_engine, 1000, 0.04, 0.09, 1.0, 0.12, chunk_size=100,
+                            aggregator=aggregator, cancelled=lambda: len(calls) > 2 or calls.append(1))
+        self.assertEqual(aggregator.n_paths, 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
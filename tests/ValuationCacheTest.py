@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+
+from src.ValuationCache import ValuationCache
+from tests import fixtures
+
+
+class TestValuationCache(unittest.TestCase):
+    def setUp(self):
+        self.projection_engine = fixtures.mock_engine()
+        self.inputs = {'rf': 0.04, 'rm': 0.09, 'beta_u': 1.0, 'roic': 0.1}
+
+    def test_repeated_scenario_hits(self):
+        cache = ValuationCache()
+        self.projection_engine.dcf_model(**self.inputs, cache=cache)
+        expected = self.projection_engine.enterprise.enterprise_value
+        fcf = self.projection_engine.fcf_e[-1].copy()
+
+        self.projection_engine.dcf_model(**{**self.inputs, 'rf': 0.03}, cache=cache)
+        self.projection_engine.dcf_model(**self.inputs, cache=cache)
+        self.assertEqual(self.projection_engine.enterprise.enterprise_value, expected)
+        np.testing.assert_array_equal(self.projection_engine.fcf_e[-1], fcf)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_hit_restores_leverage(self):
+        cache = ValuationCache()
+        self.projection_engine.dcf_model(**self.inputs, cache=cache)
+        leverage = self.projection_engine.last_leverage.copy()
+
+        self.projection_engine.dcf_model(**{**self.inputs, 'beta_u': 1.5}, cache=cache)
+        self.assertFalse(np.array_equal(self.projection_engine.last_leverage, leverage))
+        self.projection_engine.dcf_model(**self.inputs, cache=cache)
+        self.assertEqual(cache.hits, 1)
+        np.testing.assert_array_equal(self.projection_engine.last_leverage, leverage)
+
+    def test_key_tracks_inputs(self):
+        engine = self.projection_engine
+        key = ValuationCache.key(engine, *self.inputs.values())
+        self.assertEqual(key, ValuationCache.key(engine, *self.inputs.values()))
+        self.assertNotEqual(key, ValuationCache.key(engine, 0.05, 0.09, 1.0, 0.1))
+
+        engine.params['cogs_revenue_e'].data = engine.params['cogs_revenue_e'].data + 0.01
+        self.assertNotEqual(key, ValuationCache.key(engine, *self.inputs.values()))
+
+        changed = ValuationCache.key(engine, *self.inputs.values())
+        engine.enterprise.income_statement = engine.enterprise.income_statement * 2
+        self.assertNotEqual(changed, ValuationCache.key(engine, *self.inputs.values()))
+
+    def test_lru_eviction(self):
+        cache = ValuationCache(max_entries=2)
+        for key in ('a', 'b'):
+            cache.put(key, {'value': np.zeros(4)})
+        cache.get('a')
+        cache.put('c', {'value': np.zeros(4)})
+        self.assertEqual(list(cache.entries), ['a', 'c'])
+
+    def test_memory_eviction(self):
+        cache = ValuationCache(max_bytes=100)
+        cache.put('a', {'value': np.zeros(8)})
+        cache.put('b', {'value': np.zeros(8)})
+        self.assertEqual(list(cache.entries), ['b'])
+        self.assertEqual(cache.nbytes, 64)
+        self.assertEqual(cache.stats()['entries'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
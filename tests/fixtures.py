@@ -0,0 +1,57 @@
+"""
+The mock enterprise and engine the tests build on
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.Enterprise import Enterprise
+from src.ProjectionEngine import ProjectionEngine
+
+
+def mock_enterprise() -> Enterprise:
+    enterprise = Enterprise(name='Test Corp',
+                            ticker='TEST',
+                            fdso=100,
+                            debt_value=50.0,
+                            stat_tax=0.21,
+                            cod=0.05)
+
+    years = ['2016', '2017', '2018', '2019', '2020', '2021', '2022']
+
+    income_data = {
+        'Revenues': [100, 110, 121, 133, 146.3, 161, 177.1],
+        'Cost of Goods Sold': [60, 65, 71.5, 78.6, 86.5, 95.1, 104.6],
+        'R&D Exp.': [10, 11, 12.1, 13.3, 14.6, 16.1, 17.7],
+        'Selling General & Admin Exp.': [15, 16.5, 18.2, 20, 22, 24.2, 26.6]
+    }
+    enterprise.income_statement = pd.DataFrame(income_data, index=years).T
+
+    balance_data = {
+        'Net Property Plant & Equipment': [70, 77, 84.7, 93.2, 102.5, 112.7, 124],
+        'Total Cash & ST Investments': [20, 22, 24.2, 26.6, 29.3, 32.2, 35.4],
+        'Total Current Assets': [40, 44, 48.4, 53.2, 58.5, 64.4, 70.8],
+        'Current Portion of Long Term Debt': [5, 5.5, 6.1, 6.7, 7.3, 8.1, 8.9],
+        'Total Current Liabilities': [30, 33, 36.3, 39.9, 43.9, 48.3, 53.1]
+    }
+    enterprise.balance_sheet = pd.DataFrame(balance_data, index=years).T
+
+    cf_data = {
+        'Depreciation & Amort.': [7, 7.7, 8.5, 9.3, 10.3, 11.3, 12.4],
+        'Cash from Investing': [-12, -13.2, -14.5, -16, -17.6, -19.3, -21.3]
+    }
+    enterprise.cash_flow_statement = pd.DataFrame(cf_data, index=years).T
+
+    return enterprise
+
+
+def mock_engine(enterprise: Enterprise = None, dtype: np.dtype = np.float64) -> ProjectionEngine:
+    return ProjectionEngine(mock_enterprise() if enterprise is None else enterprise,
+                            revenue_growth_e=np.array([0.1, 0.1, 0.1]),
+                            cogs_revenue_e=np.array([0.6, 0.6, 0.6]),
+                            sga_revenue_e=np.array([0.15, 0.15, 0.15]),
+                            r_and_d_revenue_e=np.array([0.1, 0.1, 0.1]),
+                            da_nppe_e=np.array([0.1, 0.1, 0.1]),
+                            nwc_revenue_e=np.array([0.2, 0.2, 0.2]),
+                            net_capex_revenue_e=np.array([0.05, 0.05, 0.05]),
+                            dtype=dtype)